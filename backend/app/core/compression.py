@@ -0,0 +1,182 @@
+"""
+Response compression (brotli / gzip) for JSON, CSV and other text payloads.
+Shop-floor tablets sit on a weak Wi-Fi link, so large task lists, dashboard
+payloads and CSV exports are compressed once they pass a size threshold.
+Brotli is used when the `brotli` package is installed and the client accepts
+it; gzip otherwise. Server-Sent Event streams are never compressed (buffering
+would hold events back).
+
+The middleware exposes the encoding it negotiated through `accepted_encoding()`
+so that pre-encoded responses (app/utils/fast_json.py) can cache their
+compressed bytes instead of compressing on every request.
+"""
+
+import gzip
+import zlib
+from contextvars import ContextVar
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from app.core.config import COMPRESSION_ENCODINGS, COMPRESSION_MIN_SIZE, GZIP_LEVEL, BROTLI_QUALITY
+
+try:
+    import brotli
+except ImportError: # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "text/csv", "text/plain",
+    "text/html", "text/css", "application/javascript",
+)
+
+SUPPORTED_ENCODINGS = tuple(e for e in COMPRESSION_ENCODINGS if e == "gzip" or (e == "br" and brotli is not None))
+
+_accepted = ContextVar("accepted_encoding", default=None)
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Picks our most preferred encoding that the client accepts (q > 0)."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+def accepted_encoding(size: int) -> Optional[str]:
+    """Encoding to apply to a `size`-byte body in the current request, or None."""
+    if size < COMPRESSION_MIN_SIZE:
+        return None
+    return _accepted.get()
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+class _StreamCompressor:
+    """Incremental compressor; every chunk is flushed so streamed lines arrive promptly."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._gz = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes, last: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + (self._br.finish() if last else self._br.flush())
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES
+
+class _VaryingSend:
+    """
+    Wraps the ASGI `send` of a response to a client that accepts none of our
+    encodings. The body goes out as-is, but a compressible response still
+    varies by Accept-Encoding, or a shared cache could hand this identity body
+    to clients that do accept br / gzip.
+    """
+
+    def __init__(self, send):
+        self.send = send
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start" and _is_compressible(Headers(raw=message.get("headers", []))):
+            MutableHeaders(raw=message.setdefault("headers", [])).add_vary_header("Accept-Encoding")
+        await self.send(message)
+
+class _CompressingSend:
+    """
+    Wraps the ASGI `send` of one response. Small bodies go out untouched; a
+    streamed body is buffered until it reaches the threshold, then compressed
+    chunk by chunk.
+    """
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.passthrough = False
+        self.buffer = b""
+        self.compressor = None
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if message["status"] in (204, 304) or "content-encoding" in headers or not _is_compressible(headers):
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            await self.send({"type": "http.response.body", "body": self.compressor.chunk(body, not more_body), "more_body": more_body})
+            return
+
+        self.buffer += body
+        headers = MutableHeaders(raw=self.start["headers"])
+        if len(self.buffer) < self.minimum_size:
+            if more_body:
+                return # keep buffering until we know the size
+            headers.add_vary_header("Accept-Encoding")
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": self.buffer})
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        headers["Content-Encoding"] = self.encoding
+        if not more_body:
+            payload = compress(self.buffer, self.encoding)
+            headers["Content-Length"] = str(len(payload))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": payload})
+            return
+
+        if "content-length" in headers:
+            del headers["content-length"]
+        self.compressor = _StreamCompressor(self.encoding)
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": self.compressor.chunk(self.buffer, False), "more_body": True})
+        self.buffer = b""
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        token = _accepted.set(encoding)
+        try:
+            if encoding is None:
+                await self.app(scope, receive, _VaryingSend(send))
+            else:
+                await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+        finally:
+            _accepted.reset(token)
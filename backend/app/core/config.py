@@ -7,6 +7,16 @@ JWT_SECRET = os.getenv("JWT_SECRET", "c2b0644eb4df8d087f994c58862a418fd455ac0286
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
 
+# Hot/cold archival of task sheets
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))  # Completed tasks older than this move to *_archive
+ARCHIVE_INTERVAL_HOURS = float(os.getenv("ARCHIVE_INTERVAL_HOURS", "0"))  # 0 disables the scheduled job
+
+# Response compression
+COMPRESSION_ENCODINGS = [e.strip().lower() for e in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if e.strip()]  # In order of preference; empty disables
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # Bytes; smaller bodies are sent as-is
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
 # Parse CORS origins from environment variable
 backend_cors_origins_str = os.getenv("BACKEND_CORS_ORIGINS", "")
 CORS_ORIGINS = [origin.strip() for origin in backend_cors_origins_str.split(",") if origin.strip()]
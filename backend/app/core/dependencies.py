@@ -7,6 +7,9 @@ from app.models.models_db import User
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 from app.core.normalizer import normalize_user_row, safe_bool, safe_str
+from app.repositories.normalized_rows import normalized_rows
+from app.repositories.user_directory import user_directory
+from app.core.sheets_db import SheetRow
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -30,13 +33,13 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # 1. Fetch ALL users (safer than DB filtering with loose types)
+    # 1. Users with this username from the directory index (case-insensitive candidates)
     try:
-        all_users = db.query(User).all()
+        candidates = [SheetRow(row, "users", db) for row in user_directory.find(username=username.strip())]
         
         # 2. Manual Filter (Handles "TRUE"/"1"/True mismatch)
         user = None
-        for u in all_users:
+        for u in candidates:
             u_dict = u.dict() if hasattr(u, "dict") else u.__dict__
             
             # Check username match
@@ -64,12 +67,14 @@ async def get_current_user(
         # However, for 'user.role' checks in dependencies, we need it safe.
         
         # Let's attach normalized values to the object to be safe
-        u_dict = user.dict() if hasattr(user, "dict") else user.__dict__
-        normalized = normalize_user_row(u_dict)
+        # Cached per row version, so this runs once per user change rather than per request
+        cached = normalized_rows.normalize([user], normalize_user_row, "user")
+        normalized = cached[0] if cached else normalize_user_row(user.dict() if hasattr(user, "dict") else user.__dict__)
         
-        # Patch the user object with normalized values so getattr(user, 'role') works safely
-        for k, v in normalized.items():
-            setattr(user, k, v)
+        # Patch the user object with normalized values so getattr(user, 'role') works safely.
+        # Written straight into the row data: going through setattr would mark the row
+        # dirty and write the user back to the sheet on every authenticated request.
+        user._data.update(normalized)
             
         return user
 
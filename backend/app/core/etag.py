@@ -0,0 +1,137 @@
+"""
+Conditional GET support for the polled read endpoints.
+The dashboards poll every 45-60 s and most polls return exactly what the client
+already has. The ETag of a response is derived from the versions of the sheets
+the endpoint reads (see SheetsRepository.get_version) plus its path, query and
+caller, so it can be computed before running the endpoint. A matching
+If-None-Match is answered with 304 without touching the endpoint at all.
+
+The middleware is plain ASGI: requests to paths without a rule (the SSE
+stream, CSV exports, writes) go straight to the app, and matched responses
+only get headers added on their start message, so streamed bodies and
+client disconnects are never intercepted.
+"""
+
+import uuid
+import hashlib
+from typing import Optional, Tuple
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from app.core.auth_utils import decode_access_token
+from app.core.time_utils import get_today_date_ist
+from app.core.sheets_config import ARCHIVED_SHEETS, archive_sheet_name
+from app.repositories.sheets_repository import sheets_repo
+
+TASK_SHEETS = ("tasks", "filingtasks", "fabricationtasks")
+NAME_SHEETS = ("users", "machines", "projects")
+
+# (path, exact match only, sheets the response depends on). First match wins;
+# None disables conditional responses for that path.
+ETAG_RULES = [
+    ("/dashboard/operator", False, TASK_SHEETS + ("users", "machines", "taskhold", "machineruntimelog", "userworklog")),
+    ("/dashboard/admin/bootstrap", False, TASK_SHEETS + NAME_SHEETS + ("attendance", "units")),
+    ("/dashboard", False, TASK_SHEETS + NAME_SHEETS + ("attendance",)),
+    ("/supervisor", False, TASK_SHEETS + NAME_SHEETS + ("taskhold",)),
+    ("/analytics", False, TASK_SHEETS + NAME_SHEETS),
+    ("/dropdowns/bootstrap", False, None), # carries server_time
+    ("/dropdowns/projects", True, ("projects",)),
+    ("/dropdowns/machines", True, ("machines",)),
+    ("/dropdowns/units", True, ("units",)),
+    ("/dropdowns/users", False, ("users",)),
+    ("/dropdowns", False, ("projects", "machines", "units", "machinecategories", "users")),
+    ("/tasks", True, TASK_SHEETS + NAME_SHEETS),
+]
+
+# Versions are per process; the boot id keeps tags from different workers apart
+_BOOT_ID = uuid.uuid4().hex
+
+def _dependencies(path: str) -> Optional[Tuple[str, ...]]:
+    path = path.rstrip("/") or "/"
+    for prefix, exact, sheets in ETAG_RULES:
+        if path == prefix or (not exact and path.startswith(prefix + "/")):
+            return sheets
+    return None
+
+def _current_versions(sheets: Tuple[str, ...]) -> list:
+    versions = []
+    for sheet_name in sheets:
+        # Loads / revalidates the cache so the version reflects what the endpoint will read
+        sheets_repo.get_cached_records(sheet_name)
+        versions.append(sheets_repo.get_version(sheet_name))
+    if any(s in ARCHIVED_SHEETS for s in sheets):
+        # Archive sheets are only read for old date ranges; don't force them in
+        versions.extend(sheets_repo.get_version(archive_sheet_name(s)) for s in ARCHIVED_SHEETS)
+    return versions
+
+def compute_etag(request: Request, sheets: Tuple[str, ...], versions: list) -> str:
+    parts = [
+        _BOOT_ID,
+        request.url.path,
+        "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items())),
+        request.headers.get("authorization", ""),
+        get_today_date_ist().isoformat(), # attendance / "today" figures roll over daily
+        ",".join(f"{s}:{v}" for s, v in zip(sheets, versions)),
+        ",".join(str(v) for v in versions[len(sheets):]),
+    ]
+    digest = hashlib.sha1("\n".join(parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2)
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def _caller_is_valid(request: Request) -> bool:
+    """A 304 skips the endpoint's auth dependencies, so re-check the bearer token here."""
+    auth = request.headers.get("authorization")
+    if not auth:
+        return True
+    scheme, _, token = auth.partition(" ")
+    return scheme.lower() == "bearer" and decode_access_token(token.strip()) is not None
+
+class ETagMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        sheets = _dependencies(scope["path"])
+        if sheets is None:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        try:
+            versions = await run_in_threadpool(_current_versions, sheets)
+            etag = compute_etag(request, sheets, versions)
+        except Exception as e:
+            print(f"⚠️ [ETag] Could not compute tag for {request.url.path}: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag) and _caller_is_valid(request):
+            await Response(status_code=304, headers=headers)(scope, receive, send)
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                response_headers = MutableHeaders(raw=message.setdefault("headers", []))
+                for name, value in headers.items():
+                    response_headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
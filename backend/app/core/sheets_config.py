@@ -52,6 +52,16 @@ SHEETS_SCHEMA = {
     "subtasks": ["id", "task_id", "title", "status", "notes", "created_at", "updated_at", "is_deleted"]
 }
 
+# Cold storage for the task sheets: same columns plus the time the row was archived
+ARCHIVED_SHEETS = ["tasks", "filingtasks", "fabricationtasks"]
+ARCHIVE_SUFFIX = "_archive"
+
+def archive_sheet_name(sheet_name: str) -> str:
+    return f"{sheet_name}{ARCHIVE_SUFFIX}"
+
+for _sheet in ARCHIVED_SHEETS:
+    SHEETS_SCHEMA[archive_sheet_name(_sheet)] = SHEETS_SCHEMA[_sheet] + ["archived_at"]
+
 def normalize_row(sheet_name: str, data: Dict[str, Any], partial: bool = False) -> Dict[str, Any]:
     """
     Unified normalization layer. Ensures all writes are schema-aligned.
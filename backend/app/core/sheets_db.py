@@ -6,7 +6,7 @@ from typing import List, Dict, Any, Optional, Type
 from app.services.google_sheets import google_sheets
 from app.core.time_utils import get_current_time_ist
 
-from app.core.sheets_config import SHEETS_SCHEMA, normalize_row
+from app.core.sheets_config import SHEETS_SCHEMA, ARCHIVED_SHEETS, archive_sheet_name, normalize_row
 
 # Mapping of Model names to Worksheet names for convenience
 MODEL_MAP = {
@@ -193,10 +193,27 @@ class SheetsDB:
         if row not in self._dirty_rows:
             self._dirty_rows.append(row)
 
-    def query(self, model) -> QueryWrapper:
+    def query(self, model, include_archive: bool = False) -> QueryWrapper:
         sheet_name = self._get_sheet_name(model)
         raw_data = sheets_repo.get_all(sheet_name, include_deleted=True)
         rows = [SheetRow(row, sheet_name, self) for row in raw_data]
+
+        # Cold rows are only read when a caller explicitly asks for history
+        if include_archive and sheet_name in ARCHIVED_SHEETS:
+            archive_name = archive_sheet_name(sheet_name)
+            hot_ids = {str(r.id) for r in rows}
+            for row in sheets_repo.get_all(archive_name, include_deleted=True):
+                archived = SheetRow(row, archive_name)
+                if str(archived.id) not in hot_ids:
+                    rows.append(archived)
+        return QueryWrapper(rows, sheet_name)
+
+    def query_range(self, model, start, end=None) -> QueryWrapper:
+        """Date-bounded query over a partitioned log sheet; only touches the months in range."""
+        from app.repositories.log_partitions import log_partitions
+        sheet_name = self._get_sheet_name(model)
+        raw_data = log_partitions.rows_between(sheet_name, start, end, include_deleted=True)
+        rows = [SheetRow(row, sheet_name, self) for row in raw_data]
         return QueryWrapper(rows, sheet_name)
 
     def add(self, obj):
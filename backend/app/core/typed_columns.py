@@ -0,0 +1,117 @@
+
+"""
+Typed shadow columns for cached sheet rows.
+Sheets hand every cell back as a string, and timestamps used to be re-parsed
+on every request (make_aware, month filters, report date matching). When a
+row is loaded or written, the repository stores the parsed form of its
+timestamp, date and numeric columns under `_typed`:
+
+    timestamp columns -> (epoch seconds or None, date ordinal or None)
+    date columns      -> date ordinal or None
+    numeric columns   -> int (0 when blank or unparseable)
+
+The date ordinal is the calendar date written in the value (every writer
+stores IST), so it agrees with the 'YYYY-MM-DD' prefix matching it replaces.
+Accessors fall back to parsing on the fly for rows without shadows.
+"""
+
+from datetime import datetime, date
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from app.core.time_utils import IST
+
+TIMESTAMP_COLUMNS = {
+    "created_at", "updated_at", "started_at", "completed_at", "actual_start_time",
+    "actual_end_time", "due_datetime", "expected_completion_time", "start_time",
+    "end_time", "timestamp", "hold_started_at", "hold_ended_at", "on_hold_at",
+    "resumed_at", "login_time", "logout_time", "archived_at",
+}
+DATE_COLUMNS = {"date", "due_date", "new_date"}
+INT_COLUMNS = {
+    "total_duration_seconds", "total_held_seconds", "duration_seconds",
+    "total_active_duration", "quantity", "completed_quantity",
+}
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """ISO string -> IST-aware datetime (naive values are taken as IST), or None. Cached per distinct string."""
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=IST)
+    return dt.astimezone(IST)
+
+@lru_cache(maxsize=65536)
+def _written_day(value: str) -> Optional[int]:
+    """Ordinal of the 'YYYY-MM-DD' a value starts with, or None."""
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+def _text(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value).strip() if value is not None else ""
+
+def _int(value: Any) -> int:
+    try:
+        return int(float(value)) if value not in (None, "") else 0
+    except (TypeError, ValueError):
+        return 0
+
+def _shadow(column: str, value: Any) -> Any:
+    if column in INT_COLUMNS:
+        return _int(value)
+    text = _text(value)
+    if not text:
+        return (None, None) if column in TIMESTAMP_COLUMNS else None
+    if column in DATE_COLUMNS:
+        return _written_day(text)
+    dt = parse_timestamp(text)
+    return (dt.timestamp() if dt else None, _written_day(text))
+
+def annotate(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Computes the row's `_typed` shadows in place (called by the repository on load / write)."""
+    row["_typed"] = {
+        k: _shadow(k, v) for k, v in row.items()
+        if k in TIMESTAMP_COLUMNS or k in DATE_COLUMNS or k in INT_COLUMNS
+    }
+    return row
+
+def _lookup(row: Any, column: str) -> Any:
+    data = getattr(row, "_data", row) # SheetRow or raw dict
+    typed = data.get("_typed")
+    if typed is not None and column in typed:
+        return typed[column]
+    return _shadow(column, data.get(column))
+
+def epoch(row: Any, column: str) -> Optional[float]:
+    """Epoch seconds of a timestamp column, or None."""
+    value = _lookup(row, column)
+    return value[0] if isinstance(value, tuple) else None
+
+def day_ordinal(row: Any, column: str) -> Optional[int]:
+    """Date ordinal of a timestamp or date column, or None."""
+    value = _lookup(row, column)
+    return value[1] if isinstance(value, tuple) else value
+
+def int_value(row: Any, column: str) -> int:
+    """Integer value of a numeric column (0 when blank or unparseable)."""
+    value = _lookup(row, column)
+    return value if isinstance(value, int) else _int(value)
+
+def month_bounds(year: int, month: int) -> Tuple[int, int]:
+    """(first, last) date ordinals of a month, for range checks against day_ordinal()."""
+    first = date(year, month, 1)
+    following = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return first.toordinal(), following.toordinal() - 1
+
+def in_month(row: Any, column: str, year: int, month: int) -> bool:
+    day = day_ordinal(row, column)
+    if day is None:
+        return False
+    first, last = month_bounds(year, month)
+    return first <= day <= last
@@ -3,6 +3,9 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import CORS_ORIGINS
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.core.etag import ETagMiddleware
+from app.core.compression import CompressionMiddleware
 from app.routers import (
     auth_router, users_router, tasks_router, projects_router,
     attendance_router, machines_routers, operational_tasks_router,
@@ -11,7 +14,8 @@ from app.routers import (
     reports_router, analytics_router, operator_router,
     seed_router, subtasks_router, outsource_router,
     machine_categories_router, units_router, user_skills_router,
-    health_router
+    health_router, events_router, sync_router,
+    work_orders_router
 )
 
 from fastapi import FastAPI, Request
@@ -46,6 +50,13 @@ async def global_exception_handler(request: Request, exc: Exception):
         }
     )
 
+# Conditional GETs (ETag / 304) for the polled endpoints.
+# Registered before CORS so that 304 responses still get CORS headers.
+app.add_middleware(ETagMiddleware)
+
+# gzip / brotli for large JSON and CSV bodies (threshold: COMPRESSION_MIN_SIZE)
+app.add_middleware(CompressionMiddleware)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -53,6 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Include Routers
@@ -79,6 +91,9 @@ app.include_router(machine_categories_router.router)
 app.include_router(units_router.router)
 app.include_router(user_skills_router.router)
 app.include_router(health_router.router)
+app.include_router(events_router.router)
+app.include_router(sync_router.router)
+app.include_router(work_orders_router.router)
 
 @app.get("/")
 async def root():
@@ -95,6 +110,9 @@ async def startup_event():
         from app.core.sheets_db import verify_sheets_structure
         verify_sheets_structure()
         print("✅ [Startup] Google Sheets initialization complete.")
+
+        from app.services.archive_service import start_archival_scheduler
+        start_archival_scheduler()
     except Exception as e:
         print(f"🛑 [Startup] CRITICAL FAILURE: {e}")
         # We don't raise here to allow the app to start (partially) for debugging, 
@@ -0,0 +1,150 @@
+
+"""
+Monotonic change log for delta sync.
+Every insert, update and delete on the synced sheets (the three task sheets and
+the task / work logs) gets a sequence number, whether it was written through the
+repository or picked up when a reload found the sheet changed. Clients keep the
+last sequence they saw and ask for what changed since, so a sync costs work
+proportional to the number of changes rather than to the size of the sheets.
+
+Sequences start at the boot time in milliseconds, so a cursor handed out by an
+earlier process is always older than anything this process logged and simply
+triggers a full resync.
+"""
+
+import time
+import threading
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple, Set
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.utils.sheet_rows import clean, id_column
+
+TASK_SHEETS = ("tasks", "filingtasks", "fabricationtasks")
+LOG_SHEETS = ("tasktimelog", "taskhold", "machineruntimelog", "userworklog")
+SYNC_SHEETS = TASK_SHEETS + LOG_SHEETS
+
+MAX_ENTRIES = 20000 # Older entries are dropped; cursors before them get a full resync
+
+def row_key(sheet_name: str, row: Dict[str, Any]) -> str:
+    return clean(row.get(id_column(sheet_name)))
+
+def owner_ref(sheet_name: str, row: Dict[str, Any]) -> str:
+    """
+    Who a row belongs to: a user id, or "task:<id>" for logs that only name
+    their task (resolved to the task's assignee when a client syncs).
+    """
+    if sheet_name in TASK_SHEETS:
+        return clean(row.get("assigned_to"))
+    if sheet_name in ("userworklog", "taskhold"):
+        return clean(row.get("user_id"))
+    return "task:" + clean(row.get("task_id"))
+
+class ChangeLog(SheetIndex):
+    sheets = SYNC_SHEETS
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_seq = int(time.time() * 1000)
+        self._floor = self._next_seq # Cursors below this cannot be served incrementally
+        self._seqs = [] # Ascending sequence numbers, parallel to _entries
+        self._entries = [] # (sheet, key, owner refs)
+        self._known = {} # sheet -> {key: (_version, owner ref)}
+        self._rows = {} # sheet -> {key: live cached row}
+
+    # --- Maintenance (called by the repository) ---
+
+    def _log(self, sheet_name: str, key: str, owners: Set[str]):
+        # Caller holds the lock
+        self._next_seq += 1
+        self._seqs.append(self._next_seq)
+        self._entries.append((sheet_name, key, frozenset(o for o in owners if o)))
+        if len(self._seqs) > MAX_ENTRIES:
+            drop = len(self._seqs) - MAX_ENTRIES
+            self._floor = self._seqs[drop - 1]
+            del self._seqs[:drop]
+            del self._entries[:drop]
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        if not rows:
+            # Cache cleared: keep the last known state so the reload is diffed against it
+            return
+        known, live = {}, {}
+        for row in rows:
+            key = row_key(sheet_name, row)
+            if key:
+                known[key] = (row.get("_version"), owner_ref(sheet_name, row))
+                live[key] = row
+        with self._lock:
+            previous = self._known.get(sheet_name)
+            self._known[sheet_name] = known
+            self._rows[sheet_name] = live
+            if previous is None:
+                return # First load is the baseline
+            for key, (version, owner) in known.items():
+                old = previous.get(key)
+                if old is None or old[0] != version:
+                    self._log(sheet_name, key, {owner, old[1] if old else ""})
+            for key, (_, owner) in previous.items():
+                if key not in known:
+                    self._log(sheet_name, key, {owner})
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            known = self._known.setdefault(sheet_name, {})
+            live = self._rows.setdefault(sheet_name, {})
+            owners = set()
+            if old_row is not None:
+                old_key = row_key(sheet_name, old_row)
+                owners.add(owner_ref(sheet_name, old_row))
+                if new_row is None or row_key(sheet_name, new_row) != old_key:
+                    known.pop(old_key, None)
+                    live.pop(old_key, None)
+                    if old_key:
+                        self._log(sheet_name, old_key, owners)
+            if new_row is not None:
+                new_key = row_key(sheet_name, new_row)
+                if new_key:
+                    owners.add(owner_ref(sheet_name, new_row))
+                    known[new_key] = (new_row.get("_version"), owner_ref(sheet_name, new_row))
+                    live[new_key] = new_row
+                    self._log(sheet_name, new_key, owners)
+
+    # --- Queries ---
+
+    def current_seq(self) -> int:
+        with self._lock:
+            return self._next_seq
+
+    def changes_since(self, since: int, sheet_names: Tuple[str, ...] = SYNC_SHEETS) -> Optional[Dict[str, Dict[str, Tuple[frozenset, Optional[Dict[str, Any]]]]]]:
+        """
+        {sheet: {key: (owner refs, live row or None if deleted)}} for every row
+        changed after `since`, or None when `since` predates the retained log
+        (the client must resync from scratch).
+        """
+        for sheet_name in sheet_names:
+            # Loading / revalidating the cache logs anything that changed in the sheet
+            sheets_repo.get_cached_records(sheet_name)
+        with self._lock:
+            if since < self._floor or since > self._next_seq:
+                return None
+            start = bisect_right(self._seqs, since)
+            changed = {}
+            for sheet_name, key, owners in self._entries[start:]:
+                if sheet_name not in sheet_names:
+                    continue
+                previous = changed.setdefault(sheet_name, {}).get(key, (frozenset(), None))[0]
+                changed[sheet_name][key] = (previous | owners, None)
+            for sheet_name, keys in changed.items():
+                live = self._rows.get(sheet_name, {})
+                for key, (owners, _) in keys.items():
+                    keys[key] = (owners, live.get(key))
+            return changed
+
+    def current_rows(self, sheet_name: str) -> List[Dict[str, Any]]:
+        """All live rows of a synced sheet (for a full resync). Rows must not be mutated."""
+        sheets_repo.get_cached_records(sheet_name)
+        with self._lock:
+            return list(self._rows.get(sheet_name, {}).values())
+
+# Singleton instance
+change_log = sheets_repo.register_index(ChangeLog())
@@ -0,0 +1,204 @@
+
+"""
+Daily rollups of machine runtime and operator work time.
+The daily / weekly / monthly machine and operator reports only need per-day
+totals: runtime and sessions per machine, work time, sessions and machines
+per operator, completed tasks, and whether a session is still open. The store
+keeps those totals per (day, machine) and (day, operator), plus the all-time
+runtime logged against each task (for /work-orders), updated from
+repository write events (opening and closing logs in the task / operator
+routers, completing tasks) and rebuilt from the raw rows whenever a sheet is
+reloaded, so a report reads one precomputed row per machine and day.
+"""
+
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from app.core.sheets_config import ARCHIVED_SHEETS, archive_sheet_name
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.repositories.task_completions import TASK_SHEETS, ARCHIVES, completion_day
+from app.utils.sheet_rows import clean, day_key, id_column, is_deleted
+
+LOG_SHEETS = ("machineruntimelog", "userworklog")
+
+def _seconds(value: Any) -> int:
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+class DailyRollupStore(SheetIndex):
+    sheets = LOG_SHEETS + TASK_SHEETS + tuple(ARCHIVES)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contrib = {} # sheet -> {_row_idx: contribution}, so updates subtract exactly what was added
+        self._machines = {} # day -> {machine_id: [runtime_seconds, sessions, open_sessions]}
+        self._users = {} # day -> {user_id: [work_seconds, sessions, open_sessions, Counter(machine_id)]}
+        self._completed = {} # day -> {(task sheet, task_id): {source sheet: (machine_id, user_id)}}
+        self._tasks = {} # task_id -> [runtime_seconds, sessions, open_sessions]
+
+    # --- Maintenance (called by the repository) ---
+
+    def _contribution(self, sheet_name: str, row: Dict[str, Any]) -> Optional[tuple]:
+        # Log rows count whether or not they are soft-deleted, like query_range()
+        if sheet_name == "machineruntimelog":
+            return (day_key(row.get("date")), clean(row.get("machine_id")), _seconds(row.get("duration_seconds")), not clean(row.get("end_time")), clean(row.get("task_id")))
+        if sheet_name == "userworklog":
+            return (day_key(row.get("date")), clean(row.get("user_id")), _seconds(row.get("duration_seconds")), not clean(row.get("end_time")), clean(row.get("machine_id")))
+        day = completion_day(row)
+        if not day or is_deleted(row) or clean(row.get("status")).lower() != "completed":
+            return None
+        task_sheet = ARCHIVES.get(sheet_name, sheet_name)
+        return (day, (task_sheet, clean(row.get(id_column(sheet_name)))), clean(row.get("machine_id")), clean(row.get("assigned_to")))
+
+    def _add(self, sheet_name: str, c: tuple, sign: int):
+        # Caller holds the lock
+        if sheet_name == "machineruntimelog":
+            day, machine_id, seconds, is_open, task_id = c
+            cell = self._machines.setdefault(day, {}).setdefault(machine_id, [0, 0, 0])
+            cell[0] += sign * seconds
+            cell[1] += sign
+            cell[2] += sign * int(is_open)
+            if cell[1] <= 0:
+                del self._machines[day][machine_id]
+            if task_id:
+                cell = self._tasks.setdefault(task_id, [0, 0, 0])
+                cell[0] += sign * seconds
+                cell[1] += sign
+                cell[2] += sign * int(is_open)
+                if cell[1] <= 0:
+                    del self._tasks[task_id]
+        elif sheet_name == "userworklog":
+            day, user_id, seconds, is_open, machine_id = c
+            cell = self._users.setdefault(day, {}).setdefault(user_id, [0, 0, 0, Counter()])
+            cell[0] += sign * seconds
+            cell[1] += sign
+            cell[2] += sign * int(is_open)
+            if machine_id:
+                cell[3][machine_id] += sign
+                if cell[3][machine_id] <= 0:
+                    del cell[3][machine_id]
+            if cell[1] <= 0:
+                del self._users[day][user_id]
+        else:
+            day, task_key, machine_id, user_id = c
+            sources = self._completed.setdefault(day, {}).setdefault(task_key, {})
+            if sign > 0:
+                sources[sheet_name] = (machine_id, user_id)
+            else:
+                sources.pop(sheet_name, None)
+                if not sources:
+                    del self._completed[day][task_key]
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        contrib = {}
+        for row in rows:
+            c = self._contribution(sheet_name, row)
+            if c is not None:
+                contrib[row.get("_row_idx")] = c
+        with self._lock:
+            for c in self._contrib.get(sheet_name, {}).values():
+                self._add(sheet_name, c, -1)
+            for c in contrib.values():
+                self._add(sheet_name, c, 1)
+            self._contrib[sheet_name] = contrib
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            contrib = self._contrib.setdefault(sheet_name, {})
+            if old_row is not None:
+                c = contrib.pop(old_row.get("_row_idx"), None)
+                if c is not None:
+                    self._add(sheet_name, c, -1)
+            if new_row is not None:
+                c = self._contribution(sheet_name, new_row)
+                if c is not None:
+                    contrib[new_row.get("_row_idx")] = c
+                    self._add(sheet_name, c, 1)
+
+    def recompute(self) -> Dict[str, int]:
+        """Rebuilds every loaded sheet's share from its raw cached rows. Returns rows scanned per sheet."""
+        scanned = {}
+        for sheet_name in self.sheets:
+            if sheet_name in ARCHIVES and sheet_name not in self._contrib:
+                continue # Archives are only loaded for old periods
+            rows = sheets_repo.get_cached_records(sheet_name)
+            self.rebuild(sheet_name, rows)
+            scanned[sheet_name] = len(rows)
+        return scanned
+
+    # --- Queries ---
+
+    def _ensure_fresh(self, start: date, include_archive: bool):
+        sheet_names = LOG_SHEETS + TASK_SHEETS
+        if include_archive:
+            sheet_names += tuple(archive_sheet_name(s) for s in ARCHIVED_SHEETS)
+        for sheet_name in sheet_names:
+            # Loads / revalidates the cache, and with it the rollups
+            sheets_repo.get_cached_records(sheet_name)
+
+    @staticmethod
+    def _days(start: date, end: date):
+        day = start
+        while day <= end:
+            yield day.isoformat()
+            day += timedelta(days=1)
+
+    def _completions(self, day: str) -> List[Tuple[str, str]]:
+        # Caller holds the lock. One count per task; the hot copy wins over an archived one
+        result = []
+        for (task_sheet, _), sources in self._completed.get(day, {}).items():
+            result.append(sources.get(task_sheet) or next(iter(sources.values())))
+        return result
+
+    def machine_totals(self, start: date, end: Optional[date] = None, include_archive: bool = False) -> Dict[str, Dict[str, Any]]:
+        """{machine_id: {runtime_seconds, sessions, running_now, completed_tasks}} summed over [start, end]."""
+        end = end or start
+        self._ensure_fresh(start, include_archive)
+        totals = {}
+        with self._lock:
+            for day in self._days(start, end):
+                for machine_id, (seconds, sessions, open_sessions) in self._machines.get(day, {}).items():
+                    t = totals.setdefault(machine_id, {"runtime_seconds": 0, "sessions": 0, "running_now": False, "completed_tasks": 0})
+                    t["runtime_seconds"] += seconds
+                    t["sessions"] += sessions
+                    t["running_now"] = t["running_now"] or open_sessions > 0
+                for machine_id, _ in self._completions(day):
+                    t = totals.setdefault(machine_id, {"runtime_seconds": 0, "sessions": 0, "running_now": False, "completed_tasks": 0})
+                    t["completed_tasks"] += 1
+        return totals
+
+    def user_totals(self, start: date, end: Optional[date] = None, include_archive: bool = False) -> Dict[str, Dict[str, Any]]:
+        """{user_id: {work_seconds, sessions, working_now, machine_ids, completed_tasks}} summed over [start, end]."""
+        end = end or start
+        self._ensure_fresh(start, include_archive)
+        totals = {}
+        def entry(user_id):
+            return totals.setdefault(user_id, {"work_seconds": 0, "sessions": 0, "working_now": False, "machine_ids": set(), "completed_tasks": 0})
+        with self._lock:
+            for day in self._days(start, end):
+                for user_id, (seconds, sessions, open_sessions, machines) in self._users.get(day, {}).items():
+                    t = entry(user_id)
+                    t["work_seconds"] += seconds
+                    t["sessions"] += sessions
+                    t["working_now"] = t["working_now"] or open_sessions > 0
+                    t["machine_ids"].update(machines)
+                for _, user_id in self._completions(day):
+                    entry(user_id)["completed_tasks"] += 1
+        return totals
+
+    def task_runtime(self, task_ids) -> Dict[str, Dict[str, Any]]:
+        """{task_id: {runtime_seconds, sessions, running_now}} from the machine runtime log, for the given ids."""
+        # Loads / revalidates the log, and with it the totals
+        sheets_repo.get_cached_records("machineruntimelog")
+        totals = {}
+        with self._lock:
+            for task_id in task_ids:
+                seconds, sessions, open_sessions = self._tasks.get(clean(task_id), (0, 0, 0))
+                totals[task_id] = {"runtime_seconds": seconds, "sessions": sessions, "running_now": open_sessions > 0}
+        return totals
+
+# Singleton instance
+daily_rollups = sheets_repo.register_index(DailyRollupStore())
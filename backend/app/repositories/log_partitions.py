@@ -0,0 +1,91 @@
+
+"""
+Monthly partition map for the append-only log sheets.
+Reports ask for a single day or a date range; instead of scanning every log row
+ever written we bucket rows by 'YYYY-MM' once per load and keep the buckets in
+sync with repository writes.
+"""
+
+import threading
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Union
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.utils.sheet_rows import day_key, month_keys
+
+# Log sheet -> column holding the date (or timestamp) the row belongs to
+PARTITIONED_SHEETS = {
+    "machineruntimelog": "date",
+    "userworklog": "date",
+    "tasktimelog": "timestamp",
+}
+
+DateLike = Union[date, datetime, str]
+
+class LogPartitionIndex(SheetIndex):
+    sheets = tuple(PARTITIONED_SHEETS.keys())
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._partitions = {} # sheet -> {"YYYY-MM": [row, ...]}
+
+    def _month_of(self, sheet_name: str, row: Dict[str, Any]) -> str:
+        return day_key(row.get(PARTITIONED_SHEETS[sheet_name]))[:7]
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        buckets = {}
+        for row in rows:
+            buckets.setdefault(self._month_of(sheet_name, row), []).append(row)
+        with self._lock:
+            self._partitions[sheet_name] = buckets
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            buckets = self._partitions.setdefault(sheet_name, {})
+            if old_row is not None:
+                old_key = self._month_of(sheet_name, old_row)
+                if new_row is not None and old_key == self._month_of(sheet_name, new_row):
+                    return # Updated in place, bucket unchanged
+                bucket = buckets.get(old_key, [])
+                row_idx = old_row.get("_row_idx")
+                buckets[old_key] = [r for r in bucket if r is not new_row and r.get("_row_idx") != row_idx]
+            if new_row is not None:
+                buckets.setdefault(self._month_of(sheet_name, new_row), []).append(new_row)
+
+    def rows_between(
+        self,
+        sheet_name: str,
+        start: DateLike,
+        end: Optional[DateLike] = None,
+        include_deleted: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns copies of the rows whose date falls in [start, end] (inclusive).
+        Only the monthly buckets overlapping the range are touched.
+        """
+        if sheet_name not in PARTITIONED_SHEETS:
+            raise ValueError(f"Sheet '{sheet_name}' is not partitioned by date")
+
+        # Make sure the cache (and therefore the partitions) is loaded and fresh
+        sheets_repo.get_cached_records(sheet_name)
+
+        start_key = day_key(start)
+        end_key = day_key(end) if end else start_key
+        if not start_key or not end_key or end_key < start_key:
+            return []
+
+        date_col = PARTITIONED_SHEETS[sheet_name]
+        with self._lock:
+            buckets = self._partitions.get(sheet_name, {})
+            candidates = [row for key in month_keys(start_key, end_key) for row in buckets.get(key, [])]
+
+        result = []
+        for row in candidates:
+            if not (start_key <= day_key(row.get(date_col)) <= end_key):
+                continue
+            if not include_deleted and str(row.get("is_deleted", "")).upper() in ["TRUE", "1", "YES"]:
+                continue
+            result.append(dict(row))
+        return result
+
+# Singleton instance
+log_partitions = sheets_repo.register_index(LogPartitionIndex())
@@ -0,0 +1,80 @@
+
+"""
+Per-row-version cache of normalizer output for task and user rows.
+normalize_task_row / normalize_user_row build a fresh dict through dozens of
+safe_* conversions, and the operator, supervisor, operational-task, sync and
+user endpoints ran them over every row on every request. Results are kept per
+(sheet, _row_idx) together with the row `_version` and normalizer they were
+built from: a write or reload stamps a new version, so each row is normalized
+once per change. Callers get a shallow copy they are free to enrich.
+"""
+
+import threading
+from typing import List, Dict, Any, Optional, Callable, Iterable
+from app.core.normalizer import safe_normalize_list
+from app.core.sheets_db import SheetRow
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.repositories.task_order import TASK_SHEETS
+
+_MISSING = object()
+
+class NormalizedRowCache(SheetIndex):
+    sheets = TASK_SHEETS + ("users",)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {} # (sheet, _row_idx) -> (_version, normalizer, row_type, normalized dict or None)
+
+    # --- Maintenance (called by the repository) ---
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        # Entries are checked against the row version, so only vanished rows need dropping
+        live = {row.get("_row_idx") for row in rows}
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == sheet_name and k[1] not in live]:
+                del self._entries[key]
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            if old_row is not None:
+                self._entries.pop((sheet_name, old_row.get("_row_idx")), None)
+            if new_row is not None:
+                self._entries.pop((sheet_name, new_row.get("_row_idx")), None)
+
+    # --- Reads ---
+
+    def _normalize_one(self, sheet_name: str, raw: Dict[str, Any], plain: Callable[[], Dict[str, Any]], normalizer_func: Callable, row_type: str) -> Optional[Dict[str, Any]]:
+        key = (sheet_name, raw.get("_row_idx"))
+        version = raw.get("_version")
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+        if entry is not _MISSING and version is not None and entry[:3] == (version, normalizer_func, row_type):
+            normalized = entry[3]
+        else:
+            result = safe_normalize_list([plain()], normalizer_func, row_type)
+            normalized = result[0] if result else None
+            if version is not None:
+                with self._lock:
+                    self._entries[key] = (version, normalizer_func, row_type, normalized)
+        return dict(normalized) if normalized is not None else None
+
+    def normalize(self, rows: Iterable[Any], normalizer_func: Callable, row_type: str = "task", sheet_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        safe_normalize_list() over SheetRow objects (or raw cached rows of
+        `sheet_name`), served from the cache while the row version is unchanged.
+        Rows with uncommitted edits, or without a version, are normalized directly.
+        """
+        normalized = []
+        for row in rows:
+            if not isinstance(row, SheetRow):
+                row = SheetRow(row, sheet_name)
+            if row._dirty_fields or row._name not in self.sheets:
+                normalized.extend(safe_normalize_list([row.dict()], normalizer_func, row_type))
+                continue
+            n = self._normalize_one(row._name, row._data, row.dict, normalizer_func, row_type)
+            if n is not None:
+                normalized.append(n)
+        return normalized
+
+# Singleton instance
+normalized_rows = sheets_repo.register_index(NormalizedRowCache())
@@ -0,0 +1,115 @@
+
+"""
+Per-(year, month) completion counters for the general task sheet.
+/reports/monthly-performance and /analytics/production-trend bucket completed
+tasks by the month of `completed_at`. The counters below hold the completed
+count and total duration per month, updated from repository write events and
+rebuilt whenever the sheet (or its archive) is reloaded, so a year view reads
+twelve counters however much history the sheets hold.
+
+An archived row only counts while its task id is absent from the hot sheet,
+matching SheetsDB.query(include_archive=True).
+"""
+
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from app.core.sheets_config import archive_sheet_name
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.utils.sheet_rows import clean, is_deleted
+
+HOT_SHEET = "tasks"
+ARCHIVE_SHEET = archive_sheet_name(HOT_SHEET)
+
+def _contribution(row: Dict[str, Any]) -> Optional[Tuple[str, int, int]]:
+    """(year, month, duration seconds) a completed task adds, or None."""
+    if is_deleted(row):
+        return None
+    if clean(row.get("status")).lower() != "completed":
+        return None
+    completed_at = clean(row.get("completed_at"))
+    try:
+        month = int(completed_at.split("-")[1])
+    except (IndexError, ValueError):
+        return None
+    if not 1 <= month <= 12:
+        return None
+    try:
+        duration = int(row.get("total_duration_seconds") or 0)
+    except (TypeError, ValueError):
+        duration = 0 # Counted, without a duration (as the per-request scan did)
+    return completed_at[:4], month, duration
+
+class PerformanceRollups(SheetIndex):
+    sheets = (HOT_SHEET, ARCHIVE_SHEET)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {HOT_SHEET: {}, ARCHIVE_SHEET: {}} # sheet -> {_row_idx: (task_id, contribution)}
+        self._by_task = {} # task_id -> {sheet: {_row_idx: contribution}}
+        self._months = {} # (year, month) -> [completed, total_duration]
+
+    # --- Maintenance (called by the repository) ---
+
+    def _effective(self, task_id: str) -> List[Tuple[str, int, int]]:
+        # Caller holds the lock. Hot rows shadow any archived copy of the same task
+        entry = self._by_task.get(task_id, {})
+        rows = entry.get(HOT_SHEET) or entry.get(ARCHIVE_SHEET) or {}
+        return [c for c in rows.values() if c is not None]
+
+    def _count(self, contributions: List[Tuple[str, int, int]], sign: int):
+        for year, month, duration in contributions:
+            cell = self._months.setdefault((year, month), [0, 0])
+            cell[0] += sign
+            cell[1] += sign * duration
+            if cell[0] <= 0:
+                del self._months[(year, month)]
+
+    def _set(self, sheet_name: str, row_idx: Any, task_id: Optional[str], contribution: Optional[tuple]):
+        """Replaces whatever row `row_idx` of `sheet_name` contributed. Caller holds the lock."""
+        previous = self._rows[sheet_name].pop(row_idx, None)
+        touched = {previous[0]} if previous else set()
+        if task_id is not None:
+            touched.add(task_id)
+        before = {t: self._effective(t) for t in touched}
+        if previous:
+            rows = self._by_task[previous[0]][sheet_name]
+            rows.pop(row_idx, None)
+            if not rows:
+                del self._by_task[previous[0]][sheet_name]
+            if not self._by_task[previous[0]]:
+                del self._by_task[previous[0]]
+        if task_id is not None:
+            self._rows[sheet_name][row_idx] = (task_id, contribution)
+            self._by_task.setdefault(task_id, {}).setdefault(sheet_name, {})[row_idx] = contribution
+        for t in touched:
+            self._count(before[t], -1)
+            self._count(self._effective(t), 1)
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        with self._lock:
+            for row_idx in list(self._rows[sheet_name]):
+                self._set(sheet_name, row_idx, None, None)
+            for row in rows:
+                self._set(sheet_name, row.get("_row_idx"), clean(row.get("task_id")), _contribution(row))
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            if old_row is not None and (new_row is None or new_row.get("_row_idx") != old_row.get("_row_idx")):
+                self._set(sheet_name, old_row.get("_row_idx"), None, None)
+            if new_row is not None:
+                self._set(sheet_name, new_row.get("_row_idx"), clean(new_row.get("task_id")), _contribution(new_row))
+
+    # --- Queries ---
+
+    def year(self, year: int, include_archive: bool = False) -> Dict[int, Tuple[int, int]]:
+        """{month: (completed, total duration seconds)} for months 1-12 of `year`."""
+        # Loads / revalidates the cache, and with it the counters
+        sheets_repo.get_cached_records(HOT_SHEET)
+        if include_archive:
+            sheets_repo.get_cached_records(ARCHIVE_SHEET)
+        key = str(year)
+        with self._lock:
+            return {m: tuple(self._months.get((key, m), (0, 0))) for m in range(1, 13)}
+
+# Singleton instance
+performance_rollups = sheets_repo.register_index(PerformanceRollups())
@@ -1,11 +1,14 @@
 
 import time
 import uuid
+import itertools
 import threading
-from typing import List, Dict, Any, Optional
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Iterable
 from app.services.google_sheets import google_sheets
 from app.core.time_utils import get_current_time_ist
 from app.core.sheets_config import normalize_row
+from app.core.typed_columns import annotate
 
 # Global cache to persist across requests but within process
 # Thread-safe dictionary-based cache
@@ -13,22 +16,128 @@ _GLOBAL_CACHE = {}
 _CACHE_EXPIRY = {}
 _RAW_HEADERS = {} # Store actual sheet headers for mapping
 _NO_CACHE = {} # Store timestamps for failed fetches
-_CACHE_LOCK = threading.Lock()
+_CACHE_LOCK = threading.RLock() # Re-entrant: clear_cache() is called while the lock is held
 _FETCH_LOCKS = {} # Thundering herd protection
 _FETCH_LOCKS_LOCK = threading.Lock()
 CACHE_TTL = 90  # Seconds (Freshness)
 STALE_TTL = 300 # Seconds (Serve stale while background refreshing)
 
+# Monotonic per-sheet versions. Bumped on every write and on reloads that changed
+# something, so derived structures (indexes, partitions, aggregates) know when
+# they are stale. Rows carry their own `_version` from the same sequence.
+_VERSION_SEQ = itertools.count(1)
+_SHEET_VERSIONS = {}
+_INDEXES = [] # Registered SheetIndex instances
+_INDEXES_LOCK = threading.Lock()
+
 def get_sheet_fetch_lock(sheet_name: str):
     with _FETCH_LOCKS_LOCK:
         if sheet_name not in _FETCH_LOCKS:
             _FETCH_LOCKS[sheet_name] = threading.Lock()
         return _FETCH_LOCKS[sheet_name]
 
+class SheetIndex(ABC):
+    """
+    Base class for in-memory structures derived from cached sheet rows.
+    Subclasses list the sheets they follow in `sheets` and get notified by the
+    repository whenever those sheets are reloaded or written.
+    """
+    sheets: tuple = ()
+
+    @abstractmethod
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        """Called with the full cached row list after a (re)load or cache clear."""
+
+    @abstractmethod
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        """
+        Called after a single row write. `old_row` is a snapshot taken before the
+        write (None for inserts), `new_row` is the live cached row (None for deletes).
+        """
+
+def _bump_version(sheet_name: str) -> int:
+    version = next(_VERSION_SEQ)
+    _SHEET_VERSIONS[sheet_name] = version
+    return version
+
+def _as_cell(value: Any) -> str:
+    """What a reload returns for a value the repository wrote (see GoogleSheetsService writes)."""
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return str(value)
+
+def _same_content(old: Dict[str, Any], row: Dict[str, Any]) -> bool:
+    # Written rows hold typed values (True, ints, datetimes) until the next reload brings back strings
+    return all(old.get(k) == v or (k in old and _as_cell(old[k]) == v) for k, v in row.items())
+
+def _stamp_rows(new_rows: List[Dict[str, Any]], old_rows: Optional[List[Dict[str, Any]]]) -> bool:
+    """
+    Gives every freshly loaded row a `_version` and its typed shadow columns
+    (see app/core/typed_columns.py). Rows whose content is unchanged since the
+    previous load keep their old version and shadows, so per-row derived data
+    (normalized/enriched projections) survives a routine cache refresh.
+    Returns True if anything differs from the previous load.
+    """
+    previous = {r.get("_row_idx"): r for r in (old_rows or [])}
+    changed = old_rows is None or len(old_rows) != len(new_rows)
+    for row in new_rows:
+        old = previous.get(row.get("_row_idx"))
+        if old is not None and "_version" in old and "_typed" in old and len(old) == len(row) + 2 and _same_content(old, row):
+            row["_version"] = old["_version"]
+            row["_typed"] = old["_typed"]
+        else:
+            row["_version"] = next(_VERSION_SEQ)
+            annotate(row)
+            changed = True
+    return changed
+
+def _listeners_for(sheet_name: str) -> List[SheetIndex]:
+    with _INDEXES_LOCK:
+        return [idx for idx in _INDEXES if sheet_name in idx.sheets]
+
+def _notify_rebuild(sheet_name: str, rows: List[Dict[str, Any]]):
+    for idx in _listeners_for(sheet_name):
+        try:
+            idx.rebuild(sheet_name, rows)
+        except Exception as e:
+            print(f"⚠️ [SheetsRepo] Index {type(idx).__name__} rebuild failed for {sheet_name}: {e}")
+
+def _notify_changes(sheet_name: str, changes: Iterable[tuple]):
+    listeners = _listeners_for(sheet_name)
+    if not listeners: return
+    changes = list(changes)
+    for idx in listeners:
+        for old_row, new_row in changes:
+            try:
+                idx.apply(sheet_name, old_row, new_row)
+            except Exception as e:
+                print(f"⚠️ [SheetsRepo] Index {type(idx).__name__} update failed for {sheet_name}: {e}")
+
 class SheetsRepository:
     def __init__(self):
         pass
 
+    def get_version(self, sheet_name: str) -> int:
+        """Returns the current version of a sheet's cached data (0 if never loaded)."""
+        return _SHEET_VERSIONS.get(sheet_name, 0)
+
+    def register_index(self, index: SheetIndex) -> SheetIndex:
+        """Registers a derived index and seeds it from any sheets already cached."""
+        with _INDEXES_LOCK:
+            if index not in _INDEXES:
+                _INDEXES.append(index)
+        for sheet_name in index.sheets:
+            with _CACHE_LOCK:
+                rows = _GLOBAL_CACHE.get(sheet_name)
+            if rows is not None:
+                try:
+                    index.rebuild(sheet_name, rows)
+                except Exception as e:
+                    print(f"⚠️ [SheetsRepo] Index {type(index).__name__} seed failed for {sheet_name}: {e}")
+        return index
+
     def _get_sheet_data(self, sheet_name: str, force_refresh: bool = False) -> List[Dict[str, Any]]:
         now = time.time()
         
@@ -91,16 +200,25 @@ class SheetsRepository:
                 batch_data = google_sheets.batch_get_all(sheets_to_bootstrap)
                 with _CACHE_LOCK:
                     for s_name, s_data in batch_data.items():
+                        changed = _stamp_rows(s_data, _GLOBAL_CACHE.get(s_name))
                         _GLOBAL_CACHE[s_name] = s_data
                         _CACHE_EXPIRY[s_name] = now + CACHE_TTL
                         self._extract_headers(s_name, s_data)
+                        if changed or s_name not in _SHEET_VERSIONS:
+                            _bump_version(s_name)
+                for s_name, s_data in batch_data.items():
+                    _notify_rebuild(s_name, s_data)
                 return _GLOBAL_CACHE.get(sheet_name, [])
 
             data = google_sheets.read_all_bulk(sheet_name)
             with _CACHE_LOCK:
+                changed = _stamp_rows(data, _GLOBAL_CACHE.get(sheet_name))
                 _GLOBAL_CACHE[sheet_name] = data
                 _CACHE_EXPIRY[sheet_name] = now + CACHE_TTL
                 self._extract_headers(sheet_name, data)
+                if changed or sheet_name not in _SHEET_VERSIONS:
+                    _bump_version(sheet_name)
+            _notify_rebuild(sheet_name, data)
             return data
         except Exception as e:
             print(f"❌ [SheetsRepo] Failed to fetch {sheet_name}: {e}")
@@ -118,6 +236,10 @@ class SheetsRepository:
         """Implementation of mandatory task: Reads entire worksheet from cache."""
         return self._get_sheet_data(sheet_name, force_refresh=False)
 
+    def refresh(self, sheet_name: str) -> List[Dict[str, Any]]:
+        """Re-reads a sheet from Sheets, bypassing the cache (for writers that must not act on stale rows)."""
+        return self._get_sheet_data(sheet_name, force_refresh=True)
+
     def get_headers(self, sheet_name: str) -> List[str]:
         """Returns normalized headers for the sheet."""
         # Using a fixed mapping or fetching from raw headers
@@ -166,6 +288,10 @@ class SheetsRepository:
         with _CACHE_LOCK:
             return list(_RAW_HEADERS.get(sheet_name, []))
 
+    def read_column(self, sheet_name: str, column: str) -> List[str]:
+        """Reads one column's values straight from the sheet, bypassing the cache."""
+        return list(google_sheets.read_column(sheet_name, column).values())
+
     def insert(self, sheet_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Inserts a new row, updates Sheets, and updates cache immediately."""
         headers = self.get_headers(sheet_name)
@@ -212,15 +338,21 @@ class SheetsRepository:
                 
                 data_with_idx = dict(data)
                 data_with_idx["_row_idx"] = max_idx + 1
+                data_with_idx["_version"] = next(_VERSION_SEQ)
+                annotate(data_with_idx)
                 # Add original headers mapping for consistency
                 for h, rh in zip(headers, raw_headers):
                     data_with_idx[f"_orig_{h}"] = rh
                     
                 _GLOBAL_CACHE[sheet_name].append(data_with_idx)
+                _bump_version(sheet_name)
                 print(f"✅ [SheetsRepo] Cache Updated (Insert): {sheet_name}")
             else:
+                data_with_idx = None
                 self.clear_cache(sheet_name)
         
+        if data_with_idx is not None:
+            _notify_changes(sheet_name, [(None, data_with_idx)])
         return data
 
     def update(self, sheet_name: str, id_value: Any, data: Dict[str, Any]) -> bool:
@@ -272,11 +404,20 @@ class SheetsRepository:
             raise RuntimeError(f"Failed to update record in Google Sheets ({sheet_name})")
 
         # 2. Update Cache immediately
+        changed = None
         with _CACHE_LOCK:
             if sheet_name in _GLOBAL_CACHE and cached_idx_in_list != -1:
+                live_row = _GLOBAL_CACHE[sheet_name][cached_idx_in_list]
+                before = dict(live_row)
                 for k, v in update_payload.items():
-                    _GLOBAL_CACHE[sheet_name][cached_idx_in_list][k] = v
+                    live_row[k] = v
+                live_row["_version"] = next(_VERSION_SEQ)
+                annotate(live_row)
+                _bump_version(sheet_name)
+                changed = (before, live_row)
                 print(f"✅ [SheetsRepo] Cache Updated (Update): {sheet_name} row {row_idx}")
+        if changed:
+            _notify_changes(sheet_name, [changed])
         return True
 
     def batch_append(self, sheet_name: str, rows: List[Dict[str, Any]]) -> bool:
@@ -290,6 +431,7 @@ class SheetsRepository:
         success = google_sheets.batch_append(sheet_name, rows, raw_headers)
         
         if success:
+            appended = []
             with _CACHE_LOCK:
                 if sheet_name in _GLOBAL_CACHE:
                     # Determine new row index start
@@ -302,18 +444,23 @@ class SheetsRepository:
                     for row_data in rows:
                         data_with_idx = dict(row_data)
                         data_with_idx["_row_idx"] = next_idx
+                        data_with_idx["_version"] = next(_VERSION_SEQ)
+                        annotate(data_with_idx)
                         # Add original headers mapping
                         for h, rh in zip(headers, raw_headers):
                             if rh: # Ensure we don't map empty headers
                                 data_with_idx[f"_orig_{h}"] = rh
                         
                         _GLOBAL_CACHE[sheet_name].append(data_with_idx)
+                        appended.append((None, data_with_idx))
                         next_idx += 1
                         
+                    _bump_version(sheet_name)
                     print(f"✅ [SheetsRepo] Cache Updated (Batch Append): {sheet_name} (+{len(rows)} rows)")
                 else:
                     # Cache empty, clear to force potential reload or leave empty
                     self.clear_cache(sheet_name)
+            _notify_changes(sheet_name, appended)
         return success
 
     def batch_update(self, sheet_name: str, updates: List[Dict[str, Any]]) -> bool:
@@ -329,6 +476,7 @@ class SheetsRepository:
             print(f"❌ [SheetsRepo] Batch update failed for {sheet_name}")
             raise RuntimeError(f"Failed to batch update records in Google Sheets ({sheet_name})")
             
+        changed = []
         with _CACHE_LOCK:
             if sheet_name in _GLOBAL_CACHE and _GLOBAL_CACHE[sheet_name]:
                 # Map rows by _row_idx for O(1) lookup
@@ -338,14 +486,20 @@ class SheetsRepository:
                 for i, row in enumerate(_GLOBAL_CACHE[sheet_name]):
                     r_idx = row.get("_row_idx")
                     if r_idx in updates_map:
+                        before = dict(row)
                         # Update fields
                         for k, v in updates_map[r_idx].items():
                             if k != "_row_idx":
                                 _GLOBAL_CACHE[sheet_name][i][k] = v
+                        row["_version"] = next(_VERSION_SEQ)
+                        annotate(row)
+                        changed.append((before, row))
                 
+                _bump_version(sheet_name)
                 print(f"✅ [SheetsRepo] Cache Updated (Batch Update): {sheet_name} ({len(updates)} rows)")
             else:
                 self.clear_cache(sheet_name)
+        _notify_changes(sheet_name, changed)
         return True
 
     def soft_delete(self, sheet_name: str, id_value: Any) -> bool:
@@ -366,6 +520,7 @@ class SheetsRepository:
         
         cached_idx_in_list = -1
         row_idx = -1
+        removed_row = None
         
         with _CACHE_LOCK:
             if sheet_name in _GLOBAL_CACHE:
@@ -373,6 +528,7 @@ class SheetsRepository:
                     if str(row.get(id_col)) == str(id_value):
                         row_idx = row.get("_row_idx", -1)
                         cached_idx_in_list = i
+                        removed_row = dict(row)
                         break
         
         if row_idx == -1: return False
@@ -382,21 +538,65 @@ class SheetsRepository:
         
         if success:
             # 2. Update Cache immediately - Removal requires re-index or clearing
+            _notify_changes(sheet_name, [(removed_row, None)])
             self.clear_cache(sheet_name)
             print(f"🗑️ [SheetsRepo] Hard deleted {id_value} from {sheet_name}. Cache cleared.")
         return success
 
+    def delete_rows(self, sheet_name: str, id_values: Iterable[Any]) -> int:
+        """Physically removes several rows in one Sheets call and resynchronizes cache."""
+        wanted = {str(v) for v in id_values if v}
+        if not wanted: return 0
+            
+        headers = self.get_headers(sheet_name)
+        id_col = "id"
+        if "id" not in headers:
+            for h in headers:
+                if h.endswith("_id"):
+                    id_col = h
+                    break
+        
+        with _CACHE_LOCK:
+            removed_rows = [dict(row) for row in _GLOBAL_CACHE.get(sheet_name, []) if str(row.get(id_col)) in wanted and row.get("_row_idx")]
+        
+        if not removed_rows: return 0
+
+        # Rows are deleted by position: make sure each position still holds the row
+        # we mean (the sheet may have been edited since the cache was loaded)
+        on_sheet = google_sheets.read_column(sheet_name, id_col)
+        moved = [r.get(id_col) for r in removed_rows if str(on_sheet.get(r["_row_idx"], "")) != str(r.get(id_col))]
+        if moved:
+            self.clear_cache(sheet_name)
+            raise RuntimeError(f"Rows of {sheet_name} moved since they were read ({len(moved)} mismatched ids); nothing deleted")
+
+        success = google_sheets.delete_rows_by_idx(sheet_name, [r["_row_idx"] for r in removed_rows])
+        if not success:
+            raise RuntimeError(f"Failed to delete records from Google Sheets ({sheet_name})")
+
+        # Row indices shift after a delete, so the cache is rebuilt from Sheets
+        _notify_changes(sheet_name, [(row, None) for row in removed_rows])
+        self.clear_cache(sheet_name)
+        print(f"🗑️ [SheetsRepo] Hard deleted {len(removed_rows)} rows from {sheet_name}. Cache cleared.")
+        return len(removed_rows)
+
     def clear_cache(self, sheet_name: Optional[str] = None):
         """Clears cache for one or all sheets."""
         with _CACHE_LOCK:
             if sheet_name:
+                cleared = [sheet_name]
                 if sheet_name in _GLOBAL_CACHE:
                     del _GLOBAL_CACHE[sheet_name]
                 if sheet_name in _CACHE_EXPIRY:
                     del _CACHE_EXPIRY[sheet_name]
             else:
+                cleared = list(_GLOBAL_CACHE.keys())
                 _GLOBAL_CACHE.clear()
                 _CACHE_EXPIRY.clear()
+            for s_name in cleared:
+                _bump_version(s_name)
+        # Derived indexes are emptied too; they are re-seeded on the next load
+        for s_name in cleared:
+            _notify_rebuild(s_name, [])
 
 # Singleton instance
 sheets_repo = SheetsRepository()
@@ -0,0 +1,288 @@
+
+"""
+Materialized dashboard aggregates.
+Admin, supervisor, planning and analytics dashboards all need the same numbers:
+task counts per (type, project, operator, machine, status, priority) plus machine,
+operator and project totals. Instead of each endpoint scanning the three task
+sheets, the store below keeps those counters up to date from repository write
+events and rebuilds a sheet's share whenever it is reloaded.
+
+Statuses are kept raw (lower-cased); every endpoint still applies its own
+status mapping on top of the grouped counts.
+
+The groups are also laid out column-wise (one slot per live group, an
+integer code per dimension value, and the slot's count) so dashboards can ask
+for counts grouped by a few dimensions with count_by() in one pass over the
+slots, without hashing TaskGroup tuples.
+"""
+
+import threading
+from array import array
+from collections import Counter, namedtuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+
+TASK_SHEETS = {"tasks": "general", "filingtasks": "filing", "fabricationtasks": "fabrication"}
+_TASK_RANK = {name: i for i, name in enumerate(TASK_SHEETS)}
+
+TaskGroup = namedtuple("TaskGroup", ["task_type", "project_id", "project", "assigned_to", "machine_id", "status", "priority"])
+
+def _field(row: Dict[str, Any], key: str, default: Any = "") -> Any:
+    """Reads a column the way SheetRow does (trimmed, default when the column is absent)."""
+    if key not in row:
+        return default
+    value = row[key]
+    return value.strip() if isinstance(value, str) else value
+
+def _flag(row: Dict[str, Any], key: str, default: bool) -> bool:
+    value = _field(row, key, default)
+    if isinstance(value, str):
+        low = value.lower()
+        if low in ["true", "1", "yes"]: return True
+        if low in ["false", "0", "no", ""]: return False
+    return bool(value)
+
+def _task_group(sheet_name: str, row: Dict[str, Any]) -> TaskGroup:
+    return TaskGroup(
+        task_type=TASK_SHEETS[sheet_name],
+        project_id=str(_field(row, "project_id")),
+        project=str(_field(row, "project")),
+        assigned_to=str(_field(row, "assigned_to")),
+        machine_id=str(_field(row, "machine_id")),
+        status=str(_field(row, "status", "pending")).lower().strip(),
+        priority=str(_field(row, "priority")).upper().strip(),
+    )
+
+class _GroupColumns:
+    """
+    Columnar view of the task group counts. Every live TaskGroup has a slot;
+    each field is stored as a categorical code (index into `values[field]`)
+    and the slot's count is updated in place. A slot whose count drops to zero
+    is freed and handed to the next new group, so the columns stay as long as
+    the peak number of live groups. Caller holds the store lock.
+    """
+
+    def __init__(self):
+        self.values = {f: [] for f in TaskGroup._fields} # field -> code -> value
+        self._code_of = {f: {} for f in TaskGroup._fields} # field -> value -> code
+        self.codes = {f: array("q") for f in TaskGroup._fields} # field -> code per slot
+        self.counts = array("q") # count per slot
+        self._slot_of = {} # TaskGroup -> slot
+        self._free = [] # slots with a zero count, ready for reuse
+
+    def code(self, field: str, value: Any) -> Optional[int]:
+        return self._code_of[field].get(value)
+
+    def add(self, group: TaskGroup, count: int):
+        slot = self._slot_of.get(group)
+        if slot is None:
+            if not count:
+                return
+            reuse = bool(self._free)
+            slot = self._slot_of[group] = self._free.pop() if reuse else len(self.counts)
+            for field, value in zip(TaskGroup._fields, group):
+                codes = self._code_of[field]
+                if value not in codes:
+                    codes[value] = len(self.values[field])
+                    self.values[field].append(value)
+                if reuse:
+                    self.codes[field][slot] = codes[value]
+                else:
+                    self.codes[field].append(codes[value])
+            if not reuse:
+                self.counts.append(0)
+        self.counts[slot] += count
+        if self.counts[slot] == 0:
+            del self._slot_of[group]
+            self._free.append(slot)
+
+class TaskAggregateStore(SheetIndex):
+    sheets = tuple(TASK_SHEETS) + ("machines", "users", "projects")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks = {} # sheet -> Counter[TaskGroup]
+        self._running = {} # sheet -> {operator_id: {_row_idx: (project_id, project, title)}}
+        self._totals = {} # sheet -> Counter (machines / users / projects)
+        self._columns = _GroupColumns() # all task sheets, column-wise
+
+    # --- Maintenance (called by the repository) ---
+
+    def _contribute(self, sheet_name: str, row: Dict[str, Any], sign: int):
+        if _flag(row, "is_deleted", False):
+            return
+
+        if sheet_name in TASK_SHEETS:
+            group = _task_group(sheet_name, row)
+            counts = self._tasks.setdefault(sheet_name, Counter())
+            counts[group] += sign
+            self._columns.add(group, sign)
+            if counts[group] <= 0:
+                del counts[group]
+
+            if group.status in ("in_progress", "running"):
+                running = self._running.setdefault(sheet_name, {}).setdefault(group.assigned_to, {})
+                if sign > 0:
+                    running[row.get("_row_idx")] = (group.project_id, group.project, _field(row, "title"))
+                else:
+                    running.pop(row.get("_row_idx"), None)
+            return
+
+        totals = self._totals.setdefault(sheet_name, Counter())
+        totals["total"] += sign
+        if sheet_name == "machines":
+            if str(_field(row, "status", "active")).lower() in ("active", "running"):
+                totals["active"] += sign
+        elif sheet_name == "users":
+            if str(_field(row, "role", "operator")).lower() == "operator":
+                totals["operators"] += sign
+        elif sheet_name == "projects":
+            totals["id:" + str(_field(row, "project_id"))] += sign
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        with self._lock:
+            for group, count in self._tasks.pop(sheet_name, {}).items():
+                self._columns.add(group, -count)
+            self._running.pop(sheet_name, None)
+            self._totals.pop(sheet_name, None)
+            for row in rows:
+                self._contribute(sheet_name, row, 1)
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            if old_row is not None:
+                self._contribute(sheet_name, old_row, -1)
+            if new_row is not None:
+                self._contribute(sheet_name, new_row, 1)
+
+    # --- Queries ---
+
+    def _ensure_fresh(self, *sheet_names: str):
+        # Loading (or revalidating) the cache rebuilds our counters when needed
+        for sheet_name in sheet_names:
+            sheets_repo.get_cached_records(sheet_name)
+
+    def task_groups(
+        self,
+        project: Optional[str] = None,
+        operator_id: Optional[str] = None,
+        match_project_name: bool = False
+    ) -> List[Tuple[TaskGroup, int]]:
+        """
+        Non-deleted task counts across all task sheets, grouped by TaskGroup.
+        `project` matches project_id (and the free-text project column when
+        match_project_name is set); "all" or None disables a filter.
+        """
+        self._ensure_fresh(*TASK_SHEETS)
+        project = str(project) if project and project != "all" else None
+        operator_id = str(operator_id) if operator_id and operator_id != "all" else None
+
+        with self._lock:
+            groups = [item for sheet_name in TASK_SHEETS for item in self._tasks.get(sheet_name, {}).items()]
+
+        result = []
+        for group, count in groups:
+            if project is not None and group.project_id != project and not (match_project_name and group.project == project):
+                continue
+            if operator_id is not None and group.assigned_to != operator_id:
+                continue
+            result.append((group, count))
+        return result
+
+    def _filter_codes(self, project: Optional[str], operator_id: Optional[str], match_project_name: bool) -> Optional[Tuple]:
+        """Codes for the filters, or None when a filter value never occurs. Caller holds the lock."""
+        columns = self._columns
+        project_codes = None
+        if project is not None:
+            project_codes = (columns.code("project_id", project), columns.code("project", project) if match_project_name else None)
+            if project_codes == (None, None):
+                return None
+        operator_code = None
+        if operator_id is not None:
+            operator_code = columns.code("assigned_to", operator_id)
+            if operator_code is None:
+                return None
+        return project_codes, operator_code
+
+    def _count_slots(self, by: Tuple[str, ...], project_codes, operator_code) -> List[Tuple[Tuple[int, ...], int]]:
+        # Caller holds the lock
+        columns = self._columns
+        id_code, name_code = project_codes if project_codes is not None else (None, None)
+        result = Counter()
+        for slot, count in enumerate(columns.counts):
+            if count <= 0:
+                continue
+            if project_codes is not None and columns.codes["project_id"][slot] != id_code and columns.codes["project"][slot] != name_code:
+                continue
+            if operator_code is not None and columns.codes["assigned_to"][slot] != operator_code:
+                continue
+            result[tuple(columns.codes[f][slot] for f in by)] += count
+        return list(result.items())
+
+    def count_by(
+        self,
+        by: Iterable[str],
+        project: Optional[str] = None,
+        operator_id: Optional[str] = None,
+        match_project_name: bool = False
+    ) -> Dict[Tuple, int]:
+        """
+        Non-deleted task counts across all task sheets grouped by the given
+        TaskGroup fields: {(value, ...): count}. Filters as in task_groups().
+        """
+        by = tuple(by)
+        self._ensure_fresh(*TASK_SHEETS)
+        project = str(project) if project and project != "all" else None
+        operator_id = str(operator_id) if operator_id and operator_id != "all" else None
+
+        with self._lock:
+            filters = self._filter_codes(project, operator_id, match_project_name)
+            if filters is None:
+                return {}
+            counted = self._count_slots(by, *filters)
+            values = [self._columns.values[f] for f in by]
+        return {tuple(v[c] for v, c in zip(values, codes)): count for codes, count in counted}
+
+    def status_counts(self, **filters) -> Counter:
+        """Raw (lower-cased) status -> count, with the same filters as task_groups."""
+        return Counter({key[0]: count for key, count in self.count_by(("status",), **filters).items()})
+
+    def task_total(self) -> int:
+        return sum(self.count_by(()).values())
+
+    def running_task_title(self, operator_id: str, project: Optional[str] = None, match_project_name: bool = False) -> Optional[str]:
+        """Title of the first in-progress task (in sheet order) assigned to an operator."""
+        self._ensure_fresh(*TASK_SHEETS)
+        project = str(project) if project and project != "all" else None
+        with self._lock:
+            for sheet_name in TASK_SHEETS:
+                running = self._running.get(sheet_name, {}).get(str(operator_id), {})
+                for row_idx in sorted(running, key=lambda i: i or 0):
+                    p_id, p_name, title = running[row_idx]
+                    if project is not None and p_id != project and not (match_project_name and p_name == project):
+                        continue
+                    return title
+        return None
+
+    def machine_totals(self) -> Dict[str, int]:
+        self._ensure_fresh("machines")
+        with self._lock:
+            totals = self._totals.get("machines", Counter())
+            return {"total": totals["total"], "active": totals["active"]}
+
+    def user_totals(self) -> Dict[str, int]:
+        self._ensure_fresh("users")
+        with self._lock:
+            totals = self._totals.get("users", Counter())
+            return {"total": totals["total"], "operators": totals["operators"]}
+
+    def project_total(self, project_id: Optional[str] = None) -> int:
+        self._ensure_fresh("projects")
+        with self._lock:
+            totals = self._totals.get("projects", Counter())
+            if project_id and project_id != "all":
+                return totals["id:" + str(project_id)]
+            return totals["total"]
+
+# Singleton instance
+task_aggregates = sheets_repo.register_index(TaskAggregateStore())
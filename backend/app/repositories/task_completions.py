@@ -0,0 +1,114 @@
+
+"""
+Monthly completion-date partitions for the task sheets and their archives.
+Reports count tasks completed on a day or within a range; instead of scanning
+all three task sheets (and, for old periods, their archives) and string-matching
+`completed_at` on every row, rows are bucketed by the month they were completed
+in and kept in sync with repository writes, like the log partitions.
+"""
+
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from app.core.sheets_config import ARCHIVED_SHEETS, archive_sheet_name
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.repositories.log_partitions import DateLike
+from app.utils.sheet_rows import day_key, id_column, is_deleted, month_keys
+
+TASK_SHEETS = ("tasks", "filingtasks", "fabricationtasks")
+ARCHIVES = {archive_sheet_name(s): s for s in ARCHIVED_SHEETS}
+
+def completion_day(row: Dict[str, Any]) -> str:
+    """'YYYY-MM-DD' the task was completed on ('' if unknown); same fallback the reports use."""
+    return day_key(row.get("completed_at") or row.get("actual_end_time") or "")
+
+class TaskCompletionIndex(SheetIndex):
+    sheets = TASK_SHEETS + tuple(ARCHIVES)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._partitions = {} # sheet -> {"YYYY-MM": {_row_idx: row}}
+        self._hot_ids = {} # hot sheet -> {task_id: count}, to skip archive copies of live rows
+
+    def _row_id(self, sheet_name: str, row: Dict[str, Any]) -> str:
+        value = row.get(id_column(sheet_name))
+        return str(value).strip() if value is not None else ""
+
+    def _track_id(self, sheet_name: str, row: Dict[str, Any], sign: int):
+        if sheet_name not in TASK_SHEETS:
+            return
+        ids = self._hot_ids.setdefault(sheet_name, {})
+        key = self._row_id(sheet_name, row)
+        ids[key] = ids.get(key, 0) + sign
+        if ids[key] <= 0:
+            del ids[key]
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        buckets, ids = {}, {}
+        for row in rows:
+            day = completion_day(row)
+            if day:
+                buckets.setdefault(day[:7], {})[row.get("_row_idx")] = row
+            key = self._row_id(sheet_name, row)
+            ids[key] = ids.get(key, 0) + 1
+        with self._lock:
+            self._partitions[sheet_name] = buckets
+            if sheet_name in TASK_SHEETS:
+                self._hot_ids[sheet_name] = ids
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            buckets = self._partitions.setdefault(sheet_name, {})
+            if old_row is not None:
+                self._track_id(sheet_name, old_row, -1)
+                day = completion_day(old_row)
+                if day:
+                    buckets.get(day[:7], {}).pop(old_row.get("_row_idx"), None)
+            if new_row is not None:
+                self._track_id(sheet_name, new_row, 1)
+                day = completion_day(new_row)
+                if day:
+                    buckets.setdefault(day[:7], {})[new_row.get("_row_idx")] = new_row
+
+    def completed_between(
+        self,
+        start: DateLike,
+        end: Optional[DateLike] = None,
+        include_archive: bool = False,
+        sheet_names: Tuple[str, ...] = TASK_SHEETS
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        (task sheet, row copy) for every non-deleted task with status 'completed'
+        whose completion day falls in [start, end]. Archived copies are read only
+        when `include_archive` is set, and skipped if the task is still in its hot sheet.
+        """
+        start_key = day_key(start)
+        end_key = day_key(end) if end else start_key
+        if not start_key or not end_key or end_key < start_key:
+            return []
+        months = month_keys(start_key, end_key)
+
+        sources = [(s, s) for s in sheet_names]
+        if include_archive:
+            sources += [(archive_sheet_name(s), s) for s in sheet_names if s in ARCHIVED_SHEETS]
+        for source, _ in sources:
+            # Loads / revalidates the cache, and with it the partitions
+            sheets_repo.get_cached_records(source)
+
+        result = []
+        with self._lock:
+            for source, task_sheet in sources:
+                buckets = self._partitions.get(source, {})
+                hot_ids = self._hot_ids.get(task_sheet, {}) if source != task_sheet else None
+                for month in months:
+                    for row in buckets.get(month, {}).values():
+                        if not (start_key <= completion_day(row) <= end_key):
+                            continue
+                        if is_deleted(row) or str(row.get("status", "")).strip().lower() != "completed":
+                            continue
+                        if hot_ids is not None and self._row_id(source, row) in hot_ids:
+                            continue
+                        result.append((task_sheet, dict(row)))
+        return result
+
+# Singleton instance
+task_completions = sheets_repo.register_index(TaskCompletionIndex())
@@ -0,0 +1,72 @@
+
+"""
+Global task-id directory across the three task sheets.
+Task ids are resolved on every hold / resume / complete / assign call; rather
+than scanning tasks, filingtasks and fabricationtasks one after the other, the
+directory keeps an id -> cached row map per sheet, kept in sync by the repository.
+"""
+
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.utils.sheet_rows import id_column, lookup_key
+
+# Lookup order matters: an id present in several sheets resolves to the first one
+TASK_SHEETS = (
+    ("tasks", "general"),
+    ("filingtasks", "filing"),
+    ("fabricationtasks", "fabrication"),
+)
+
+class TaskDirectory(SheetIndex):
+    sheets = tuple(name for name, _ in TASK_SHEETS)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {} # sheet -> {task_id: row}
+
+    def _row_key(self, sheet_name: str, row: Dict[str, Any]) -> str:
+        return lookup_key(row.get(id_column(sheet_name)))
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        ids = {}
+        for row in rows:
+            key = self._row_key(sheet_name, row)
+            if key:
+                ids.setdefault(key, row) # First occurrence wins, as with .first()
+        with self._lock:
+            self._by_id[sheet_name] = ids
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            ids = self._by_id.setdefault(sheet_name, {})
+            if old_row is not None:
+                old_key = self._row_key(sheet_name, old_row)
+                current = ids.get(old_key)
+                if current is not None and (current is new_row or current.get("_row_idx") == old_row.get("_row_idx")):
+                    del ids[old_key]
+            if new_row is not None:
+                new_key = self._row_key(sheet_name, new_row)
+                if new_key:
+                    ids.setdefault(new_key, new_row)
+
+    def lookup(self, task_id: str) -> Tuple[Optional[str], Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Returns (sheet_name, task_type, row copy) for a task id, or (None, None, None).
+        Includes soft-deleted rows, matching the previous per-sheet scans.
+        """
+        key = lookup_key(task_id)
+        if not key:
+            return None, None, None
+
+        for sheet_name, task_type in TASK_SHEETS:
+            # Keeps the cache (and therefore the directory) loaded and fresh
+            sheets_repo.get_cached_records(sheet_name)
+            with self._lock:
+                row = self._by_id.get(sheet_name, {}).get(key)
+            if row is not None:
+                return sheet_name, task_type, dict(row)
+        return None, None, None
+
+# Singleton instance
+task_directory = sheets_repo.register_index(TaskDirectory())
@@ -0,0 +1,87 @@
+
+"""
+Pre-sorted order of the three task sheets for paginated list endpoints.
+Each sheet keeps its rows sorted by (due date, created_at, id); inserts and
+updates are placed with a binary search instead of re-sorting the list, and a
+cursor (the last key a client saw) resumes a listing with another bisect.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from app.core.sheets_db import SheetRow
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+
+TASK_SHEETS = ("tasks", "filingtasks", "fabricationtasks")
+_RANK = {name: i for i, name in enumerate(TASK_SHEETS)}
+
+# (due_date, created_at, id, sheet rank, _row_idx) - unique per row, so the order is total
+TaskKey = Tuple[str, str, str, int, int]
+TASK_KEY_SHAPE = (str, str, str, int, int)
+
+def task_sort_key(sheet_name: str, row: Dict[str, Any]) -> TaskKey:
+    t = SheetRow(row, sheet_name)
+    return (
+        str(getattr(t, 'due_date', '') or "9999-12-31"),
+        str(getattr(t, 'created_at', '') or "1970-01-01"),
+        str(getattr(t, 'id', '') or ""),
+        _RANK[sheet_name],
+        row.get("_row_idx") or 0,
+    )
+
+class TaskOrderIndex(SheetIndex):
+    sheets = TASK_SHEETS
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = {} # sheet -> sorted [TaskKey, ...]
+        self._rows = {} # sheet -> {_row_idx: live cached row}
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        keys = sorted(task_sort_key(sheet_name, row) for row in rows)
+        by_idx = {row.get("_row_idx") or 0: row for row in rows}
+        with self._lock:
+            self._keys[sheet_name] = keys
+            self._rows[sheet_name] = by_idx
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        old_key = task_sort_key(sheet_name, old_row) if old_row is not None else None
+        new_key = task_sort_key(sheet_name, new_row) if new_row is not None else None
+        with self._lock:
+            keys = self._keys.setdefault(sheet_name, [])
+            rows = self._rows.setdefault(sheet_name, {})
+            if old_key is not None:
+                pos = bisect_left(keys, old_key)
+                if pos < len(keys) and keys[pos] == old_key:
+                    del keys[pos]
+                rows.pop(old_key[-1], None)
+            if new_key is not None:
+                insort(keys, new_key)
+                rows[new_key[-1]] = new_row
+
+    def iter_after(self, sheet_names: Tuple[str, ...] = TASK_SHEETS, after: Optional[TaskKey] = None) -> Iterator[Tuple[TaskKey, str, Dict[str, Any]]]:
+        """
+        Yields (key, sheet_name, live row) in key order, starting after `after`.
+        Rows are the repository's cached dicts and must not be mutated.
+        """
+        for sheet_name in sheet_names:
+            # Keeps the cache (and therefore this index) loaded and fresh
+            sheets_repo.get_cached_records(sheet_name)
+
+        with self._lock:
+            parts, rows = [], {}
+            for sheet_name in sheet_names:
+                keys = self._keys.get(sheet_name, [])
+                start = bisect_right(keys, tuple(after)) if after else 0
+                parts.append(keys[start:])
+                rows[sheet_name] = self._rows.get(sheet_name, {})
+
+        for key in heapq.merge(*parts):
+            sheet_name = TASK_SHEETS[key[3]]
+            row = rows[sheet_name].get(key[4])
+            if row is not None:
+                yield key, sheet_name, row
+
+# Singleton instance
+task_order = sheets_repo.register_index(TaskOrderIndex())
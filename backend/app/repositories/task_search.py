@@ -0,0 +1,172 @@
+
+"""
+Inverted full-text index over the three task sheets for /tasks/search.
+Title, description, part_item and work_order_number are split into lower-case
+alphanumeric tokens (codes are also indexed run together, so 'WO-2024-017'
+matches 'wo2024017' as well as 'wo 2024'). Postings map each token to the rows
+containing it with the weight of the best field it came from. Rows must match
+every query token and rank by their summed weight; the last query token also
+matches the tokens it is a prefix of (at half weight), found by bisecting the
+sorted vocabulary, so results follow the user as they type. Maintained from
+repository write events like the other task indexes, and rows whose `_version`
+is unchanged are kept as-is on reload; soft-deleted rows are not indexed.
+"""
+
+import re
+import heapq
+import threading
+from bisect import bisect_left, insort
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.repositories.task_order import TASK_SHEETS
+from app.utils.sheet_rows import is_deleted
+
+# Exact-match weight per field; a prefix match scores half
+FIELD_WEIGHTS = {"work_order_number": 8, "title": 6, "part_item": 4, "description": 2}
+# Fields holding codes, also indexed with their tokens run together
+CODE_FIELDS = ("work_order_number", "part_item")
+
+# (-score, sheet rank, _row_idx) - best matches first, then sheet order
+SearchKey = Tuple[int, int, int]
+SEARCH_KEY_SHAPE = (int, int, int)
+
+_RANK = {name: i for i, name in enumerate(TASK_SHEETS)}
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: Any) -> List[str]:
+    return _TOKEN.findall(str(text).lower()) if text is not None else []
+
+def _terms(row: Dict[str, Any]) -> Dict[str, int]:
+    """token -> weight of the best field it appears in."""
+    terms = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        tokens = tokenize(row.get(field))
+        if len(tokens) > 1 and field in CODE_FIELDS:
+            tokens.append("".join(tokens))
+        for token in tokens:
+            if terms.get(token, 0) < weight:
+                terms[token] = weight
+    return terms
+
+class TaskSearchIndex(SheetIndex):
+    sheets = TASK_SHEETS
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs = {} # (sheet, _row_idx) -> (live cached row, {token: weight})
+        self._postings = {} # token -> {(sheet, _row_idx): weight}
+        self._vocab = [] # sorted tokens, for prefix look-ups
+        self._vocab_stale = False # set while a bulk reload adds / drops tokens
+
+    # --- Maintenance (called by the repository) ---
+
+    def _remove(self, doc: Tuple[str, Any], keep_vocab: bool = True):
+        # Caller holds the lock
+        entry = self._docs.pop(doc, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            posting = self._postings[token]
+            posting.pop(doc, None)
+            if not posting:
+                del self._postings[token]
+                if keep_vocab:
+                    del self._vocab[bisect_left(self._vocab, token)]
+                else:
+                    self._vocab_stale = True
+
+    def _add(self, sheet_name: str, row: Dict[str, Any], keep_vocab: bool = True):
+        # Caller holds the lock
+        doc = (sheet_name, row.get("_row_idx"))
+        self._remove(doc)
+        if is_deleted(row):
+            return
+        terms = _terms(row)
+        self._docs[doc] = (row, terms)
+        for token, weight in terms.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                if keep_vocab:
+                    insort(self._vocab, token)
+                else:
+                    self._vocab_stale = True
+            posting[doc] = weight
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        live = {row.get("_row_idx"): row for row in rows}
+        with self._lock:
+            for doc in [d for d in self._docs if d[0] == sheet_name]:
+                row, old_row = live.get(doc[1]), self._docs[doc][0]
+                if row is not None and row.get("_version") is not None and row.get("_version") == old_row.get("_version"):
+                    # Unchanged since it was indexed; just follow the reloaded row
+                    self._docs[doc] = (row, self._docs[doc][1])
+                    del live[doc[1]]
+                else:
+                    self._remove(doc, keep_vocab=False)
+            # Bulk load: the vocabulary is re-sorted once at the end
+            for row in live.values():
+                self._add(sheet_name, row, keep_vocab=False)
+            if self._vocab_stale:
+                self._vocab = sorted(self._postings)
+                self._vocab_stale = False
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            if old_row is not None:
+                self._remove((sheet_name, old_row.get("_row_idx")))
+            if new_row is not None:
+                self._add(sheet_name, new_row)
+
+    # --- Queries ---
+
+    def _matches(self, token: str, prefix: bool) -> Dict[Tuple[str, Any], int]:
+        # Caller holds the lock. Best score per row: exact token, or any token it prefixes
+        scores = dict(self._postings.get(token, {}))
+        if not prefix:
+            return scores
+        i = bisect_left(self._vocab, token)
+        while i < len(self._vocab) and self._vocab[i].startswith(token):
+            term = self._vocab[i]
+            i += 1
+            if term == token:
+                continue
+            for doc, weight in self._postings[term].items():
+                if scores.get(doc, 0) < weight // 2:
+                    scores[doc] = weight // 2
+        return scores
+
+    def search(self, query: str, after: Optional[SearchKey] = None) -> Iterator[Tuple[SearchKey, str, Dict[str, Any]]]:
+        """
+        Non-deleted task rows matching every token of `query`, best first, as
+        (sort key, sheet name, live cached row), starting after the `after` key.
+        Rows are shared with the cache and must not be mutated.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return
+        for sheet_name in TASK_SHEETS:
+            # Loads / revalidates the cache, and with it the index
+            sheets_repo.get_cached_records(sheet_name)
+
+        with self._lock:
+            matches = [self._matches(t, prefix=(i == len(tokens) - 1)) for i, t in enumerate(tokens)]
+            # Intersect starting from the rarest token
+            matches.sort(key=len)
+            scores = matches[0]
+            for matched in matches[1:]:
+                if not scores:
+                    break
+                scores = {d: s + matched[d] for d, s in scores.items() if d in matched}
+            if not scores:
+                return
+            hits = [((-score, _RANK[doc[0]], doc[1] or 0), doc[0], self._docs[doc][0]) for doc, score in scores.items()]
+        if after is not None:
+            hits = [hit for hit in hits if hit[0] > after]
+        # Keys are unique, so rows are never compared; only what the caller consumes gets ordered
+        heapq.heapify(hits)
+        while hits:
+            yield heapq.heappop(hits)
+
+# Singleton instance
+task_search = sheets_repo.register_index(TaskSearchIndex())
@@ -0,0 +1,143 @@
+
+"""
+User look-ups by username / email, and user search.
+Login, the forgot-password flow, token resolution and /users/search each
+scanned the whole users sheet. The directory keeps, in sync with repository
+writes:
+
+    exact maps   normalized (trimmed, lower-case) username / email -> rows
+    trigrams     3-character grams of both -> rows, for substring and fuzzy search
+
+A substring query only verifies the rows holding all of its trigrams; a fuzzy
+query ranks rows by trigram similarity (grams padded at the word start, so
+typos in short names still score). Rows come back in sheet order, so callers
+that took the first match keep doing so.
+"""
+
+import threading
+from typing import List, Dict, Any, Optional, Set, Tuple
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.utils.sheet_rows import lookup_key
+
+SHEET = "users"
+
+# Minimum trigram similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.3
+
+def _grams(text: str, padded: bool = True) -> Set[str]:
+    if padded:
+        text = "  " + text + " "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+class UserDirectory(SheetIndex):
+    sheets = (SHEET,)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {} # _row_idx -> (live cached row, username key, email key, username grams, email grams)
+        self._by_username = {} # username key -> {_row_idx, ...}
+        self._by_email = {} # email key -> {_row_idx, ...}
+        self._by_gram = {} # trigram -> {_row_idx, ...}
+
+    # --- Maintenance (called by the repository) ---
+
+    @staticmethod
+    def _unlink(index: Dict[str, Set[Any]], key: str, row_idx: Any):
+        rows = index.get(key)
+        if rows is not None:
+            rows.discard(row_idx)
+            if not rows:
+                del index[key]
+
+    def _remove(self, row_idx: Any):
+        # Caller holds the lock
+        entry = self._rows.pop(row_idx, None)
+        if entry is None:
+            return
+        _, username, email, username_grams, email_grams = entry
+        self._unlink(self._by_username, username, row_idx)
+        self._unlink(self._by_email, email, row_idx)
+        for gram in username_grams | email_grams:
+            self._unlink(self._by_gram, gram, row_idx)
+
+    def _add(self, row: Dict[str, Any]):
+        # Caller holds the lock
+        row_idx = row.get("_row_idx")
+        self._remove(row_idx)
+        username, email = lookup_key(row.get("username")), lookup_key(row.get("email"))
+        username_grams = _grams(username) if username else set()
+        email_grams = _grams(email) if email else set()
+        self._rows[row_idx] = (row, username, email, username_grams, email_grams)
+        self._by_username.setdefault(username, set()).add(row_idx)
+        self._by_email.setdefault(email, set()).add(row_idx)
+        for gram in username_grams | email_grams:
+            self._by_gram.setdefault(gram, set()).add(row_idx)
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        with self._lock:
+            self._rows, self._by_username, self._by_email, self._by_gram = {}, {}, {}, {}
+            for row in rows:
+                self._add(row)
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            if old_row is not None:
+                self._remove(old_row.get("_row_idx"))
+            if new_row is not None:
+                self._add(new_row)
+
+    # --- Queries (row copies, in sheet order, soft-deleted rows included) ---
+
+    def _copies(self, row_idxs) -> List[Dict[str, Any]]:
+        # Caller holds the lock
+        return [dict(self._rows[i][0]) for i in sorted(row_idxs, key=lambda i: i or 0)]
+
+    def find(self, username: Optional[str] = None, email: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Rows whose trimmed, lower-cased username equals `username` or whose
+        email equals `email`. The arguments are compared as given (lower-cased
+        only), so surrounding spaces in a query never match, like the old scans.
+        """
+        sheets_repo.get_cached_records(SHEET)
+        matches = set()
+        with self._lock:
+            if username:
+                matches |= self._by_username.get(username.lower(), set())
+            if email:
+                matches |= self._by_email.get(email.lower(), set())
+            return self._copies(matches)
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Rows whose lower-cased username or email contains `query` (lower-cased, trimmed)."""
+        sheets_repo.get_cached_records(SHEET)
+        q = query.lower().strip()
+        with self._lock:
+            grams = _grams(q, padded=False)
+            if grams:
+                postings = sorted((self._by_gram.get(g, set()) for g in grams), key=len)
+                candidates = set(postings[0]).intersection(*postings[1:])
+            else:
+                candidates = self._rows.keys() # Shorter than a trigram: check every row
+            matches = [i for i in candidates if q in self._rows[i][1] or q in self._rows[i][2]]
+            return self._copies(matches)
+
+    def similar(self, query: str, threshold: float = FUZZY_THRESHOLD) -> List[Tuple[float, Dict[str, Any]]]:
+        """(similarity, row) for rows whose username or email is trigram-similar to `query`, best first."""
+        sheets_repo.get_cached_records(SHEET)
+        grams = _grams(query.lower().strip())
+        with self._lock:
+            candidates = set().union(*(self._by_gram.get(g, set()) for g in grams))
+            scored = []
+            for i in candidates:
+                _, _, _, username_grams, email_grams = self._rows[i]
+                score = max(_similarity(grams, username_grams), _similarity(grams, email_grams))
+                if score >= threshold:
+                    scored.append((-score, i or 0, i))
+            scored.sort()
+            return [(-neg, dict(self._rows[i][0])) for neg, _, i in scored]
+
+# Singleton instance
+user_directory = sheets_repo.register_index(UserDirectory())
@@ -0,0 +1,106 @@
+
+"""
+Work-order directory across projects and the three task sheets.
+`work_order_number` ties a project to the general, filing and fabrication tasks
+cut for it, and /work-orders/{wo} resolves one on every shop-floor scan. The
+directory maps the normalized (trimmed, lower-case) work order number to the
+rows carrying it, and project codes to their project rows, kept in sync with
+repository writes, so a look-up touches only the rows of that work order.
+Soft-deleted rows stay in the maps; callers decide whether to show them.
+"""
+
+import threading
+from typing import List, Dict, Any, Optional, Set, Tuple
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.repositories.task_order import TASK_SHEETS
+from app.utils.sheet_rows import lookup_key
+
+PROJECT_SHEET = "projects"
+
+class WorkOrderIndex(SheetIndex):
+    sheets = (PROJECT_SHEET,) + TASK_SHEETS
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {} # (sheet, _row_idx) -> (live cached row, work order key, project code key)
+        self._by_wo = {} # work order key -> {(sheet, _row_idx), ...}
+        self._by_code = {} # project code key -> {("projects", _row_idx), ...}
+
+    # --- Maintenance (called by the repository) ---
+
+    @staticmethod
+    def _unlink(index: Dict[str, Set[Any]], key: str, doc: Tuple[str, Any]):
+        docs = index.get(key)
+        if docs is not None:
+            docs.discard(doc)
+            if not docs:
+                del index[key]
+
+    def _remove(self, doc: Tuple[str, Any]):
+        # Caller holds the lock
+        entry = self._rows.pop(doc, None)
+        if entry is not None:
+            self._unlink(self._by_wo, entry[1], doc)
+            self._unlink(self._by_code, entry[2], doc)
+
+    def _add(self, sheet_name: str, row: Dict[str, Any]):
+        # Caller holds the lock
+        doc = (sheet_name, row.get("_row_idx"))
+        self._remove(doc)
+        wo = lookup_key(row.get("work_order_number"))
+        code = lookup_key(row.get("project_code")) if sheet_name == PROJECT_SHEET else ""
+        if not wo and not code:
+            return
+        self._rows[doc] = (row, wo, code)
+        if wo:
+            self._by_wo.setdefault(wo, set()).add(doc)
+        if code:
+            self._by_code.setdefault(code, set()).add(doc)
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        with self._lock:
+            for doc in [d for d in self._rows if d[0] == sheet_name]:
+                self._remove(doc)
+            for row in rows:
+                self._add(sheet_name, row)
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            if old_row is not None:
+                self._remove((sheet_name, old_row.get("_row_idx")))
+            if new_row is not None:
+                self._add(sheet_name, new_row)
+
+    # --- Queries ---
+
+    def _rows_of(self, docs) -> List[Tuple[str, Dict[str, Any]]]:
+        # Caller holds the lock. Projects first, then each task sheet, in sheet order
+        rank = {name: i for i, name in enumerate(self.sheets)}
+        ordered = sorted(docs, key=lambda d: (rank[d[0]], d[1] or 0))
+        return [(d[0], self._rows[d][0]) for d in ordered]
+
+    def lookup(self, reference: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        [(sheet name, live cached row), ...] for a work order number, or, when
+        no row carries it, for the project whose project_code it is plus the
+        rows of that project's work order. Rows are shared with the cache and
+        must not be mutated.
+        """
+        for sheet_name in self.sheets:
+            # Loads / revalidates the cache, and with it the directory
+            sheets_repo.get_cached_records(sheet_name)
+
+        key = lookup_key(reference)
+        if not key:
+            return []
+        with self._lock:
+            docs = set(self._by_wo.get(key, ()))
+            if not docs:
+                # A project code: its project row plus everything under its work order(s)
+                for doc in self._by_code.get(key, ()):
+                    docs.add(doc)
+                    docs |= self._by_wo.get(self._rows[doc][1], set())
+            return self._rows_of(docs)
+
+# Singleton instance
+work_orders = sheets_repo.register_index(WorkOrderIndex())
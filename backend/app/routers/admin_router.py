@@ -7,6 +7,7 @@ from app.core.database import get_db
 from app.models.models_db import User
 from app.core.dependencies import get_current_active_admin
 from app.core.auth_utils import hash_password, verify_password
+from app.utils.field_projection import parse_fields
 
 router = APIRouter(
     prefix="/admin",
@@ -38,10 +39,17 @@ class UserResponse(BaseModel):
     contact_number: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
 
+# Never sent to clients
+USER_PRIVATE_FIELDS = {"password_hash"}
+
 @router.get("/users", response_model=List[dict])
-async def get_all_users(db: any = Depends(get_db)):
-    """Get all approved users for admin management"""
-    return [u.dict() for u in db.query(User).all() if not getattr(u, 'is_deleted', False) and str(getattr(u, 'approval_status', '')).lower() == 'approved']
+async def get_all_users(fields: Optional[str] = None, db: any = Depends(get_db)):
+    """Get all approved users for admin management (`fields=a,b,...` limits the columns)"""
+    from app.core.sheets_db import SHEETS_SCHEMA
+    allowed = [h for h in SHEETS_SCHEMA["users"] + ["id"] if h not in USER_PRIVATE_FIELDS]
+    wanted = parse_fields(fields, allowed) or allowed
+    users = [u for u in db.query(User).all() if not getattr(u, 'is_deleted', False) and str(getattr(u, 'approval_status', '')).lower() == 'approved']
+    return [{f: getattr(u, f) for f in wanted} for u in users]
 
 @router.get("/attendance-summary")
 async def get_admin_attendance_summary(db: any = Depends(get_db)):
@@ -96,18 +104,14 @@ async def get_project_analytics(project: Optional[str] = None, db: any = Depends
 @router.get("/overall-stats")
 async def get_overall_stats(db: any = Depends(get_db)):
     """Get overall counts for admin dashboard cards (Aggregates ALL task types)"""
-    from app.models.models_db import Task, Project, Machine, FilingTask, FabricationTask
-    users_count = len([u for u in db.query(User).all() if not getattr(u, 'is_deleted', False)])
+    from app.repositories.task_aggregates import task_aggregates
+    users_count = task_aggregates.user_totals()["total"]
     
     # Aggregate ALL tasks
-    t_count = len([t for t in db.query(Task).all() if not getattr(t, 'is_deleted', False)])
-    try:
-        t_count += len([t for t in db.query(FilingTask).all() if not getattr(t, 'is_deleted', False)])
-        t_count += len([t for t in db.query(FabricationTask).all() if not getattr(t, 'is_deleted', False)])
-    except: pass
+    t_count = task_aggregates.task_total()
     
-    projects_count = len([p for p in db.query(Project).all() if not getattr(p, 'is_deleted', False)])
-    machines_count = len([m for m in db.query(Machine).all() if not getattr(m, 'is_deleted', False)])
+    projects_count = task_aggregates.project_total()
+    machines_count = task_aggregates.machine_totals()["total"]
     
     return {
         "users": users_count,
@@ -121,11 +125,11 @@ async def get_pending_users(db: any = Depends(get_db)):
     """Get all pending users for approval safely."""
     all_users = db.query(User).all()
 
-    from app.core.normalizer import safe_normalize_list, normalize_user_row
+    from app.core.normalizer import normalize_user_row
+    from app.repositories.normalized_rows import normalized_rows
     
-    # Normalize ALL
-    u_dicts = [u.dict() if hasattr(u, 'dict') else u.__dict__ for u in all_users]
-    normalized = safe_normalize_list(u_dicts, normalize_user_row, "user")
+    # Normalize ALL (cached per row version)
+    normalized = normalized_rows.normalize(all_users, normalize_user_row, "user")
     
     # Filter Pending
     pending = [
@@ -156,6 +160,20 @@ async def change_admin_password(request: ChangePasswordRequest, current_admin: U
     db.commit()
     return {"message": "Success"}
 
+@router.post("/archive/run")
+async def run_task_archival(days: Optional[int] = None, dry_run: bool = False, current_admin: User = Depends(get_current_active_admin)):
+    """Move old completed and soft-deleted tasks into the *_archive sheets."""
+    from app.services.archive_service import run_archival
+    if days is not None and days < 0:
+        raise HTTPException(status_code=400, detail="days must be >= 0")
+    return run_archival(days=days, dry_run=dry_run)
+
+@router.post("/rollups/rebuild")
+async def rebuild_daily_rollups(current_admin: User = Depends(get_current_active_admin)):
+    """Recompute the daily machine / operator rollups from the raw log and task rows."""
+    from app.repositories.daily_rollups import daily_rollups
+    return {"message": "Daily rollups rebuilt", "rows_scanned": daily_rollups.recompute()}
+
 @router.post("/users/{username}/approve")
 async def approve_user(username: str, request: ApproveUserRequest, db: any = Depends(get_db)):
     try:
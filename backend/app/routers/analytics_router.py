@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Optional, Any
-from datetime import datetime
+from datetime import datetime, date
 from app.core.database import get_db
 from app.models.models_db import Task, User
 from app.services.dashboard_analytics_service import get_operations_overview
+from app.services.archive_service import needs_archive
+from app.core.typed_columns import in_month, int_value
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
@@ -21,16 +23,15 @@ async def get_operator_performance(
     operator_id: Optional[str] = None,
     db: any = Depends(get_db)
 ):
-    all_tasks = db.query(Task).all()
-    # Filter by month/year in memory from ISO string created_at (YYYY-MM-DD...)
-    pattern = f"{year}-{month:02d}"
-    tasks = [t for t in all_tasks if not t.is_deleted and str(t.created_at).startswith(pattern)]
+    all_tasks = db.query(Task, include_archive=needs_archive(date(year, month, 1))).all()
+    # Filter by month/year on the parsed created_at shadow column
+    tasks = [t for t in all_tasks if not t.is_deleted and in_month(t, 'created_at', year, month)]
     
     if operator_id:
         tasks = [t for t in tasks if str(t.assigned_to) == str(operator_id)]
         
     completed = [t for t in tasks if t.status == 'completed']
-    total_dur = sum([int(t.total_duration_seconds or 0) for t in completed])
+    total_dur = sum(int_value(t, 'total_duration_seconds') for t in completed)
     
     pct = round((len(completed) / len(tasks) * 100), 2) if tasks else 0
     
@@ -38,7 +39,7 @@ async def get_operator_performance(
     for t in completed:
         if t.completed_at:
             d_str = str(t.completed_at).split('T')[0]
-            duration_by_date[d_str] = duration_by_date.get(d_str, 0) + int(t.total_duration_seconds or 0)
+            duration_by_date[d_str] = duration_by_date.get(d_str, 0) + int_value(t, 'total_duration_seconds')
             
     graph_data = [{"date": d, "duration": dur} for d, dur in sorted(duration_by_date.items())]
     
@@ -55,17 +56,15 @@ async def get_operator_performance(
 @router.get("/task-distribution")
 async def get_task_dist(db: any = Depends(get_db)):
     """Get task status distribution across ALL task types (general, filing, fabrication)"""
-    from app.models.models_db import FilingTask, FabricationTask
+    from app.repositories.task_aggregates import task_aggregates
     
-    # Get all task types
-    general_tasks = [t for t in db.query(Task).all() if not getattr(t, 'is_deleted', False)]
-    filing_tasks = [t for t in db.query(FilingTask).all() if not getattr(t, 'is_deleted', False)]
-    fab_tasks = [t for t in db.query(FabricationTask).all() if not getattr(t, 'is_deleted', False)]
+    # Materialized counts for all task types
+    groups = task_aggregates.task_groups()
+    by_type = {"general": 0, "filing": 0, "fabrication": 0}
+    for group, count in groups:
+        by_type[group.task_type] += count
     
-    # Combine all tasks
-    all_tasks = general_tasks + filing_tasks + fab_tasks
-    
-    print(f"📊 Task Distribution: {len(general_tasks)} general, {len(filing_tasks)} filing, {len(fab_tasks)} fabrication")
+    print(f"📊 Task Distribution: {by_type['general']} general, {by_type['filing']} filing, {by_type['fabrication']} fabrication")
     
     # Count by status
     dist = {
@@ -78,12 +77,12 @@ async def get_task_dist(db: any = Depends(get_db)):
     
     from app.core.normalizer import normalize_status
     
-    for t in all_tasks:
-        raw_status = getattr(t, 'status', 'pending')
+    # Normalized once per distinct raw status
+    for raw_status, count in task_aggregates.status_counts().items():
         status = normalize_status(raw_status)
         
         # Ensure status key exists in dist
-        dist[status] = dist.get(status, 0) + 1
+        dist[status] = dist.get(status, 0) + count
     
     print(f"📊 Distribution: {dist}")
     return dist
@@ -91,12 +90,8 @@ async def get_task_dist(db: any = Depends(get_db)):
 @router.get("/production-trend")
 async def get_prod_trend(year: Optional[int] = None, db: any = Depends(get_db)):
     if not year: year = datetime.now().year
-    tasks = [t for t in db.query(Task).all() if not t.is_deleted and str(t.status).lower() == 'completed' and str(t.completed_at).startswith(str(year))]
-    months = {m: 0 for m in range(1, 13)}
-    for t in tasks:
-        try:
-            m = int(str(t.completed_at).split("-")[1])
-            months[m] += 1
-        except: pass
+    from app.repositories.performance_rollups import performance_rollups
+    by_month = performance_rollups.year(year, include_archive=needs_archive(date(year, 1, 1)))
+    months = {m: count for m, (count, _) in by_month.items()}
     ms = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
     return [{"month": ms[m-1], "completed": count} for m, count in months.items()]
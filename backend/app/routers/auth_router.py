@@ -6,6 +6,8 @@ from app.core.auth_utils import verify_password, create_access_token, hash_passw
 from app.core.dependencies import get_current_active_user
 from app.core.database import get_db
 from app.models.models_db import User
+from app.core.sheets_db import SheetRow
+from app.repositories.user_directory import user_directory
 from app.schemas.user_schema import UserUpdate
 from app.core.password_validation import validate_password_strength
 
@@ -26,12 +28,11 @@ async def login(credentials: LoginRequest, background_tasks: BackgroundTasks, db
         raise HTTPException(status_code=500, detail="Server security token missing")
 
     try:
-        # Load all users from Sheets (cached)
-        all_users = db.query(User).all()
-        
+        # Users with this username, from the directory index (cached)
         # Mandatory: Trim whitespace and check active
         u_name = credentials.username.strip().lower()
-        user = next((u for u in all_users if str(getattr(u, 'username', '')).strip().lower() == u_name and getattr(u, 'active', False) and not getattr(u, 'is_deleted', False)), None)
+        candidates = [SheetRow(row, "users", db) for row in user_directory.find(username=u_name)]
+        user = next((u for u in candidates if getattr(u, 'active', False) and not getattr(u, 'is_deleted', False)), None)
 
         if not user:
             raise HTTPException(status_code=401, detail="Incorrect username or password")
@@ -141,8 +142,8 @@ class ForgotPasswordRequest(BaseModel):
 @router.post("/get-security-question")
 async def get_security_question(request: ForgotPasswordRequest, db: any = Depends(get_db)):
     """Get security question for a user (forgot password step 1)"""
-    all_users = db.query(User).all()
-    user = next((u for u in all_users if (str(getattr(u, 'username', '')).lower() == request.username.lower() or str(getattr(u, 'email', '') or "").lower() == request.username.lower()) and not getattr(u, 'is_deleted', False)), None)
+    candidates = [SheetRow(row, "users", db) for row in user_directory.find(username=request.username, email=request.username)]
+    user = next((u for u in candidates if not getattr(u, 'is_deleted', False)), None)
     
     s_q = getattr(user, 'security_question', None)
     if not user or not s_q:
@@ -158,8 +159,8 @@ class ResetPasswordRequest(BaseModel):
 @router.post("/reset-password")
 async def reset_password(request: ResetPasswordRequest, db: any = Depends(get_db)):
     """Reset password using security answer (forgot password step 2)"""
-    all_users = db.query(User).all()
-    user = next((u for u in all_users if (str(getattr(u, 'username', '')).lower() == request.username.lower() or str(getattr(u, 'email', '') or "").lower() == request.username.lower()) and not getattr(u, 'is_deleted', False)), None)
+    candidates = [SheetRow(row, "users", db) for row in user_directory.find(username=request.username, email=request.username)]
+    user = next((u for u in candidates if not getattr(u, 'is_deleted', False)), None)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
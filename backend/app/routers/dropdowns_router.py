@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends
 from typing import List
 from app.core.database import get_db
-from app.models.models_db import Project, Machine, User
+from app.models.models_db import Project, Machine, User, Unit, MachineCategory
 from app.core.dependencies import get_current_user
 from pydantic import BaseModel
 from app.core.time_utils import get_current_time_ist
+from app.utils.fast_json import FastJSONResponse, cached_json_body, cached_json_response, dumps
 
 router = APIRouter(prefix="/dropdowns", tags=["Dropdowns"])
 
@@ -19,90 +20,126 @@ class UserDropdownItem(BaseModel):
     full_name: str
     role: str
 
+# --- List builders (run once per version of their source sheet) ---
+
+def _projects(db) -> list:
+    return [{"project_id": str(getattr(p, 'project_id', getattr(p, 'id', ''))),
+             "project_name": str(getattr(p, 'project_name', '')),
+             "id": str(getattr(p, 'project_id', getattr(p, 'id', ''))),
+             "name": str(getattr(p, 'project_name', ''))}
+            for p in db.query(Project).all() if not getattr(p, 'is_deleted', False)]
+
+def _machines(db) -> list:
+    return [{"machine_id": str(getattr(m, 'machine_id', getattr(m, 'id', ''))),
+             "machine_name": str(getattr(m, 'machine_name', '')),
+             "id": str(getattr(m, 'machine_id', getattr(m, 'id', ''))),
+             "name": str(getattr(m, 'machine_name', ''))}
+            for m in db.query(Machine).all() if not getattr(m, 'is_deleted', False)]
+
+def _units(db) -> list:
+    return [{"unit_id": str(getattr(u, 'unit_id', getattr(u, 'id', ''))),
+             "name": str(getattr(u, 'name', '')),
+             "id": str(getattr(u, 'unit_id', getattr(u, 'id', '')))}
+            for u in db.query(Unit).all() if not getattr(u, 'is_deleted', False) and str(getattr(u, 'status', 'active')).lower() == 'active']
+
+def _categories(db) -> list:
+    return [{"category_id": str(getattr(c, 'category_id', getattr(c, 'id', ''))),
+             "name": str(getattr(c, 'name', '')),
+             "id": str(getattr(c, 'category_id', getattr(c, 'id', '')))}
+            for c in db.query(MachineCategory).all() if not getattr(c, 'is_deleted', False)]
+
+def _assignable_users(db) -> list:
+    assignable_roles = ['admin', 'supervisor', 'planning', 'operator', 'fab_master', 'file_master']
+    results = []
+    for u in db.query(User).all():
+        if getattr(u, 'is_deleted', False) or not bool(getattr(u, 'active', True)):
+            continue
+
+        # User Requirement: Pending users should NOT appear in assignable users
+        # RELAXED: Allow empty status
+        status = str(getattr(u, 'approval_status', '')).lower().strip()
+        if status in ['pending', 'rejected']:
+            continue
+
+        role = str(getattr(u, 'role', '')).lower()
+        if role in assignable_roles:
+            u_id = str(getattr(u, 'user_id', getattr(u, 'id', '')))
+            # Validated here, once per version of the users sheet; the cached
+            # body bypasses the route's response_model
+            results.append(UserDropdownItem(
+                id=u_id,
+                user_id=u_id,
+                username=str(getattr(u, 'username', '')),
+                full_name=str(getattr(u, 'username', '')),
+                role=role
+            ).model_dump(mode="json"))
+    return results
+
+# List name -> (source sheet, builder). Each list is encoded once per version
+# of its own sheet; the bundled endpoints splice the encoded lists together.
+DROPDOWNS = {
+    "projects": ("projects", _projects),
+    "machines": ("machines", _machines),
+    "units": ("units", _units),
+    "categories": ("machinecategories", _categories),
+    "users": ("users", _assignable_users),
+}
+
+def _list_body(name: str, db) -> bytes:
+    sheet_name, build = DROPDOWNS[name]
+    return cached_json_body(f"dropdowns/{name}", (), (sheet_name,), lambda headers: build(db))
+
+def _bundle(names, db) -> bytes:
+    return b"{" + b",".join(dumps(name) + b":" + _list_body(name, db) for name in names) + b"}"
+
+def _list_response(name: str, db):
+    try:
+        sheet_name, build = DROPDOWNS[name]
+        return cached_json_response(f"dropdowns/{name}", (), (sheet_name,), lambda headers: build(db))
+    except Exception as e:
+        print(f"❌ Error in {name} dropdown: {e}")
+        return []
+
 @router.get("/projects")
 async def get_projects_dropdown(
     db: any = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    try:
-        from app.models.models_db import Project
-        all_p = db.query(Project).all()
-        return [{"project_id": str(getattr(p, 'project_id', getattr(p, 'id', ''))), 
-                 "project_name": str(getattr(p, 'project_name', '')),
-                 "id": str(getattr(p, 'project_id', getattr(p, 'id', ''))),
-                 "name": str(getattr(p, 'project_name', ''))} 
-                for p in all_p if not getattr(p, 'is_deleted', False)]
-    except Exception as e:
-        print(f"❌ Error in projects dropdown: {e}")
-        return []
+    return _list_response("projects", db)
 
 @router.get("/machines")
 async def get_machines_dropdown(
     db: any = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    try:
-        from app.models.models_db import Machine
-        all_m = db.query(Machine).all()
-        return [{"machine_id": str(getattr(m, 'machine_id', getattr(m, 'id', ''))), 
-                 "machine_name": str(getattr(m, 'machine_name', '')),
-                 "id": str(getattr(m, 'machine_id', getattr(m, 'id', ''))),
-                 "name": str(getattr(m, 'machine_name', ''))} 
-                for m in all_m if not getattr(m, 'is_deleted', False)]
-    except Exception as e:
-        print(f"❌ Error in machines dropdown: {e}")
-        return []
+    return _list_response("machines", db)
 
 @router.get("/units")
 async def get_units_dropdown(
     db: any = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    try:
-        from app.models.models_db import Unit
-        all_u = db.query(Unit).all()
-        return [{"unit_id": str(getattr(u, 'unit_id', getattr(u, 'id', ''))), 
-                 "name": str(getattr(u, 'name', '')),
-                 "id": str(getattr(u, 'unit_id', getattr(u, 'id', '')))} 
-                for u in all_u if not getattr(u, 'is_deleted', False) and str(getattr(u, 'status', 'active')).lower() == 'active']
-    except Exception as e:
-        print(f"❌ Error in units dropdown: {e}")
-        return []
+    return _list_response("units", db)
 
 @router.get("/users/assignable", response_model=List[UserDropdownItem])
 async def get_assignable_users(
     db: any = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    return _list_response("users", db)
+
+@router.get("/all")
+async def get_all_dropdowns(
+    db: any = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Every dropdown list in one response: projects, machines, units, categories and assignable users."""
     try:
-        assignable_roles = ['admin', 'supervisor', 'planning', 'operator', 'fab_master', 'file_master']
-        all_u = db.query(User).all()
-        
-        results = []
-        for u in all_u:
-            if getattr(u, 'is_deleted', False) or not bool(getattr(u, 'active', True)):
-                continue
-            
-            # User Requirement: Pending users should NOT appear in assignable users
-            # RELAXED: Allow empty status
-            status = str(getattr(u, 'approval_status', '')).lower().strip()
-            if status in ['pending', 'rejected']:
-                continue
-            
-            role = str(getattr(u, 'role', '')).lower()
-            if role in assignable_roles:
-                u_id = str(getattr(u, 'user_id', getattr(u, 'id', '')))
-                results.append({
-                    "id": u_id,
-                    "user_id": u_id,
-                    "username": str(getattr(u, 'username', '')),
-                    "full_name": str(getattr(u, 'username', '')),
-                    "role": role
-                })
-        return results
+        sheet_names = tuple(sheet_name for sheet_name, _ in DROPDOWNS.values())
+        return cached_json_response("dropdowns/all", (), sheet_names, lambda headers: _bundle(DROPDOWNS, db))
     except Exception as e:
-        print(f"❌ Error in users dropdown: {e}")
-        return []
+        print(f"❌ Error in dropdowns bundle: {e}")
+        return {name: [] for name in DROPDOWNS}
 
 @router.get("/bootstrap")
 async def bootstrap_data(
@@ -111,37 +148,10 @@ async def bootstrap_data(
 ):
     """Consolidated endpoint to fetch all common dropdown data."""
     try:
-        from app.models.models_db import Unit, MachineCategory, Project, Machine
-        
-        p = [{"project_id": str(getattr(p, 'project_id', getattr(p, 'id', ''))), 
-              "project_name": str(getattr(p, 'project_name', '')),
-              "id": str(getattr(p, 'project_id', getattr(p, 'id', ''))), 
-              "name": str(getattr(p, 'project_name', ''))} 
-             for p in db.query(Project).all() if not getattr(p, 'is_deleted', False)]
-                   
-        m = [{"machine_id": str(getattr(m, 'machine_id', getattr(m, 'id', ''))), 
-              "machine_name": str(getattr(m, 'machine_name', '')),
-              "id": str(getattr(m, 'machine_id', getattr(m, 'id', ''))), 
-              "name": str(getattr(m, 'machine_name', ''))} 
-             for m in db.query(Machine).all() if not getattr(m, 'is_deleted', False)]
-                   
-        u = [{"unit_id": str(getattr(u, 'unit_id', getattr(u, 'id', ''))), 
-              "name": str(getattr(u, 'name', '')),
-              "id": str(getattr(u, 'unit_id', getattr(u, 'id', '')))} 
-             for u in db.query(Unit).all() if not getattr(u, 'is_deleted', False) and str(getattr(u, 'status', 'active')).lower() == 'active']
-                 
-        c = [{"category_id": str(getattr(c, 'category_id', getattr(c, 'id', ''))), 
-              "name": str(getattr(c, 'name', '')),
-              "id": str(getattr(c, 'category_id', getattr(c, 'id', '')))} 
-             for c in db.query(MachineCategory).all() if not getattr(c, 'is_deleted', False)]
-        
-        return {
-            "projects": p,
-            "machines": m,
-            "units": u,
-            "categories": c,
-            "server_time": get_current_time_ist().isoformat()
-        }
+        # Carries server_time, so only the lists are cached
+        lists = _bundle(("projects", "machines", "units", "categories"), db)
+        server_time = dumps(get_current_time_ist().isoformat())
+        return FastJSONResponse(content=lists[:-1] + b',"server_time":' + server_time + b"}")
     except Exception as e:
         print(f"❌ Error in bootstrap: {e}")
         return {"error": str(e), "projects": [], "machines": [], "units": [], "categories": []}
@@ -0,0 +1,107 @@
+import json
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Any
+from app.core.database import get_db
+from app.core.sheets_db import get_sheets_db
+from app.core.dependencies import get_current_user
+from app.models.models_db import User
+from app.services.task_events_service import task_events, RESYNC
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 5000
+
+async def get_stream_user(request: Request, token: Optional[str] = None, db: any = Depends(get_db)):
+    """Bearer header, or ?token= for EventSource clients (which cannot set headers)."""
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        token = auth[7:].strip()
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(token=token, db=db)
+
+def _sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+def _matches(event: Dict[str, Any], project_id: Optional[str], operator_id: Optional[str]) -> bool:
+    if project_id and project_id not in (event.get("project_id"), event.get("project")):
+        return False
+    if operator_id and operator_id not in (event.get("assigned_to"), event.get("previous_assigned_to")):
+        return False
+    return True
+
+@router.get("/tasks")
+async def stream_task_events(
+    request: Request,
+    project_id: Optional[str] = None,
+    operator_id: Optional[str] = None,
+    current_user: User = Depends(get_stream_user)
+):
+    """
+    Server-Sent Events feed of task transitions (start, hold, resume, complete, assign, ...).
+    Sends a `snapshot` of running tasks first, then one `task` event per transition.
+    Reconnects with Last-Event-ID receive the missed events, or a new snapshot if too many were missed.
+    """
+    from app.routers.supervisor_router import get_running_tasks
+
+    project_id = project_id if project_id and project_id != "all" else None
+    operator_id = operator_id if operator_id and operator_id != "all" else None
+    last_event_id = request.headers.get("last-event-id", "")
+    resume_from = int(last_event_id) if last_event_id.isdigit() else None
+
+    async def snapshot():
+        seq = task_events.last_seq
+        # The stream outlives the request-scoped session, so it reads through its own
+        tasks = await get_running_tasks(project_id=project_id, operator_id=operator_id, db=get_sheets_db())
+        return seq, _sse("snapshot", {"seq": seq, "tasks": tasks}, seq)
+
+    async def stream():
+        sub = task_events.subscribe()
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            missed = task_events.events_since(resume_from) if resume_from is not None else None
+            if missed is None:
+                seen, message = await snapshot()
+                yield message
+            else:
+                seen = resume_from
+                for event in missed:
+                    seen = event["seq"]
+                    if _matches(event, project_id, operator_id):
+                        yield _sse("task", event, event["seq"])
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is RESYNC:
+                    seen, message = await snapshot()
+                    yield message
+                    continue
+                if event["seq"] <= seen:
+                    continue # Already covered by the snapshot / replay
+                seen = event["seq"]
+                if _matches(event, project_id, operator_id):
+                    yield _sse("task", event, event["seq"])
+        finally:
+            task_events.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
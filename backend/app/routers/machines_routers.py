@@ -6,6 +6,7 @@ from app.models.models_db import Machine, Unit, MachineCategory
 from app.core.database import get_db
 import uuid
 from app.core.time_utils import get_current_time_ist
+from app.utils.fast_json import cached_json_response
 
 router = APIRouter(prefix="/machines", tags=["Machines"])
 
@@ -38,32 +39,36 @@ def normalize_machine_data(data: dict) -> dict:
 @router.get("", response_model=List[MachineOut])
 async def read_machines(db: Any = Depends(get_db)):
     """Get all active machines with post-fetch normalization and safety guard."""
-    all_ms = db.query(Machine).all()
-    
-    results = []
-    for m in all_ms:
-        try:
-            m_dict = m.dict()
-            # 1. Post-Fetch Normalization
-            norm_data = normalize_machine_data(m_dict)
-            
-            # 2. Skip if deleted
-            if norm_data.get("is_deleted", False):
-                continue
+    def build(headers):
+        all_ms = db.query(Machine).all()
+
+        results = []
+        for m in all_ms:
+            try:
+                m_dict = m.dict()
+                # 1. Post-Fetch Normalization
+                norm_data = normalize_machine_data(m_dict)
+
+                # 2. Skip if deleted
+                if norm_data.get("is_deleted", False):
+                    continue
+
+                # 3. Defensive Check: Ensure required ID fields are populated
+                if not norm_data.get("machine_id"):
+                    print(f"⚠️ [Machines] Skipping row with missing ID: {norm_data.get('machine_name', 'Unnamed')}")
+                    continue
+
+                # 4. Final Validation against Pydantic schema
+                valid_m = MachineOut(**norm_data)
+                results.append(valid_m.model_dump(mode="json"))
+            except Exception as e:
+                msg = getattr(m, 'machine_name', 'Unknown')
+                print(f"❌ [Machines] Invalid row '{msg}' skipped: {e}")
 
-            # 3. Defensive Check: Ensure required ID fields are populated
-            if not norm_data.get("machine_id"):
-                print(f"⚠️ [Machines] Skipping row with missing ID: {norm_data.get('machine_name', 'Unnamed')}")
-                continue
+        return results
 
-            # 4. Final Validation against Pydantic schema
-            valid_m = MachineOut(**norm_data)
-            results.append(valid_m)
-        except Exception as e:
-            msg = getattr(m, 'machine_name', 'Unknown')
-            print(f"❌ [Machines] Invalid row '{msg}' skipped: {e}")
-            
-    return results
+    # Validated and encoded once per version of the machines sheet
+    return cached_json_response("machines", (), ("machines",), build)
 
 @router.post("", response_model=MachineOut, status_code=201)
 async def create_machine(machine: MachineCreate, db: Any = Depends(get_db)):
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Optional, Any
 from app.schemas.task_schema import OperationalTaskCreate, OperationalTaskUpdate, OperationalTaskOut
 from app.models.models_db import FilingTask, FabricationTask, Project, User, Machine
@@ -6,71 +6,75 @@ from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.core.time_utils import get_current_time_ist
 from app.utils.datetime_utils import safe_datetime_diff
+from app.utils.pagination import PAGE_LIMIT_MAX, decode_cursor, set_next_cursor
+from app.utils.field_projection import parse_fields, project_row, model_defaults, fields_response
 import uuid
 from datetime import datetime
 
 router = APIRouter(prefix="/operational-tasks", tags=["Operational Tasks"])
 
-@router.get("/filing", response_model=List[OperationalTaskOut])
-async def get_filing_tasks(db: Any = Depends(get_db)):
-    """Get all filing tasks from cache."""
-    tasks = db.query(FilingTask).all()
-    
-    # Pre-load maps for efficiency (cached)
-    projects = {str(getattr(p, 'project_id', getattr(p, 'id', ''))): p.project_name for p in db.query(Project).all()}
-    machines = {str(getattr(m, 'machine_id', getattr(m, 'id', ''))): m.machine_name for m in db.query(Machine).all()}
-    
-    from app.core.normalizer import safe_normalize_list, normalize_task_row
-    
-    # Convert to dicts
-    task_dicts = [t.dict() if hasattr(t, 'dict') else t.__dict__ for t in tasks]
-    
-    # Normalize with type='filing'
-    normalized_tasks = safe_normalize_list(
-        task_dicts,
-        normalize_task_row,
-        "filing"
-    )
+OPERATIONAL_OUT_DEFAULTS = model_defaults(OperationalTaskOut)
 
-    results = []
-    for t in normalized_tasks:
-        # Enrich
-        t['project_name'] = projects.get(str(t.get('project_id', '')), 'Unknown')
-        t['machine_name'] = machines.get(str(t.get('machine_id', '')), 'Manual/None')
-        results.append(t)
-        
-    return results
+def _list_operational_tasks(sheet_name: str, row_type: str, response: Response, limit: Optional[int], cursor: Optional[str], fields: Optional[str], db: Any):
+    """Normalized + enriched rows of one operational sheet in (due date, created_at, id) order."""
+    wanted = parse_fields(fields, OperationalTaskOut.model_fields)
+    with_project = not wanted or 'project_name' in wanted
+    with_machine = not wanted or 'machine_name' in wanted
 
-@router.get("/fabrication", response_model=List[OperationalTaskOut])
-async def get_fabrication_tasks(db: Any = Depends(get_db)):
-    """Get all fabrication tasks from cache."""
-    tasks = db.query(FabricationTask).all()
+    # Pre-load maps for efficiency (cached); skipped when the column is not requested
+    projects = {str(getattr(p, 'project_id', getattr(p, 'id', ''))): p.project_name for p in db.query(Project).all()} if with_project else {}
+    machines = {str(getattr(m, 'machine_id', getattr(m, 'id', ''))): m.machine_name for m in db.query(Machine).all()} if with_machine else {}
     
-    # Pre-load maps (cached)
-    projects = {str(getattr(p, 'project_id', getattr(p, 'id', ''))): p.project_name for p in db.query(Project).all()}
-    machines = {str(getattr(m, 'machine_id', getattr(m, 'id', ''))): m.machine_name for m in db.query(Machine).all()}
-
-    from app.core.normalizer import safe_normalize_list, normalize_task_row
-    
-    # Convert to dicts
-    task_dicts = [t.dict() if hasattr(t, 'dict') else t.__dict__ for t in tasks]
-    
-    # Normalize with type='fabrication'
-    normalized_tasks = safe_normalize_list(
-        task_dicts,
-        normalize_task_row,
-        "fabrication"
-    )
+    from app.core.normalizer import normalize_task_row
+    from app.repositories.normalized_rows import normalized_rows
+    from app.repositories.task_order import task_order, TASK_KEY_SHAPE
 
     results = []
-    for t in normalized_tasks:
+    last_key = None
+    # Only the rows of the requested page are normalized
+    for key, _, row in task_order.iter_after((sheet_name,), decode_cursor(cursor, TASK_KEY_SHAPE)):
+        normalized = normalized_rows.normalize([row], normalize_task_row, row_type, sheet_name)
+        if not normalized:
+            continue
+        if limit and len(results) == limit:
+            set_next_cursor(response, last_key)
+            break
+
+        t = normalized[0]
         # Enrich
-        t['project_name'] = projects.get(str(t.get('project_id', '')), 'Unknown')
-        t['machine_name'] = machines.get(str(t.get('machine_id', '')), 'Manual/None')
-        results.append(t)
+        if with_project:
+            t['project_name'] = projects.get(str(t.get('project_id', '')), 'Unknown')
+        if with_machine:
+            t['machine_name'] = machines.get(str(t.get('machine_id', '')), 'Manual/None')
+        results.append(project_row(t, wanted, OPERATIONAL_OUT_DEFAULTS) if wanted else t)
+        last_key = key
         
+    if wanted:
+        return fields_response(results, response)
     return results
 
+@router.get("/filing", response_model=List[OperationalTaskOut])
+async def get_filing_tasks(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_LIMIT_MAX),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Any = Depends(get_db)
+):
+    """Get filing tasks from cache (paginated with `limit` / `cursor`, projected with `fields`)."""
+    return _list_operational_tasks("filingtasks", "filing", response, limit, cursor, fields, db)
+
+@router.get("/fabrication", response_model=List[OperationalTaskOut])
+async def get_fabrication_tasks(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_LIMIT_MAX),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Any = Depends(get_db)
+):
+    """Get fabrication tasks from cache (paginated with `limit` / `cursor`, projected with `fields`)."""
+    return _list_operational_tasks("fabricationtasks", "fabrication", response, limit, cursor, fields, db)
+
 @router.post("/filing", response_model=OperationalTaskOut)
 async def create_filing_task(data: OperationalTaskCreate, db: Any = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Create a new filing task with proper error handling"""
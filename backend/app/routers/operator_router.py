@@ -22,7 +22,8 @@ class TaskActionRequest(BaseModel):
 async def get_operator_tasks(user_id: str, db: Any = Depends(get_db)):
     """Fetch all tasks assigned to a specific operator across all categories"""
     from app.models.models_db import FilingTask, FabricationTask
-    from app.core.normalizer import safe_normalize_list, normalize_task_row
+    from app.core.normalizer import normalize_task_row
+    from app.repositories.normalized_rows import normalized_rows
     
     try:
         # 1. Fetch from all sources
@@ -31,8 +32,7 @@ async def get_operator_tasks(user_id: str, db: Any = Depends(get_db)):
         tasks.extend([t for t in db.query(FabricationTask).all() if str(getattr(t, 'assigned_to', '')) == str(user_id) and not getattr(t, 'is_deleted', False)])
         
         # 2. Extract stats
-        task_dicts = [t.dict() if hasattr(t, 'dict') else t.__dict__ for t in tasks]
-        normalized = safe_normalize_list(task_dicts, normalize_task_row, "task")
+        normalized = normalized_rows.normalize(tasks, normalize_task_row, "task")
         
         # Get machine names
         from app.models.models_db import Machine
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Optional
 from app.core.database import get_db
 from app.models.models_db import Task, User, Machine, FilingTask, FabricationTask, Project as DBProject
+from app.repositories.task_aggregates import task_aggregates
 
 router = APIRouter(
     prefix="/planning",
@@ -17,33 +18,10 @@ async def get_planning_dashboard_summary(
 ):
     """Refactored for SheetsDB with comprehensive aggregation and filtering"""
     try:
-        # Fetch all task types
-        gen_tasks = [t for t in db.query(Task).all() if not getattr(t, 'is_deleted', False)]
-        filing_tasks = [t for t in db.query(FilingTask).all() if not getattr(t, 'is_deleted', False)]
-        fab_tasks = [t for t in db.query(FabricationTask).all() if not getattr(t, 'is_deleted', False)]
-        
-        # Combine and apply filters
-        all_tasks_raw = []
-        for t in gen_tasks: all_tasks_raw.append(t)
-        for t in filing_tasks: all_tasks_raw.append(t)
-        for t in fab_tasks: all_tasks_raw.append(t)
-
-        if project_id and project_id != "all":
-            all_tasks_raw = [t for t in all_tasks_raw if str(getattr(t, 'project_id', '')) == str(project_id) or str(getattr(t, 'project', '')) == str(project_id)]
-        
-        if operator_id and operator_id != "all":
-            all_tasks_raw = [t for t in all_tasks_raw if str(getattr(t, 'assigned_to', '')) == str(operator_id)]
-
-        all_tasks_data = []
-        for t in all_tasks_raw:
-            all_tasks_data.append({
-                'status': getattr(t, 'status', 'pending'), 
-                'project_id': str(getattr(t, 'project_id', '')), 
-                'project': getattr(t, 'project', None), 
-                'machine_id': str(getattr(t, 'machine_id', '')), 
-                'assigned_to': str(getattr(t, 'assigned_to', '')), 
-                'title': getattr(t, 'title', getattr(t, 'part_item', 'Untitled'))
-            })
+        # Materialized task counts (all task types, non-deleted), filtered by project and operator
+        filters = dict(project=project_id, operator_id=operator_id, match_project_name=True)
+        by_project = task_aggregates.count_by(("project_id", "project", "status"), **filters)
+        by_machine = task_aggregates.count_by(("status", "machine_id"), **filters)
         
         projects = db.query(DBProject).all()
         p_map_info = {str(getattr(p, 'project_id', getattr(p, 'id', ''))): getattr(p, 'project_name', '') for p in projects if not getattr(p, 'is_deleted', False)}
@@ -57,33 +35,38 @@ async def get_planning_dashboard_summary(
         total_completed = 0
         total_on_hold = 0
         
-        for t in all_tasks_data:
-            p_name = p_map_info.get(t['project_id']) or t['project'] or "Unassigned"
-            if p_name not in project_stats: 
-                project_stats[p_name] = {'total': 0, 'completed': 0, 'ended': 0, 'in_progress': 0, 'pending': 0, 'on_hold': 0}
-            
-            project_stats[p_name]['total'] += 1
-            status_raw = str(t['status']).lower().strip()
+        def status_bucket(status_raw):
             # Normalize status for consistency
             status = 'pending'
             if status_raw in ('completed', 'finished', 'done'): status = 'completed'
             elif status_raw in ('in_progress', 'running', 'started'): status = 'in_progress'
             elif status_raw in ('on_hold', 'paused'): status = 'on_hold'
             elif status_raw == 'ended': status = 'ended'
+            return status
+
+        for (p_id, p_free, status_raw), count in by_project.items():
+            p_name = p_map_info.get(p_id) or p_free or "Unassigned"
+            if p_name not in project_stats: 
+                project_stats[p_name] = {'total': 0, 'completed': 0, 'ended': 0, 'in_progress': 0, 'pending': 0, 'on_hold': 0}
+            
+            project_stats[p_name]['total'] += count
+            status = status_bucket(status_raw)
             
             if status in project_stats[p_name]: 
-                project_stats[p_name][status] += 1
+                project_stats[p_name][status] += count
             
             if status == 'in_progress':
-                total_running += 1
-                if t['machine_id'] and t['machine_id'] != 'None' and t['machine_id'] != '':
-                    active_machine_ids.add(t['machine_id'])
+                total_running += count
             elif status == 'pending':
-                total_pending += 1
+                total_pending += count
             elif status in ['completed', 'ended']:
-                total_completed += 1
+                total_completed += count
             elif status == 'on_hold':
-                total_on_hold += 1
+                total_on_hold += count
+
+        for (status_raw, machine_id), _ in by_machine.items():
+            if status_bucket(status_raw) == 'in_progress' and machine_id and machine_id != 'None':
+                active_machine_ids.add(machine_id)
                 
         project_summary = []
         for name, s in project_stats.items():
@@ -116,11 +99,7 @@ async def get_planning_dashboard_summary(
         op_status = []
         for op in ops_query:
             op_id_str = str(getattr(op, 'user_id', getattr(op, 'id', '')))
-            curr = None
-            for t in all_tasks_data:
-                if t['assigned_to'] == op_id_str and str(t['status']).lower().strip() in ('in_progress', 'running'):
-                    curr = t['title']
-                    break
+            curr = task_aggregates.running_task_title(op_id_str, project=project_id, match_project_name=True)
             op_status.append({
                 "id": op_id_str,
                 "name": getattr(op, 'full_name', '') or getattr(op, 'username', ''), 
@@ -130,7 +109,7 @@ async def get_planning_dashboard_summary(
             
         return {
             "total_projects": len(project_summary),
-            "total_tasks": len(all_tasks_data),
+            "total_tasks": sum(by_project.values()),
             "total_tasks_running": total_running,
             "machines_active": len(active_machine_ids),
             "pending_tasks": total_pending,
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional
+from typing import List, Optional, Iterator, Any
 from datetime import datetime, date, timedelta
 from app.core.database import get_db
+from app.core.sheets_db import get_sheets_db
 from app.core.time_utils import get_current_time_ist, get_today_date_ist, IST
 from app.models.models_db import Task, TaskTimeLog, Machine, User, Attendance, MachineRuntimeLog, UserWorkLog, Unit, MachineCategory, Project, TaskHold
-from app.utils.csv_utils import generate_csv_stream, format_duration_hms
-from fastapi.responses import StreamingResponse
-import io
+from app.utils.csv_utils import csv_response, format_duration_hms
+from app.services.archive_service import needs_archive
+from app.services.report_engine import run_report, parse_group_by, DIMENSIONS
+from app.repositories.daily_rollups import daily_rollups
+from app.repositories.performance_rollups import performance_rollups
+from app.core.typed_columns import in_month, int_value
 
 router = APIRouter(
     prefix="/reports",
@@ -17,28 +21,27 @@ router = APIRouter(
 # HELPER FUNCTIONS (Aggregation Logic)
 # ----------------------------------------------------------------------
 
-def calculate_detailed_machine_activity(db: any, machine_id: str, target_date: date) -> List[dict]:
-    p = target_date.isoformat()
+def iter_detailed_machine_activity(db: any, machine_id: str, target_date: date) -> Iterator[dict]:
     from app.models.models_db import FilingTask, FabricationTask
     
-    logs = [l for l in db.query(MachineRuntimeLog).all() if str(l.machine_id) == str(machine_id) and str(l.date).startswith(p)]
+    logs = [l for l in db.query_range(MachineRuntimeLog, target_date).all() if str(l.machine_id) == str(machine_id)]
     
-    # Pre-build unified task map
-    gen = {str(t.id): t for t in db.query(Task).all()}
-    filing = {str(t.id): t for t in db.query(FilingTask).all()}
-    fab = {str(t.id): t for t in db.query(FabricationTask).all()}
+    # Pre-build unified task map (archive only for dates past the hot window)
+    hist = needs_archive(target_date)
+    gen = {str(t.id): t for t in db.query(Task, include_archive=hist).all()}
+    filing = {str(t.id): t for t in db.query(FilingTask, include_archive=hist).all()}
+    fab = {str(t.id): t for t in db.query(FabricationTask, include_archive=hist).all()}
     tasks = {**gen, **filing, **fab}
     
     users = {str(u.user_id): u for u in db.query(User).all()}
     
-    res = []
     for l in logs:
         t = tasks.get(str(l.task_id))
         title = "Unknown"
         if t:
             title = getattr(t, 'title', getattr(t, 'part_item', 'Untitled'))
             
-        res.append({
+        yield {
             "task_id": str(l.task_id),
             "task_title": title,
             "operator": users.get(str(t.assigned_to)).username if t and str(getattr(t, 'assigned_to', '')) in users else "Unknown",
@@ -46,24 +49,22 @@ def calculate_detailed_machine_activity(db: any, machine_id: str, target_date: d
             "end_time": str(l.end_time or ""),
             "runtime_seconds": int(l.duration_seconds or 0),
             "status": "Completed" if l.end_time else "In Progress"
-        })
-    return res
+        }
 
-def calculate_detailed_user_activity(db: any, user_id: str, target_date: date) -> List[dict]:
-    p = target_date.isoformat()
+def iter_detailed_user_activity(db: any, user_id: str, target_date: date) -> Iterator[dict]:
     from app.models.models_db import FilingTask, FabricationTask
 
-    logs = [l for l in db.query(UserWorkLog).all() if str(l.user_id) == str(user_id) and str(l.date).startswith(p)]
+    logs = [l for l in db.query_range(UserWorkLog, target_date).all() if str(l.user_id) == str(user_id)]
     
-    # Pre-build unified task map
-    gen = {str(t.id): t for t in db.query(Task).all()}
-    filing = {str(t.id): t for t in db.query(FilingTask).all()}
-    fab = {str(t.id): t for t in db.query(FabricationTask).all()}
+    # Pre-build unified task map (archive only for dates past the hot window)
+    hist = needs_archive(target_date)
+    gen = {str(t.id): t for t in db.query(Task, include_archive=hist).all()}
+    filing = {str(t.id): t for t in db.query(FilingTask, include_archive=hist).all()}
+    fab = {str(t.id): t for t in db.query(FabricationTask, include_archive=hist).all()}
     tasks = {**gen, **filing, **fab}
     
     machines = {str(m.id): m for m in db.query(Machine).all()}
     
-    res = []
     for l in logs:
         t = tasks.get(str(l.task_id))
         m = machines.get(str(l.machine_id))
@@ -71,7 +72,7 @@ def calculate_detailed_user_activity(db: any, user_id: str, target_date: date) -
         if t:
             title = getattr(t, 'title', getattr(t, 'part_item', 'Untitled'))
             
-        res.append({
+        yield {
             "task_id": str(l.task_id),
             "task_title": title,
             "machine_name": m.machine_name if m else "None",
@@ -79,79 +80,78 @@ def calculate_detailed_user_activity(db: any, user_id: str, target_date: date) -
             "end_time": str(l.end_time or ""),
             "duration_seconds": int(l.duration_seconds or 0),
             "status": "Completed" if l.end_time else "In Progress"
-        })
-    return res
+        }
+
+def calculate_detailed_machine_activity(db: any, machine_id: str, target_date: date) -> List[dict]:
+    return list(iter_detailed_machine_activity(db, machine_id, target_date))
+
+def calculate_detailed_user_activity(db: any, user_id: str, target_date: date) -> List[dict]:
+    return list(iter_detailed_user_activity(db, user_id, target_date))
+
+def _period_label(start: date, end: date) -> str:
+    return start.isoformat() if end == start else f"{start.isoformat()} to {end.isoformat()}"
+
+def _attendance_day(raw: Any) -> str:
+    """'YYYY-MM-DD' of an attendance row's date (sheets carry ISO, YYYY/MM/DD or DD/MM/YYYY)."""
+    att_day = str(raw).strip().split('T')[0].split(' ')[0]
+    if '/' in att_day:
+        p = att_day.split('/')
+        if len(p) == 3:
+            try:
+                if len(p[0]) == 4: # YYYY/MM/DD
+                    att_day = f"{p[0]}-{int(p[1]):02d}-{int(p[2]):02d}"
+                else: # Assume DD/MM/YYYY
+                    att_day = f"{p[2]}-{int(p[1]):02d}-{int(p[0]):02d}"
+            except: pass
+    return att_day
 
 # Helper functions refactored for SheetsDB
-def calculate_machine_runtime(db: any, target_date: date) -> List[dict]:
-    target_date_str = target_date.isoformat()
-    from app.models.models_db import FilingTask, FabricationTask
+def iter_machine_runtime(db: any, target_date: date, end_date: Optional[date] = None) -> Iterator[dict]:
+    """Per-machine runtime / completed tasks for a day, or for [target_date, end_date]."""
+    end_date = end_date or target_date
+    period = _period_label(target_date, end_date)
     
     # 1. Fetch Machines
     all_machines = db.query(Machine).all()
     machines = [m for m in all_machines if not getattr(m, 'is_deleted', False)]
     
-    units = {str(getattr(u, 'unit_id', getattr(u, 'id', ''))): str(u.name) for u in db.query(Unit).all()}
+    units = {str(getattr(u, 'unit_id', '') or u.id): str(u.name) for u in db.query(Unit).all()}
     categories = {str(c.id): str(c.name) for c in db.query(MachineCategory).all()}
     
-    # 2. Daily Logs for Runtime
-    logs = [l for l in db.query(MachineRuntimeLog).all() if str(l.date).startswith(target_date_str)]
-    
-    # 3. Tasks completed across all 3 sheets
-    def get_comp_date(t): return str(getattr(t, 'completed_at', '') or getattr(t, 'actual_end_time', '') or '')
-
-    completed_gen = [t for t in db.query(Task).all() if not getattr(t, 'is_deleted', False) and str(t.status).lower() == 'completed' and get_comp_date(t).startswith(target_date_str)]
-    completed_filing = [t for t in db.query(FilingTask).all() if not getattr(t, 'is_deleted', False) and str(t.status).lower() == 'completed' and get_comp_date(t).startswith(target_date_str)]
-    completed_fab = [t for t in db.query(FabricationTask).all() if not getattr(t, 'is_deleted', False) and str(t.status).lower() == 'completed' and get_comp_date(t).startswith(target_date_str)]
-    
-    all_completed = completed_gen + completed_filing + completed_fab
+    # 2. Runtime and completions from the precomputed daily rollups
+    groups = daily_rollups.machine_totals(target_date, end_date, include_archive=needs_archive(target_date))
 
-    # 4. Aggregate Stats
-    machine_stats = {}
-    for m in machines:
-        mid = str(getattr(m, 'machine_id', getattr(m, 'id', '')))
-        machine_stats[mid] = {"runtime": 0, "completed_tasks": 0, "is_running_now": False, "obj": m}
-    
-    for log in logs:
-        mid_str = str(log.machine_id)
-        if mid_str in machine_stats:
-            machine_stats[mid_str]["runtime"] += int(log.duration_seconds or 0)
-            if not log.end_time: # Still running
-                machine_stats[mid_str]["is_running_now"] = True
-    
-    for t in all_completed:
-        mid_str = str(t.machine_id)
-        if mid_str in machine_stats:
-            machine_stats[mid_str]["completed_tasks"] += 1
-            
-    results = []
-    for m_id, stats in machine_stats.items():
-        m = stats["obj"]
-        m_id_actual = str(getattr(m, 'machine_id', getattr(m, 'id', '')))
+    by_id = {str(getattr(m, 'machine_id', '') or m.id): m for m in machines}
+    for m_id_actual, m in by_id.items():
+        stats = groups.get(m_id_actual) or {}
+        runtime = stats.get("runtime_seconds", 0)
+        is_running_now = stats.get("running_now", False)
         
         # More descriptive status for machines
         status_label = "Idle"
-        if stats["is_running_now"]:
+        if is_running_now:
             status_label = "In Use"
-        elif stats["runtime"] > 0:
+        elif runtime > 0:
             status_label = "Active"
             
-        results.append({
+        unit = str(getattr(m, 'unit', '') or '')
+        category = str(getattr(m, 'category', '') or '')
+        yield {
             "machine_id": m_id_actual,
             "machine_name": str(m.machine_name),
-            "unit": units.get(str(getattr(m, 'unit_id', getattr(m, 'id', ''))), ""),
-            "category": categories.get(str(getattr(m, 'category_id', getattr(m, 'id', ''))), ""),
-            "date": target_date_str,
-            "runtime_seconds": stats["runtime"],
-            "tasks_run_count": stats["completed_tasks"],
-            "is_running_now": stats["is_running_now"],
+            "unit": units.get(unit, unit),
+            "category": categories.get(category, category),
+            "date": period,
+            "runtime_seconds": runtime,
+            "tasks_run_count": stats.get("completed_tasks", 0),
+            "is_running_now": is_running_now,
             "status": status_label
-        })
-    return results
+        }
 
-def calculate_user_activity(db: any, target_date: date) -> List[dict]:
-    target_date_str = target_date.isoformat()
-    from app.models.models_db import FilingTask, FabricationTask
+def iter_user_activity(db: any, target_date: date, end_date: Optional[date] = None) -> Iterator[dict]:
+    """Per-operator work time / completed tasks / presence for a day, or for [target_date, end_date]."""
+    end_date = end_date or target_date
+    start_str, end_str = target_date.isoformat(), end_date.isoformat()
     
     # 1. Fetch Users (Operators & Masters)
     users = []
@@ -165,78 +165,43 @@ def calculate_user_activity(db: any, target_date: date) -> List[dict]:
             continue
         users.append(u)
     
-    # 2. Daily Logs for Work Time
-    logs = [l for l in db.query(UserWorkLog).all() if str(l.date).startswith(target_date_str)]
-    
-    # 3. Tasks completed across all 3 sheets
-    def get_comp_date(t): return str(getattr(t, 'completed_at', '') or getattr(t, 'actual_end_time', '') or '')
+    # 2. Work time, machines and completions from the precomputed daily rollups
+    groups = daily_rollups.user_totals(target_date, end_date, include_archive=needs_archive(target_date))
 
-    completed_gen = [t for t in db.query(Task).all() if not getattr(t, 'is_deleted', False) and str(t.status).lower() == 'completed' and get_comp_date(t).startswith(target_date_str)]
-    completed_filing = [t for t in db.query(FilingTask).all() if not getattr(t, 'is_deleted', False) and str(t.status).lower() == 'completed' and get_comp_date(t).startswith(target_date_str)]
-    completed_fab = [t for t in db.query(FabricationTask).all() if not getattr(t, 'is_deleted', False) and str(t.status).lower() == 'completed' and get_comp_date(t).startswith(target_date_str)]
-    
-    all_completed = completed_gen + completed_filing + completed_fab
-
-    # 4. Attendance sync - Robust matching
-    attendance_data = db.query(Attendance).all()
+    # 3. Attendance sync - Robust matching
     attendees = set()
-    for att in attendance_data:
-        # Normalize date for comparison
+    for att in db.query(Attendance).all():
         raw_att_date = str(getattr(att, 'date', getattr(att, 'check_in', '')))
         if not raw_att_date: continue
-        
-        # Robust date extraction (supporting various formats from sheets)
-        att_day = str(raw_att_date).strip().split('T')[0].split(' ')[0]
-        if '/' in att_day:
-            p = att_day.split('/')
-            if len(p) == 3:
-                try:
-                    if len(p[0]) == 4: # YYYY/MM/DD
-                        att_day = f"{p[0]}-{int(p[1]):02d}-{int(p[2]):02d}"
-                    else: # Assume DD/MM/YYYY
-                        att_day = f"{p[2]}-{int(p[1]):02d}-{int(p[0]):02d}"
-                except: pass
-        
-        if att_day == target_date_str:
+        if start_str <= _attendance_day(raw_att_date) <= end_str:
             attendees.add(str(getattr(att, 'user_id', getattr(att, 'id', ''))).strip().lower())
 
-    # 5. Aggregate Stats
-    user_stats = {str(u.user_id): {"work_time": 0, "completed_tasks": 0, "obj": u, "machines": set()} for u in users}
-    
-    for log in logs:
-        uid_str = str(log.user_id)
-        if uid_str in user_stats:
-            user_stats[uid_str]["work_time"] += int(log.duration_seconds or 0)
-            if log.machine_id: 
-                user_stats[uid_str]["machines"].add(str(log.machine_id))
-            
-    for t in all_completed:
-        uid_str = str(t.assigned_to)
-        if uid_str in user_stats:
-            user_stats[uid_str]["completed_tasks"] += 1
-            
-    return [{
-        "user_id": uid,
-        "username": str(s["obj"].username),
-        "full_name": str(s["obj"].full_name or s["obj"].username),
-        "date": target_date_str,
-        "tasks_worked_count": s["completed_tasks"],
-        "total_work_seconds": s["work_time"],
-        "machines_used": list(s["machines"]),
-        "status": "Present" if (s["work_time"] > 0 or str(uid).strip().lower() in attendees or s["completed_tasks"] > 0) else "Absent"
-    } for uid, s in user_stats.items()]
+    by_id = {str(u.user_id): u for u in users}
+    for uid, u in by_id.items():
+        stats = groups.get(uid) or {}
+        work_time = stats.get("work_seconds", 0)
+        completed = stats.get("completed_tasks", 0)
+        yield {
+            "user_id": uid,
+            "username": str(u.username),
+            "full_name": str(u.full_name or u.username),
+            "date": _period_label(target_date, end_date),
+            "tasks_worked_count": completed,
+            "total_work_seconds": work_time,
+            "machines_used": sorted(stats.get("machine_ids", [])),
+            "status": "Present" if (work_time > 0 or uid.strip().lower() in attendees or completed > 0) else "Absent"
+        }
+
+def calculate_machine_runtime(db: any, target_date: date, end_date: Optional[date] = None) -> List[dict]:
+    return list(iter_machine_runtime(db, target_date, end_date))
+
+def calculate_user_activity(db: any, target_date: date, end_date: Optional[date] = None) -> List[dict]:
+    return list(iter_user_activity(db, target_date, end_date))
 
 def calculate_monthly_performance(db: any, year: int) -> dict:
-    completed_in_year = [t for t in db.query(Task).all() if not t.is_deleted and str(t.status).lower() == 'completed' and t.completed_at and str(t.completed_at).startswith(str(year))]
-    
-    data_by_month = {m: {"total_tasks": 0, "total_duration": 0} for m in range(1, 13)}
-    
-    for t in completed_in_year:
-        try:
-            month = int(str(t.completed_at).split('-')[1])
-            data_by_month[month]["total_tasks"] += 1
-            data_by_month[month]["total_duration"] += int(t.total_duration_seconds or 0)
-        except: pass
+    # Per-month counters maintained by the repository (see performance_rollups)
+    by_month = performance_rollups.year(year, include_archive=needs_archive(date(year, 1, 1)))
+    data_by_month = {m: {"total_tasks": count, "total_duration": dur} for m, (count, dur) in by_month.items()}
         
     months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
     chart_data = []
@@ -258,60 +223,111 @@ def calculate_monthly_performance(db: any, year: int) -> dict:
         
     return {"year": year, "chart_data": chart_data, "csv_rows": csv_rows}
 
-# Endpoints
-@router.get("/machines/daily")
-async def get_machine_daily_report(date_str: Optional[str] = None, db: any = Depends(get_db)):
+MAX_REPORT_DAYS = 366
+
+def _report_period(date_str: Optional[str], end_date_str: Optional[str]):
+    """(start, end) from the ?date_str= / ?end_date_str= pair; end defaults to start."""
     target_date = get_today_date_ist()
     if date_str:
         try: target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
         except: pass
-    return {"date": target_date.isoformat(), "report": calculate_machine_runtime(db, target_date)}
+    end_date = target_date
+    if end_date_str:
+        try: end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+        except: pass
+    if end_date < target_date:
+        raise HTTPException(status_code=400, detail="end_date_str must not be before date_str")
+    if (end_date - target_date).days >= MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Report period is limited to {MAX_REPORT_DAYS} days")
+    return target_date, end_date
+
+def _period_suffix(start: date, end: date) -> str:
+    return str(start) if end == start else f"{start}_{end}"
+
+# Endpoints
+@router.get("/machines/daily")
+async def get_machine_daily_report(date_str: Optional[str] = None, end_date_str: Optional[str] = None, db: any = Depends(get_db)):
+    target_date, end_date = _report_period(date_str, end_date_str)
+    return {"date": target_date.isoformat(), "end_date": end_date.isoformat(), "report": calculate_machine_runtime(db, target_date, end_date)}
 
 @router.get("/users/daily")
-async def get_user_daily_report(date_str: Optional[str] = None, db: any = Depends(get_db)):
-    target_date = get_today_date_ist()
-    if date_str:
-        try: target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except: pass
-    return {"date": target_date.isoformat(), "report": calculate_user_activity(db, target_date)}
+async def get_user_daily_report(date_str: Optional[str] = None, end_date_str: Optional[str] = None, db: any = Depends(get_db)):
+    target_date, end_date = _report_period(date_str, end_date_str)
+    return {"date": target_date.isoformat(), "end_date": end_date.isoformat(), "report": calculate_user_activity(db, target_date, end_date)}
 
 @router.get("/monthly-performance")
 async def get_monthly_performance(year: Optional[int] = None, db: any = Depends(get_db)):
     if not year: year = get_current_time_ist().year
     return calculate_monthly_performance(db, year)
 
+@router.get("/range")
+async def get_range_report(
+    start: date = Query(default_factory=get_today_date_ist),
+    end: Optional[date] = None,
+    group_by: Optional[str] = Query(None, description=f"Comma-separated: {', '.join(DIMENSIONS)}"),
+    format: str = "json",
+    db: any = Depends(get_db)
+):
+    """
+    Machine runtime, operator work time and completed tasks over [start, end],
+    grouped by any combination of date, machine, operator, unit, category and project.
+    `format=csv` downloads the same rows.
+    """
+    end = end or start
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days >= MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Report period is limited to {MAX_REPORT_DAYS} days")
+    try:
+        dims = parse_group_by(group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = run_report(db, start, end, dims)
+    if format.lower() != "csv":
+        return {"start": start.isoformat(), "end": end.isoformat(), "group_by": list(dims), "report": rows}
+
+    headers, columns = [], []
+    for dim in dims:
+        if dim == "date":
+            headers.append("Date"); columns.append("date")
+        else:
+            headers.append(dim.capitalize()); columns.append(f"{dim}_name")
+    headers += ["Runtime (Mins)", "Runtime Sessions", "Work Time (Mins)", "Work Sessions", "Tasks Completed"]
+    csv_rows = (
+        [r[c] or r.get(c.replace("_name", "_id"), "") for c in columns] + [
+            round(r["runtime_seconds"]/60, 2), r["runtime_sessions"],
+            round(r["work_seconds"]/60, 2), r["work_sessions"], r["completed_tasks"]
+        ]
+        for r in rows
+    )
+    return csv_response(f"report_{'_'.join(dims)}_{_period_suffix(start, end)}.csv", headers, csv_rows)
+
 @router.get("/machines/export-csv")
-async def export_machines_csv(date_str: Optional[str] = None, db: any = Depends(get_db)):
-    target_date = get_today_date_ist()
-    if date_str:
-        try: target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except: pass
-    data = calculate_machine_runtime(db, target_date)
+async def export_machines_csv(date_str: Optional[str] = None, end_date_str: Optional[str] = None):
+    target_date, end_date = _report_period(date_str, end_date_str)
+    # Rows are produced while the response streams, through a session of its own
+    data = iter_machine_runtime(get_sheets_db(), target_date, end_date)
     headers = ["Date", "Machine Name", "Runtime (Mins)", "Tasks Run", "Status"]
-    rows = [[d["date"], d["machine_name"], round(d["runtime_seconds"]/60, 2), d["tasks_run_count"], d["status"]] for d in data]
-    stream = generate_csv_stream(headers, rows)
-    return StreamingResponse(iter([stream.getvalue()]), media_type="text/csv", headers={'Content-Disposition': f'attachment; filename="machine_report_{target_date}.csv"'})
+    rows = ([d["date"], d["machine_name"], round(d["runtime_seconds"]/60, 2), d["tasks_run_count"], d["status"]] for d in data)
+    return csv_response(f"machine_report_{_period_suffix(target_date, end_date)}.csv", headers, rows)
 
 @router.get("/users/export-csv")
-async def export_users_csv(date_str: Optional[str] = None, db: any = Depends(get_db)):
-    target_date = get_today_date_ist()
-    if date_str:
-        try: target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except: pass
-    data = calculate_user_activity(db, target_date)
+async def export_users_csv(date_str: Optional[str] = None, end_date_str: Optional[str] = None):
+    target_date, end_date = _report_period(date_str, end_date_str)
+    # Rows are produced while the response streams, through a session of its own
+    data = iter_user_activity(get_sheets_db(), target_date, end_date)
     headers = ["Date", "User Name", "Work Time (Mins)", "Tasks Worked", "Status"]
-    rows = [[d["date"], d["full_name"], round(d["total_work_seconds"]/60, 2), d["tasks_worked_count"], d["status"]] for d in data]
-    stream = generate_csv_stream(headers, rows)
-    return StreamingResponse(iter([stream.getvalue()]), media_type="text/csv", headers={'Content-Disposition': f'attachment; filename="user_report_{target_date}.csv"'})
+    rows = ([d["date"], d["full_name"], round(d["total_work_seconds"]/60, 2), d["tasks_worked_count"], d["status"]] for d in data)
+    return csv_response(f"user_report_{_period_suffix(target_date, end_date)}.csv", headers, rows)
 
 @router.get("/monthly/export-csv")
 async def export_monthly_performance_csv(year: Optional[int] = None, db: any = Depends(get_db)):
     if not year: year = get_current_time_ist().year
     analysis = calculate_monthly_performance(db, year)
     headers = ["Month", "Tasks Completed", "Total Runtime (HMS)", "Average Time (HMS)"]
-    rows = [[r["month"], r["tasks_completed"], r["total_runtime_hms"], r["aht_hms"]] for r in analysis["csv_rows"]]
-    stream = generate_csv_stream(headers, rows)
-    return StreamingResponse(iter([stream.getvalue()]), media_type="text/csv", headers={'Content-Disposition': f'attachment; filename="monthly_performance_{year}.csv"'})
+    rows = ([r["month"], r["tasks_completed"], r["total_runtime_hms"], r["aht_hms"]] for r in analysis["csv_rows"])
+    return csv_response(f"monthly_performance_{year}.csv", headers, rows)
 
 @router.get("/projects/export-csv")
 async def export_projects_summary_csv(year_month: Optional[str] = None, db: any = Depends(get_db)):
@@ -321,8 +337,8 @@ async def export_projects_summary_csv(year_month: Optional[str] = None, db: any
         except: pass
     pattern = f"{target_dt.year}-{target_dt.month:02d}"
     
-    all_tasks = db.query(Task).all()
-    tasks = [t for t in all_tasks if not t.is_deleted and str(t.status).lower() == 'completed' and str(t.completed_at).startswith(pattern)]
+    all_tasks = db.query(Task, include_archive=needs_archive(target_dt.replace(day=1))).all()
+    tasks = [t for t in all_tasks if not t.is_deleted and str(t.status).lower() == 'completed' and in_month(t, 'completed_at', target_dt.year, target_dt.month)]
     
     p_all = {str(p.id or p.project_id): p for p in db.query(Project).all()}
     stats = {}
@@ -330,16 +346,14 @@ async def export_projects_summary_csv(year_month: Optional[str] = None, db: any
         pid = str(t.project_id)
         if pid not in stats: stats[pid] = {"count": 0, "dur": 0, "obj": p_all.get(pid)}
         stats[pid]["count"] += 1
-        stats[pid]["dur"] += int(t.total_duration_seconds or 0)
+        stats[pid]["dur"] += int_value(t, 'total_duration_seconds')
         
     headers = ["Project Name", "Work Order", "Client", "Tasks", "Total Runtime"]
-    rows = []
-    for pid, s in stats.items():
-        if not s["obj"]: continue
-        rows.append([str(s["obj"].project_name), str(s["obj"].work_order_number), str(s["obj"].client_name), s["count"], format_duration_hms(s["dur"])])
-        
-    stream = generate_csv_stream(headers, rows)
-    return StreamingResponse(iter([stream.getvalue()]), media_type="text/csv", headers={'Content-Disposition': f'attachment; filename="project_summary_{pattern}.csv"'})
+    rows = (
+        [str(s["obj"].project_name), str(s["obj"].work_order_number), str(s["obj"].client_name), s["count"], format_duration_hms(s["dur"])]
+        for s in stats.values() if s["obj"]
+    )
+    return csv_response(f"project_summary_{pattern}.csv", headers, rows)
 
 @router.get("/machine-detailed")
 async def get_machine_detailed_report(
@@ -380,7 +394,7 @@ async def get_active_work_monitoring(db: any = Depends(get_db)):
     return res
 
 @router.get("/machines/detailed-csv")
-async def export_machine_detailed_csv(machine_id: str, date_str: Optional[str] = None, db: any = Depends(get_db)):
+async def export_machine_detailed_csv(machine_id: str, date_str: Optional[str] = None):
     """Detailed activity list for a machine."""
     target_date = get_today_date_ist()
     if date_str:
@@ -389,27 +403,19 @@ async def export_machine_detailed_csv(machine_id: str, date_str: Optional[str] =
         except ValueError:
             pass
             
-    data = calculate_detailed_machine_activity(db, machine_id, target_date)
+    # Sessions are produced while the response streams, not collected up front.
+    # The stream outlives the request-scoped session, so it reads through its own
+    data = iter_detailed_machine_activity(get_sheets_db(), machine_id, target_date)
     
     headers = ["Task Title", "Operator", "Start Time", "End Time", "Runtime (Secs)", "Status"]
-    rows = []
-    for d in data:
-        rows.append([
-            d["task_title"],
-            d["operator"],
-            d["start_time"],
-            d["end_time"],
-            d["runtime_seconds"],
-            d["status"]
-        ])
-        
-    filename = f"machine_detailed_{machine_id}_{target_date}.csv"
-    stream = generate_csv_stream(headers, rows)
-    response_headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
-    return StreamingResponse(iter([stream.getvalue()]), media_type="text/csv", headers=response_headers)
+    rows = (
+        [d["task_title"], d["operator"], d["start_time"], d["end_time"], d["runtime_seconds"], d["status"]]
+        for d in data
+    )
+    return csv_response(f"machine_detailed_{machine_id}_{target_date}.csv", headers, rows)
 
 @router.get("/users/detailed-csv")
-async def export_user_detailed_csv(user_id: str, date_str: Optional[str] = None, db: any = Depends(get_db)):
+async def export_user_detailed_csv(user_id: str, date_str: Optional[str] = None):
     """Detailed activity list for a user."""
     target_date = get_today_date_ist()
     if date_str:
@@ -418,21 +424,13 @@ async def export_user_detailed_csv(user_id: str, date_str: Optional[str] = None,
         except ValueError:
             pass
             
-    data = calculate_detailed_user_activity(db, user_id, target_date)
+    # Sessions are produced while the response streams, not collected up front.
+    # The stream outlives the request-scoped session, so it reads through its own
+    data = iter_detailed_user_activity(get_sheets_db(), user_id, target_date)
     
     headers = ["Task Title", "Machine", "Start Time", "End Time", "Duration (Secs)", "Status"]
-    rows = []
-    for d in data:
-        rows.append([
-            d["task_title"],
-            d["machine_name"],
-            d["start_time"],
-            d["end_time"],
-            d["duration_seconds"],
-            d["status"]
-        ])
-        
-    filename = f"user_detailed_{user_id}_{target_date}.csv"
-    stream = generate_csv_stream(headers, rows)
-    response_headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
-    return StreamingResponse(iter([stream.getvalue()]), media_type="text/csv", headers=response_headers)
+    rows = (
+        [d["task_title"], d["machine_name"], d["start_time"], d["end_time"], d["duration_seconds"], d["status"]]
+        for d in data
+    )
+    return csv_response(f"user_detailed_{user_id}_{target_date}.csv", headers, rows)
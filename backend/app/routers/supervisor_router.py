@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
 from pydantic import BaseModel
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.models_db import Task, User, Machine, TaskHold, Project
 from app.utils.datetime_utils import utc_now, make_aware, safe_datetime_diff
+from app.utils.pagination import PAGE_LIMIT_MAX, decode_cursor, set_next_cursor
+from app.utils.field_projection import parse_fields, project_row, fields_response
 from app.core.normalizer import (
     normalize_task_row, 
-    safe_normalize_list, 
     is_valid_row,
     safe_str,
     safe_int
 )
+from app.repositories.normalized_rows import normalized_rows
+from app.services.grouping import group_by
 from datetime import datetime, timezone
 import uuid
 import logging
@@ -33,28 +36,42 @@ class AssignTaskRequest(BaseModel):
     due_date: Optional[datetime] = None
 
 @router.get("/pending-tasks")
-async def get_pending_tasks(db: any = Depends(get_db)):
+async def get_pending_tasks(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_LIMIT_MAX),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: any = Depends(get_db)
+):
     """
     Get all pending tasks that need assignment.
     FIXED: Includes Task, FabricationTask, and FilingTask
+    Sorted by (due date, created_at, id); `limit` / `cursor` page through the list,
+    `fields=a,b,...` limits the returned columns.
     """
-    from app.models.models_db import Task, FilingTask, FabricationTask
+    from app.core.sheets_db import SheetRow
+    from app.repositories.task_order import task_order, TASK_KEY_SHAPE
+    after = decode_cursor(cursor, TASK_KEY_SHAPE)
+    wanted = parse_fields(fields)
     try:
-        # 1. Fetch ALL task types
-        all_tasks = db.query(Task).all()
-        try:
-            all_tasks.extend(db.query(FilingTask).all())
-            all_tasks.extend(db.query(FabricationTask).all())
-        except Exception as e:
-            logger.warning(f"Failed to fetch specialized tasks for pending list: {e}")
-
-        # Convert to dicts
-        task_dicts = [t.dict() if hasattr(t, 'dict') else t.__dict__ for t in all_tasks]
+        # Get user and machine maps for enrichment (only when those columns are wanted)
+        user_map, machine_map = {}, {}
+        if not wanted or 'assigned_by_name' in wanted:
+            all_users = db.query(User).all()
+            user_map = {safe_str(getattr(u, 'user_id', getattr(u, 'id', ''))): u for u in all_users}
+        
+        if not wanted or 'machine_name' in wanted:
+            all_machines = db.query(Machine).all()
+            machine_map = {safe_str(getattr(m, 'machine_id', getattr(m, 'id', ''))): m for m in all_machines}
         
-        # 2. Filter pending/unassigned tasks
-        # ROBUST: Allow 'active', 'todo' or empty status as 'pending'
-        pending_dicts = []
-        for t in task_dicts:
+        # 1. Walk ALL task types in pre-sorted order, stopping once the page is full
+        result = []
+        last_key = None
+        for key, sheet_name, row in task_order.iter_after(after=after):
+            t = SheetRow(row, sheet_name).dict()
+            
+            # 2. Filter pending/unassigned tasks
+            # ROBUST: Allow 'active', 'todo' or empty status as 'pending'
             if not is_valid_row(t, "task"): continue
             
             # Canonical status normalization for filter logic
@@ -66,45 +83,39 @@ async def get_pending_tasks(db: any = Depends(get_db)):
             assigned_to = str(t.get('assigned_to', '')).strip()
             is_unassigned = not assigned_to or assigned_to.lower() in ['unassigned', '-', 'none']
             
-            if is_pending_status or is_unassigned:
-                 # Check it's not actually 'in_progress' or 'completed'
-                 if status in ['in_progress', 'completed', 'ended']:
-                      continue
-                 pending_dicts.append(t)
-        
-        logger.info(f"📋 Pending Tasks: Found {len(pending_dicts)} tasks needing assignment")
-        
-        # 3. Normalize to prevent UI crashes
-        normalized_tasks = safe_normalize_list(
-            pending_dicts,
-            normalize_task_row,
-            "task"
-        )
-        
-        # Get user and machine maps for enrichment
-        all_users = db.query(User).all()
-        user_map = {safe_str(getattr(u, 'user_id', getattr(u, 'id', ''))): u for u in all_users}
-        
-        all_machines = db.query(Machine).all()
-        machine_map = {safe_str(getattr(m, 'machine_id', getattr(m, 'id', ''))): m for m in all_machines}
-        
-        # Enrich with names
-        result = []
-        for t in normalized_tasks:
-            enriched = t.copy()
+            if not (is_pending_status or is_unassigned):
+                continue
+            # Check it's not actually 'in_progress' or 'completed'
+            if status in ['in_progress', 'completed', 'ended']:
+                continue
+            
+            # 3. Normalize to prevent UI crashes
+            normalized = normalized_rows.normalize([row], normalize_task_row, "task", sheet_name)
+            if not normalized:
+                continue
+            if limit and len(result) == limit:
+                set_next_cursor(response, last_key)
+                break
+            
+            # Enrich with names
+            enriched = normalized[0].copy()
             
             # Add machine name
-            machine_id = t.get('machine_id', '')
+            machine_id = enriched.get('machine_id', '')
             if machine_id and machine_id in machine_map:
                 enriched['machine_name'] = getattr(machine_map[machine_id], 'machine_name', '')
             
             # Add assigned_by name
-            assigned_by = t.get('assigned_by', '')
+            assigned_by = enriched.get('assigned_by', '')
             if assigned_by and assigned_by in user_map:
                 enriched['assigned_by_name'] = getattr(user_map[assigned_by], 'username', '')
             
-            result.append(enriched)
+            result.append(project_row(enriched, wanted) if wanted else enriched)
+            last_key = key
         
+        logger.info(f"📋 Pending Tasks: Returning {len(result)} tasks needing assignment")
+        if wanted:
+            return fields_response(result, response)
         return result
         
     except Exception as e:
@@ -130,18 +141,11 @@ async def get_running_tasks(
         all_tasks.extend(db.query(FilingTask).all())
         all_tasks.extend(db.query(FabricationTask).all())
 
-        # Convert to dicts
-        task_dicts = [t.dict() if hasattr(t, 'dict') else t.__dict__.copy() for t in all_tasks]
-
-        # 2. Base filter: valid and in_progress
-        running_dicts = [
-            t for t in task_dicts
-            if is_valid_row(t, "task")
-            and str(t.get('status', '')).lower() == 'in_progress'
-        ]
+        # 2. Base filter: in_progress (invalid rows are dropped while normalizing)
+        running = [t for t in all_tasks if str(getattr(t, 'status', '')).lower() == 'in_progress']
 
         # 3. Normalize to ensure field consistency
-        normalized = safe_normalize_list(running_dicts, normalize_task_row, "task")
+        normalized = normalized_rows.normalize(running, normalize_task_row, "task")
 
         # 4. Apply Project and Operator Filters
         if project_id and project_id != "all":
@@ -343,12 +347,7 @@ async def get_projects_summary(db: any = Depends(get_db)):
     try:
         tasks_with_projects = [t for t in db.query(Task).all() if not getattr(t, 'is_deleted', False) and getattr(t, 'project', None)]
         
-        project_map = {}
-        for task in tasks_with_projects:
-            p_name = getattr(task, 'project', 'Unknown')
-            if p_name not in project_map:
-                project_map[p_name] = []
-            project_map[p_name].append(getattr(task, 'status', ''))
+        project_map = group_by(tasks_with_projects, key=lambda t: getattr(t, 'project', 'Unknown'), value=lambda t: getattr(t, 'status', ''))
         
         yet_to_start = 0
         in_progress = 0
@@ -384,40 +383,28 @@ async def get_task_stats(
     db: any = Depends(get_db)
 ):
     """Get task statistics across all types (General, Filing, Fab), optionally filtered"""
-    from app.models.models_db import Task, FilingTask, FabricationTask, Project
+    from app.models.models_db import Project
+    from app.repositories.task_aggregates import task_aggregates
     try:
-        # 1. Fetch ALL task types
-        all_tasks = db.query(Task).all()
-        all_tasks.extend(db.query(FilingTask).all())
-        all_tasks.extend(db.query(FabricationTask).all())
-        
-        # 2. Base filter: not deleted
-        tasks_filtered = [t for t in all_tasks if not getattr(t, 'is_deleted', False)]
-        
-        # 3. Apply Filters
-        if project and project != "all":
-            tasks_filtered = [t for t in tasks_filtered if str(getattr(t, 'project_id', '')) == str(project) or str(getattr(t, 'project', '')) == str(project)]
-        
-        if operator_id and operator_id != "all":
-             tasks_filtered = [t for t in tasks_filtered if str(getattr(t, 'assigned_to', '')) == str(operator_id)]
+        # 1-3. Non-deleted counts across ALL task types, filtered by project (id or name) and operator
+        status_counts = task_aggregates.status_counts(project=project, operator_id=operator_id, match_project_name=True)
 
         # 4. Aggregate Statuses
-        total = len(tasks_filtered)
+        total = sum(status_counts.values())
         pending = 0
         in_progress = 0
         completed = 0
         on_hold = 0
         
-        for t in tasks_filtered:
-            status = str(getattr(t, 'status', 'pending')).lower().strip()
+        for status, count in status_counts.items():
             if status in ['pending', 'todo', 'active', 'yet to start']:
-                pending += 1
+                pending += count
             elif status in ['in_progress', 'running', 'started']:
-                in_progress += 1
+                in_progress += count
             elif status in ['completed', 'finished', 'done', 'ended']: # Treat 'ended' as completed for high-level stats or handle separately
-                completed += 1
+                completed += count
             elif status in ['on_hold', 'onhold', 'paused']:
-                on_hold += 1
+                on_hold += count
         
         # 5. Projects list for dropdown
         all_projects_db = db.query(Project).all()
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends
+from typing import Optional, Dict, Any, List
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.sheets_db import SheetRow
+from app.models.models_db import User, Machine
+from app.repositories.change_log import change_log, SYNC_SHEETS, TASK_SHEETS, owner_ref, row_key
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+TASK_TYPES = {"tasks": "general", "filingtasks": "filing", "fabricationtasks": "fabrication"}
+
+def _is_deleted(row: Dict[str, Any], sheet_name: str) -> bool:
+    return bool(getattr(SheetRow(row, sheet_name), 'is_deleted', False))
+
+@router.get("")
+async def sync_changes(
+    since: int = 0,
+    user_id: Optional[str] = None,
+    db: any = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Rows of the task sheets and task / work logs changed after the `since` cursor,
+    limited to the caller's scope (operators: their own tasks and logs; other
+    roles: `user_id`, or everything). Returns the next cursor; with `reset` set
+    the client must replace its local copy (first sync, or cursor too old).
+    """
+    from app.core.normalizer import normalize_task_row
+    from app.repositories.normalized_rows import normalized_rows
+    from app.repositories.task_directory import task_directory
+
+    if str(getattr(current_user, 'role', '')).lower() == "operator":
+        user_id = str(getattr(current_user, 'id', ''))
+    scope = str(user_id) if user_id and user_id != "all" else None
+
+    cursor = change_log.current_seq()
+    changed = change_log.changes_since(since) if since else None
+    reset = changed is None
+    if reset:
+        changed = {}
+        for sheet_name in SYNC_SHEETS:
+            changed[sheet_name] = {
+                row_key(sheet_name, row): (frozenset([owner_ref(sheet_name, row)]), row)
+                for row in change_log.current_rows(sheet_name)
+            }
+
+    task_owners = {}
+    def owned(refs) -> bool:
+        if scope is None:
+            return True
+        for ref in refs:
+            if ref.startswith("task:"):
+                task_id = ref[5:]
+                if task_id not in task_owners:
+                    _, _, task = task_directory.lookup(task_id)
+                    task_owners[task_id] = str(task.get("assigned_to", "")).strip() if task else ""
+                ref = task_owners[task_id]
+            if ref == scope:
+                return True
+        return False
+
+    machine_map = None
+    changes = {}
+    for sheet_name in SYNC_SHEETS:
+        upserts: List[Dict[str, Any]] = []
+        deletes: List[str] = []
+        for key, (refs, row) in changed.get(sheet_name, {}).items():
+            if not owned(refs):
+                continue
+            # Deleted, soft-deleted, or reassigned away from the caller
+            if row is None or _is_deleted(row, sheet_name) or (scope is not None and not owned([owner_ref(sheet_name, row)])):
+                if not reset:
+                    deletes.append(key)
+                continue
+            upserts.append(row)
+
+        if sheet_name in TASK_SHEETS and upserts:
+            # Same shape as /operator/tasks
+            if machine_map is None:
+                machine_map = {str(getattr(m, 'machine_id', getattr(m, 'id', ''))): getattr(m, 'machine_name', '') for m in db.query(Machine).all()}
+            upserts = normalized_rows.normalize(upserts, normalize_task_row, "task", sheet_name)
+            for t in upserts:
+                t['task_type'] = TASK_TYPES[sheet_name]
+                m_id = t.get('machine_id')
+                if m_id and m_id in machine_map:
+                    t['machine_name'] = machine_map[m_id]
+        else:
+            upserts = [SheetRow(row, sheet_name).dict() for row in upserts]
+
+        if upserts or deletes:
+            changes[sheet_name] = {"upserts": upserts, "deletes": deletes}
+
+    return {"cursor": cursor, "reset": reset, "changes": changes}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Optional, Any
 from pydantic import BaseModel
 from app.schemas.task_schema import TaskCreate, TaskUpdate, TaskOut, TaskActionRequest, RescheduleRequestModel
@@ -8,6 +8,9 @@ from app.core.sheets_db import SHEETS_SCHEMA
 from app.core.dependencies import get_current_user
 from app.core.time_utils import get_current_time_ist, get_today_date_ist
 from app.utils.datetime_utils import safe_datetime_diff
+from app.utils.pagination import PAGE_LIMIT_MAX, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, set_next_cursor
+from app.utils.field_projection import parse_fields, project_row, model_defaults, fields_response
+from app.utils.fast_json import cached_json_response
 import uuid
 from datetime import datetime
 
@@ -24,173 +27,104 @@ class RescheduleRequestModel(BaseModel):
     requested_date: datetime
     reason: str
 
+TASK_OUT_DEFAULTS = model_defaults(TaskOut)
+
 @router.get("", response_model=List[TaskOut])
 async def read_tasks(
+    response: Response,
     month: Optional[int] = None,
     year: Optional[int] = None,
     assigned_to: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_LIMIT_MAX),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     db: any = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Tasks of ALL types sorted by (due date, created_at, id).
+    With `limit`, returns one page; the next page's cursor is sent in X-Next-Cursor.
+    With `fields=a,b,...`, only those TaskOut columns are returned.
+    """
     # Role-based restriction: Operators only see their own tasks
     if current_user.role == "operator":
         assigned_to = str(getattr(current_user, 'id', ''))
 
-    # 1. Fetch ALL task types for a complete management view
-    from app.models.models_db import Task, FilingTask, FabricationTask
-    all_tasks = db.query(Task).all()
-    try:
-        all_tasks.extend(db.query(FilingTask).all())
-        all_tasks.extend(db.query(FabricationTask).all())
-    except Exception as e:
-        print(f"⚠️ Warning: Could not fetch specialized tasks: {e}")
-
-    # Preliminary filter for active tasks
-    tasks = [t for t in all_tasks if not getattr(t, 'is_deleted', False)]
-    
-    # Filter by month and year
-    if year or month:
-        from datetime import datetime
-        filtered_tasks = []
-        for t in tasks:
-            # Use 'created_at' for filtering
-            created = getattr(t, 'created_at', None)
-            if not created: 
-                filtered_tasks.append(t)
+    # 1. Normalized, name-enriched tasks, walked in pre-sorted order
+    from app.services.task_projection_service import task_projection, NAME_SHEETS
+    from app.repositories.task_order import TASK_KEY_SHAPE, TASK_SHEETS
+    after = decode_cursor(cursor, TASK_KEY_SHAPE)
+    wanted = parse_fields(fields, TaskOut.model_fields)
+
+    def collect(serialized: bool):
+        """One page of task dicts plus the key to resume after (None on the last page)."""
+        results, last_key = [], None
+        for key, base, task_data in task_projection.iter_tasks(after, serialized=serialized):
+            # Filter by month and year (on 'created_at'; undated tasks always match)
+            if (year or month) and base["created_month"] is not None:
+                c_year, c_month = base["created_month"]
+                if year and c_year != year: continue
+                if month and c_month != month: continue
+
+            if assigned_to and base["assigned_to"] != str(assigned_to):
                 continue
-            try:
-                if isinstance(created, str):
-                    # Handle robust ISO parsing
-                    dt = datetime.fromisoformat(created.replace('Z', '+00:00'))
-                else:
-                    dt = created
-                    
-                if year and dt.year != year: continue
-                if month and dt.month != month: continue
-                filtered_tasks.append(t)
-            except:
-                filtered_tasks.append(t)
-        tasks = filtered_tasks
-    
-    if assigned_to:
-        tasks = [t for t in tasks if str(getattr(t, 'assigned_to', '')) == str(assigned_to)]
-    
-    # Sort
-    def sort_key(t):
-        due = str(getattr(t, 'due_date', '') or "9999-12-31")
-        created = str(getattr(t, 'created_at', '') or "1970-01-01")
-        return (due, created)
-        
-    tasks.sort(key=sort_key)
-    
-    # Load projects once (cached)
-    all_projects = db.query("Project").all()
-    project_map = {str(getattr(p, 'id', '')): getattr(p, 'project_name', '') for p in all_projects if not getattr(p, 'is_deleted', False)}
-    
-    # Load Users Map (Cached)
-    from app.models.models_db import User, Machine
-    all_users = db.query(User).all()
-    user_map = {str(getattr(u, 'user_id', getattr(u, 'id', ''))): u.dict() if hasattr(u, 'dict') else u.__dict__ for u in all_users}
-    
-    # Load Machines Map (Cached)
-    all_machines = db.query(Machine).all()
-    machine_map = {str(getattr(m, 'machine_id', getattr(m, 'id', ''))): m.dict() if hasattr(m, 'dict') else m.__dict__ for m in all_machines}
 
-    # Helper imports
-    from app.core.normalizer import safe_normalize_list, normalize_task_row, safe_str, safe_int
-
-    # Convert tasks to dicts for normalizer
-    task_dicts = [t.dict() if hasattr(t, 'dict') else t.__dict__ for t in tasks]
-
-    # Normalize ALL tasks
-    normalized_tasks = safe_normalize_list(
-        task_dicts,
-        normalize_task_row,
-        "task"
+            if limit and len(results) == limit:
+                return results, last_key
+            results.append(task_data)
+            last_key = key
+        return results, None
+
+    # 2. Fast path: rows are TaskOut-validated once per version and the encoded
+    # page (or its projection onto `fields`) is reused until one of the sheets
+    # behind it changes
+    def build(headers):
+        results, next_key = collect(serialized=True)
+        if next_key is not None:
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(next_key)
+        if wanted:
+            return [project_row(t, wanted, TASK_OUT_DEFAULTS) for t in results]
+        return results
+
+    return cached_json_response(
+        "tasks", (month, year, assigned_to, limit, cursor, tuple(wanted or ())), TASK_SHEETS + tuple(NAME_SHEETS), build
     )
 
-    results = []
-    for t in normalized_tasks:
-        try:
-            # Enrich with Names
-            
-            # Resolve Project Name
-            project_name = t.get('project', '')
-            project_id = t.get('project_id', '')
-            
-            if (not project_name or project_name == '-') and project_id:
-                project_name = project_map.get(project_id, "-")
-            elif project_name == '-' and project_id in project_map:
-                project_name = project_map[project_id]
-                
-            if project_id and project_id not in project_map:
-                # Try to find project by name mismatch? No, just keep what we have
-                pass
-                
-            # Resolve Assigned To
-            assignee_id = str(t.get('assigned_to', '')).strip()
-            assignee_name = user_map.get(assignee_id, {}).get("username", assignee_id)
-            
-            # Resolve Assigned By
-            assigner_id = str(t.get('assigned_by', '')).strip()
-            assigner_name = user_map.get(assigner_id, {}).get("username", assigner_id)
-            
-            # Resolve Machine
-            m_id = str(t.get('machine_id', '')).strip()
-            machine_name = machine_map.get(m_id, {}).get("machine_name", m_id) if m_id else None
-
-            # Resolve Due Date (Fallback to due_datetime)
-            due = t.get('due_date') or t.get('due_datetime') or ""
-
-            # CRITICAL: Sanitize IDs
-            # Check all possible ID fields from different task models
-            t_id = (
-                str(t.get('task_id', '')).strip() or 
-                str(t.get('fabrication_task_id', '')).strip() or 
-                str(t.get('filing_task_id', '')).strip() or
-                str(t.get('id', '')).strip()
-            )
-
-            if not t_id or t_id.lower() == "undefined":
-                # Create a traceable temporary ID if missing in DB
-                row_idx = t.get('_row_idx', idx + 1)
-                t_id = f"T-REFIX-{row_idx}-{uuid.uuid4().hex[:4]}"
-
-            # Build final dict matching TaskOut schema
-            task_data = {
-                "id": t_id,
-                "task_id": t_id,
-                "title": t.get('title', 'Unknown Task'),
-                "description": t.get('description', ''),
-                "project": project_name,
-                "project_id": t.get('project_id', ''),
-                "part_item": t.get('part_item', '-'),
-                "nos_unit": t.get('nos_unit', ''),
-                "status": t.get('status', 'pending'),
-                "priority": t.get('priority', 'MEDIUM'),
-                "assigned_by": assigner_name,
-                "assigned_to": assignee_name,
-                "machine_id": machine_name,
-                "due_date": due,
-                "created_at": t.get('created_at'),
-                "started_at": t.get('started_at'),
-                "completed_at": t.get('completed_at'),
-                "total_duration_seconds": t.get('total_duration_seconds', 0),
-                "hold_reason": t.get('hold_reason', ""),
-                "denial_reason": t.get('denial_reason', ""),
-                "actual_start_time": t.get('actual_start_time'),
-                "actual_end_time": t.get('actual_end_time'),
-                "total_held_seconds": t.get('total_held_seconds', 0),
-                "work_order_number": t.get('work_order_number', "N/A"),
-                "ended_by": t.get('ended_by', ""),
-                "end_reason": t.get('end_reason', ""),
-                "expected_completion_time": t.get('expected_completion_time', 0)
-            }
-            results.append(task_data)
-        except Exception as e:
-            print(f"Error processing task {t.get('task_id')}: {e}")
+@router.get("/search", response_model=List[TaskOut])
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=PAGE_LIMIT_MAX),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: any = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Full-text search over title, description, part_item and work_order_number
+    of ALL task types. Every word of `q` must match a word (or word prefix);
+    best matches first. Paged like GET /tasks (`limit`, `cursor`, X-Next-Cursor).
+    """
+    from app.repositories.task_search import task_search, SEARCH_KEY_SHAPE
+    from app.services.task_projection_service import task_projection
+    after = decode_cursor(cursor, SEARCH_KEY_SHAPE)
+    wanted = parse_fields(fields, TaskOut.model_fields)
+
+    # Operators only find their own tasks
+    assigned_to = str(getattr(current_user, 'id', '')) if current_user.role == "operator" else None
+
+    results, last_key = [], None
+    for key, base, task_data in task_projection.iter_rows(task_search.search(q, after)):
+        if assigned_to and base["assigned_to"] != assigned_to:
             continue
-            
+        if len(results) == limit:
+            set_next_cursor(response, last_key)
+            break
+        results.append(project_row(task_data, wanted, TASK_OUT_DEFAULTS) if wanted else task_data)
+        last_key = key
+
+    if wanted:
+        return fields_response(results, response)
     return results
 
 @router.post("", response_model=TaskOut, status_code=201)
@@ -1,7 +1,11 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from app.core.database import get_db
+from app.core.sheets_db import get_sheets_db
+from app.core.dependencies import get_current_user
+from app.utils.fast_json import FastJSONResponse
 from app.models.models_db import Task, User, Machine, Project, FilingTask, FabricationTask
 from types import SimpleNamespace
 from app.services.dashboard_analytics_service import get_operations_overview
@@ -166,6 +170,27 @@ async def get_admin_dashboard(
         print(f"❌ Error in unified dashboard: {e}")
         return {"projects": [], "tasks": [], "machines": [], "users": [], "operators": [], "overview": {"tasks": {"total": 0, "pending": 0, "in_progress": 0, "completed": 0, "ended": 0, "on_hold": 0}, "machines": {"active": 0, "total": 0}, "projects": {"total": 0}}}
 
+@router.get("/admin/bootstrap")
+async def get_admin_bootstrap(
+    project_id: Optional[str] = None,
+    operator_id: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: any = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Every admin dashboard panel in one request, computed from one snapshot.
+    `format=ndjson` streams one {"panel", "data"} line per panel as it is ready.
+    """
+    from app.services.dashboard_bootstrap_service import admin_bootstrap_json, admin_bootstrap_ndjson
+    if format == "ndjson":
+        # The stream outlives the request-scoped session, so it reads through its own
+        return StreamingResponse(
+            admin_bootstrap_ndjson(get_sheets_db(), project_id, operator_id, current_user),
+            media_type="application/x-ndjson"
+        )
+    return FastJSONResponse(content=await admin_bootstrap_json(db, project_id, operator_id, current_user))
+
 @router.get("/supervisor", response_model=SupervisorDashboardOut)
 async def get_supervisor_dashboard(project_id: Optional[str] = None, operator_id: Optional[str] = None, db: any = Depends(get_db)):
     return await get_admin_dashboard(project_id, operator_id, db)
@@ -52,17 +52,11 @@ async def list_users(exclude_id: Optional[str] = None, db: any = Depends(get_db)
     all_u = db.query(User).all()
     
     # helper imports 
-    from app.core.normalizer import safe_normalize_list, normalize_user_row, safe_bool, safe_str
+    from app.core.normalizer import normalize_user_row, safe_bool, safe_str
+    from app.repositories.normalized_rows import normalized_rows
 
-    # 1. Convert to dicts
-    u_dicts = [u.dict() if hasattr(u, 'dict') else u.__dict__ for u in all_u]
-
-    # 2. Normalize
-    normalized_users = safe_normalize_list(
-        u_dicts,
-        normalize_user_row,
-        "user"
-    )
+    # 1. Normalize (cached per row version)
+    normalized_users = normalized_rows.normalize(all_u, normalize_user_row, "user")
 
     results = []
     for u in normalized_users:
@@ -90,23 +84,26 @@ async def list_users(exclude_id: Optional[str] = None, db: any = Depends(get_db)
     return results
 
 @router.get("/search", response_model=List[UserOut])
-async def search_users(q: str, db: any = Depends(get_db)):
-    """Search users with safety guard."""
-    all_u = db.query(User).all()
-    q = q.lower().strip()
+async def search_users(q: str, fuzzy: bool = False, db: any = Depends(get_db)):
+    """
+    Search users by username / email substring (trigram index).
+    With `fuzzy`, near matches (e.g. typos) are returned instead, most similar first.
+    """
+    from app.core.sheets_db import SheetRow
+    from app.repositories.user_directory import user_directory
+    if fuzzy:
+        rows = [row for _, row in user_directory.similar(q)]
+    else:
+        rows = user_directory.search(q)
     
     results = []
-    for u in all_u:
+    for u in (SheetRow(row, "users") for row in rows):
         try:
-            u_name = str(getattr(u, 'username', '')).lower()
-            u_email = str(getattr(u, 'email', '') or "").lower()
-            
             # Filter unapproved
             if str(getattr(u, 'approval_status', 'approved')).lower().strip() != 'approved':
                 continue
             
-            if q in u_name or q in u_email:
-                results.append(UserOut(**u.dict()))
+            results.append(UserOut(**u.dict()))
         except Exception as e:
             msg = getattr(u, 'username', 'Unknown')
             print(f"❌ [Users Search] Invalid row '{msg}' skipped: {e}")
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Any
+from app.models.models_db import User
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.sheets_db import SheetRow
+from app.core.normalizer import safe_normalize_list, normalize_project_row, safe_int
+from app.schemas.work_order_schema import WorkOrderOut
+from app.repositories.work_orders import work_orders, PROJECT_SHEET
+from app.repositories.task_order import task_sort_key
+from app.repositories.daily_rollups import daily_rollups
+from app.services.task_projection_service import task_projection
+from app.utils.sheet_rows import is_deleted
+
+router = APIRouter(
+    prefix="/work-orders",
+    tags=["work-orders"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/{wo}", response_model=WorkOrderOut)
+async def get_work_order(
+    wo: str,
+    db: Any = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Everything cut for a work order (or a project code): the project, its
+    general / filing / fabrication tasks in display order, progress, and the
+    machine runtime logged against those tasks. Resolved from the work-order
+    directory and the runtime rollups, without scanning the sheets.
+    """
+    rows = [(sheet_name, row) for sheet_name, row in work_orders.lookup(wo) if not is_deleted(row)]
+    if not rows:
+        raise HTTPException(status_code=404, detail="Work order not found")
+
+    project_rows = [row for sheet_name, row in rows if sheet_name == PROJECT_SHEET]
+    task_rows = sorted(
+        ((sheet_name, row) for sheet_name, row in rows if sheet_name != PROJECT_SHEET),
+        key=lambda pair: task_sort_key(*pair)
+    )
+
+    project = None
+    if project_rows:
+        normalized = safe_normalize_list([SheetRow(project_rows[0], PROJECT_SHEET).dict()], normalize_project_row, "project")
+        project = normalized[0] if normalized else None
+
+    # Operators only see their own tasks
+    assigned_to = str(getattr(current_user, 'id', '')) if current_user.role == "operator" else None
+
+    tasks, by_status, quantity, completed_quantity = [], {}, 0, 0
+    for row, base, task_data in task_projection.iter_rows((r, s, r) for s, r in task_rows):
+        if assigned_to and base["assigned_to"] != assigned_to:
+            continue
+        tasks.append(task_data)
+        status = task_data.get("status") or "pending"
+        by_status[status] = by_status.get(status, 0) + 1
+        quantity += safe_int(row.get("quantity"))
+        completed_quantity += safe_int(row.get("completed_quantity"))
+
+    completed = by_status.get("completed", 0)
+    runtime = daily_rollups.task_runtime([t["task_id"] for t in tasks])
+
+    work_order_number = next(
+        (str(row.get("work_order_number")).strip() for _, row in rows if str(row.get("work_order_number") or "").strip()),
+        wo.strip()
+    )
+
+    return {
+        "work_order_number": work_order_number,
+        "project": project,
+        "tasks": tasks,
+        "progress": {
+            "total_tasks": len(tasks),
+            "completed_tasks": completed,
+            "percent_complete": round(completed * 100.0 / len(tasks), 1) if tasks else 0.0,
+            "by_status": by_status,
+            "quantity": quantity,
+            "completed_quantity": completed_quantity,
+        },
+        "runtime": {
+            "runtime_seconds": sum(r["runtime_seconds"] for r in runtime.values()),
+            "sessions": sum(r["sessions"] for r in runtime.values()),
+            "running_now": any(r["running_now"] for r in runtime.values()),
+            "by_task": {task_id: r["runtime_seconds"] for task_id, r in runtime.items()},
+        },
+    }
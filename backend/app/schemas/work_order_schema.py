@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from app.schemas.project_schema import ProjectOut
+from app.schemas.task_schema import TaskOut
+
+class WorkOrderProgress(BaseModel):
+    total_tasks: int = 0
+    completed_tasks: int = 0
+    percent_complete: float = 0.0
+    by_status: Dict[str, int] = {}
+    quantity: int = 0 # Filing / fabrication pieces ordered
+    completed_quantity: int = 0
+
+class WorkOrderRuntime(BaseModel):
+    runtime_seconds: int = 0
+    sessions: int = 0
+    running_now: bool = False
+    by_task: Dict[str, int] = {} # task_id -> runtime seconds
+
+class WorkOrderOut(BaseModel):
+    work_order_number: str
+    project: Optional[ProjectOut] = None
+    tasks: List[TaskOut] = []
+    progress: WorkOrderProgress
+    runtime: WorkOrderRuntime
@@ -0,0 +1,114 @@
+
+"""
+Hot/cold archival for the task sheets.
+Completed tasks older than ARCHIVE_AFTER_DAYS and soft-deleted tasks are moved
+from tasks / filingtasks / fabricationtasks into their *_archive worksheets so the
+working set every dashboard reloads stays small. Reports that explicitly cover an
+older period opt into reading the archive via `SheetsDB.query(..., include_archive=True)`.
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
+from app.core.config import ARCHIVE_AFTER_DAYS, ARCHIVE_INTERVAL_HOURS
+from app.core.sheets_config import ARCHIVED_SHEETS, archive_sheet_name
+from app.core.time_utils import get_current_time_ist, get_today_date_ist
+from app.repositories.sheets_repository import sheets_repo
+from app.utils.sheet_rows import is_deleted
+
+TERMINAL_STATUSES = ["completed", "ended"]
+
+_ARCHIVE_LOCK = threading.Lock()
+
+def archive_cutoff(days: Optional[int] = None) -> date:
+    """Rows completed before this date live in the archive sheets."""
+    return get_today_date_ist() - timedelta(days=ARCHIVE_AFTER_DAYS if days is None else days)
+
+def needs_archive(start: Optional[date]) -> bool:
+    """True when a report period starting at `start` may contain archived rows."""
+    if start is None:
+        return True
+    if isinstance(start, datetime):
+        start = start.date()
+    return start < archive_cutoff()
+
+def is_archivable(row: Dict[str, Any], cutoff: date) -> bool:
+    if is_deleted(row):
+        return True
+    if str(row.get("status", "")).lower().strip() not in TERMINAL_STATUSES:
+        return False
+    completed = str(row.get("completed_at") or row.get("actual_end_time") or "").strip()[:10]
+    if len(completed) < 10:
+        return False
+    return completed < cutoff.isoformat()
+
+def archive_sheet(sheet_name: str, cutoff: date, dry_run: bool = False) -> int:
+    """
+    Moves archivable rows of one task sheet to its archive sheet. Returns the row count.
+    Rows are picked from a fresh read, not the process cache: other workers and
+    manual edits shift row positions, and the hot rows are deleted by position.
+    """
+    rows = sheets_repo.refresh(sheet_name)
+    headers = sheets_repo.get_headers(sheet_name)
+    id_col = "id"
+    if "id" not in headers:
+        for h in headers:
+            if h.endswith("_id"):
+                id_col = h
+                break
+
+    rows = [dict(r) for r in rows if is_archivable(r, cutoff)]
+    if not rows or dry_run:
+        return len(rows)
+
+    archive_name = archive_sheet_name(sheet_name)
+    archived_at = get_current_time_ist().isoformat()
+    # A run that failed between the append and the delete left its rows in both
+    # sheets; those are only removed from the hot sheet, not appended again
+    already_archived = {str(v).strip() for v in sheets_repo.read_column(archive_name, id_col)}
+    payload = [
+        {**{k: v for k, v in r.items() if not k.startswith("_")}, "archived_at": archived_at}
+        for r in rows if str(r.get(id_col, "")).strip() not in already_archived
+    ]
+
+    # 1. Append to cold storage first: a failure here leaves the hot sheet untouched
+    if payload and not sheets_repo.batch_append(archive_name, payload):
+        raise RuntimeError(f"Failed to append {len(payload)} rows to {archive_name}")
+
+    # 2. Remove from the hot sheet in one batch request
+    removed = sheets_repo.delete_rows(sheet_name, [r.get(id_col) for r in rows])
+
+    # The archive is only read on demand; don't keep it resident after a run
+    sheets_repo.clear_cache(archive_name)
+    return removed
+
+def run_archival(days: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Archives every task sheet. Safe to call concurrently (runs are serialized)."""
+    cutoff = archive_cutoff(days)
+    result = {"cutoff": cutoff.isoformat(), "dry_run": dry_run, "sheets": {}}
+    with _ARCHIVE_LOCK:
+        for sheet_name in ARCHIVED_SHEETS:
+            try:
+                result["sheets"][sheet_name] = archive_sheet(sheet_name, cutoff, dry_run)
+            except Exception as e:
+                print(f"❌ [Archive] Failed to archive {sheet_name}: {e}")
+                result["sheets"][sheet_name] = {"error": str(e)}
+    print(f"📦 [Archive] Run complete: {result}")
+    return result
+
+def start_archival_scheduler():
+    """Starts the periodic archival job when ARCHIVE_INTERVAL_HOURS is set."""
+    if ARCHIVE_INTERVAL_HOURS <= 0:
+        return
+
+    def loop():
+        while True:
+            time.sleep(ARCHIVE_INTERVAL_HOURS * 3600)
+            try:
+                run_archival()
+            except Exception as e:
+                print(f"❌ [Archive] Scheduled run failed: {e}")
+
+    threading.Thread(target=loop, daemon=True, name="task-archival").start()
+    print(f"📦 [Archive] Scheduled every {ARCHIVE_INTERVAL_HOURS}h (cutoff {ARCHIVE_AFTER_DAYS} days)")
@@ -2,12 +2,12 @@
 """
 PRODUCTION STABILIZATION: Unified Dashboard Analytics Service (Google Sheets Edition)
 Purpose: Provide accurate, consistent dashboard metrics across all roles using Google Sheets.
-Strategy: Load relevant sheets and perform in-memory aggregation.
+Strategy: Answer from the materialized aggregates kept by the repository (task_aggregates).
 """
 
 from typing import Dict, Any, List, Optional
-from app.models.models_db import User, Machine, Project, Task, FilingTask, FabricationTask
 from app.core.sheets_db import SheetsDB
+from app.repositories.task_aggregates import task_aggregates
 
 def get_operations_overview(
     db: SheetsDB, 
@@ -27,71 +27,39 @@ def get_operations_overview(
     
     try:
         # 1. Projects
-        all_projects = [p for p in db.query(Project).all() if not getattr(p, 'is_deleted', False)]
-        if project_id and project_id != "all":
-            all_projects = [p for p in all_projects if str(getattr(p, 'project_id', getattr(p, 'id', ''))) == str(project_id)]
-        stats["projects"]["total"] = len(all_projects)
+        stats["projects"]["total"] = task_aggregates.project_total(project_id)
         
-        # 2. Tasks Aggregation (Main Tasks Sheet)
-        all_tasks = [t for t in db.query(Task).all() if not getattr(t, 'is_deleted', False)]
-        
-        # Include Filing and Fabrication
-        try:
-            filing_tasks = [t for t in db.query(FilingTask).all() if not getattr(t, 'is_deleted', False)]
-            all_tasks.extend(filing_tasks)
-        except Exception as e:
-            print(f"⚠️ Filing tasks fetch failed for analytics: {e}")
-        
-        try:
-            fab_tasks = [t for t in db.query(FabricationTask).all() if not getattr(t, 'is_deleted', False)]
-            all_tasks.extend(fab_tasks)
-        except Exception as e:
-            print(f"⚠️ Fabrication tasks fetch failed for analytics: {e}")
-
-        # Applying Filters
-        if project_id and project_id != "all":
-            all_tasks = [t for t in all_tasks if str(getattr(t, 'project_id', '')) == str(project_id)]
-        if operator_id and operator_id != "all":
-            all_tasks = [t for t in all_tasks if str(getattr(t, 'assigned_to', '')) == str(operator_id)]
-
-        for t in all_tasks:
-            stats["tasks"]["total"] += 1
-            status = str(getattr(t, 'status', 'pending')).lower().strip()
+        # 2. Tasks Aggregation (General + Filing + Fabrication, counted per distinct status)
+        for status, count in task_aggregates.status_counts(project=project_id, operator_id=operator_id).items():
+            stats["tasks"]["total"] += count
             
             # Robust status mapping to prevent empty charts
             if status in ['pending', 'active', 'todo']:
-                stats["tasks"]["pending"] += 1
+                stats["tasks"]["pending"] += count
             elif status in ['in_progress', 'in progress', 'running', 'started']:
-                stats["tasks"]["in_progress"] += 1
+                stats["tasks"]["in_progress"] += count
             elif status in ['completed', 'finished', 'done']:
-                stats["tasks"]["completed"] += 1
+                stats["tasks"]["completed"] += count
             elif status in ['on_hold', 'onhold', 'on hold', 'paused']:
-                stats["tasks"]["on_hold"] += 1
+                stats["tasks"]["on_hold"] += count
             elif status in ['ended', 'inactive', 'cancelled']:
-                stats["tasks"]["ended"] += 1
+                stats["tasks"]["ended"] += count
             else:
                 # Fallback: Count unmapped but non-deleted tasks as pending
-                stats["tasks"]["pending"] += 1
+                stats["tasks"]["pending"] += count
 
     except Exception as e:
         print(f"❌ Error aggregating dashboard tasks: {e}")
 
     # 3. Machines
     try:
-        all_machines = [m for m in db.query(Machine).all() if not getattr(m, 'is_deleted', False)]
-        stats["machines"]["total"] = len(all_machines)
-        # Check both 'status' field and in-memory busy status from tasks if needed
-        stats["machines"]["active"] = len([m for m in all_machines if str(getattr(m, 'status', '')).lower() in ('active', 'running')])
+        stats["machines"] = task_aggregates.machine_totals()
     except Exception as e:
         print(f"❌ Error aggregating dashboard machines: {e}")
 
     # 4. Operators
     try:
-        # Only count approved operators
-        all_operators = [u for u in db.query(User).all() 
-                        if not getattr(u, 'is_deleted', False) 
-                        and str(getattr(u, 'role', '')).lower() == 'operator']
-        stats["operators"]["total"] = len(all_operators)
+        stats["operators"]["total"] = task_aggregates.user_totals()["operators"]
     except Exception as e:
         print(f"❌ Error aggregating dashboard operators: {e}")
 
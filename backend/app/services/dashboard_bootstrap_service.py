@@ -0,0 +1,122 @@
+
+"""
+Composite bootstrap for the admin dashboard.
+Instead of one request per panel (unified dashboard, overall stats, project
+analytics, attendance, task stats, analytics, dropdowns), every panel comes
+back in one request. Panels are per-panel cached, not one snapshot: each
+panel's encoded JSON is cached per (panel, filters, versions of the sheets it
+reads), with the versions read just before the panel is computed, so a tick
+where only attendance changed recomputes only the panels that depend on
+attendance. A write that lands while the panels are being computed can show
+up in the later panels only; the next poll picks it up everywhere.
+"""
+
+from collections import namedtuple
+from typing import Any, AsyncIterator, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from app.core.time_utils import get_today_date_ist
+from app.utils.fast_json import dumps, encoded_cache, sheet_versions
+
+TASK_SHEETS = ("tasks", "filingtasks", "fabricationtasks")
+
+Panel = namedtuple("Panel", ["name", "sheets", "compute"])
+
+async def _dashboard(db, project_id, operator_id, current_user):
+    from app.routers.unified_dashboard_router import get_admin_dashboard
+    from app.schemas.dashboard_schema import AdminDashboardOut
+    data = await get_admin_dashboard(project_id=project_id, operator_id=operator_id, db=db)
+    return AdminDashboardOut.model_validate(data)
+
+async def _overall_stats(db, project_id, operator_id, current_user):
+    from app.routers.admin_router import get_overall_stats
+    return await get_overall_stats(db=db)
+
+async def _project_analytics(db, project_id, operator_id, current_user):
+    from app.routers.admin_router import get_project_analytics
+    return await get_project_analytics(project=project_id, db=db)
+
+async def _attendance(db, project_id, operator_id, current_user):
+    from app.routers.admin_router import get_admin_attendance_summary
+    return await get_admin_attendance_summary(db=db)
+
+async def _task_stats(db, project_id, operator_id, current_user):
+    from app.routers.supervisor_router import get_task_stats
+    return await get_task_stats(project=project_id, operator_id=operator_id, db=db)
+
+async def _analytics_overview(db, project_id, operator_id, current_user):
+    from app.routers.analytics_router import dashboard_overview
+    return await dashboard_overview(db=db)
+
+async def _task_distribution(db, project_id, operator_id, current_user):
+    from app.routers.analytics_router import get_task_dist
+    return await get_task_dist(db=db)
+
+async def _dropdowns(db, project_id, operator_id, current_user):
+    # Splices the lists /dropdowns/* already cache encoded
+    from app.routers.dropdowns_router import _bundle
+    return _bundle(("projects", "machines", "units", "users"), db)
+
+# In the order the dashboard renders them (NDJSON streams them in this order)
+ADMIN_PANELS = [
+    Panel("dashboard", TASK_SHEETS + ("users", "machines", "projects", "attendance"), _dashboard),
+    Panel("overall_stats", TASK_SHEETS + ("users", "machines", "projects"), _overall_stats),
+    Panel("project_analytics", TASK_SHEETS, _project_analytics),
+    Panel("attendance", ("users", "attendance"), _attendance),
+    Panel("task_stats", TASK_SHEETS + ("users", "projects"), _task_stats),
+    Panel("analytics_overview", TASK_SHEETS + ("users", "machines", "projects"), _analytics_overview),
+    Panel("task_distribution", TASK_SHEETS, _task_distribution),
+    Panel("dropdowns", ("projects", "machines", "units", "users"), _dropdowns),
+]
+
+async def _encoded_panel(panel: Panel, db, project_id, operator_id, current_user) -> bytes:
+    # Versions are read before computing: a write that lands mid-compute only
+    # results in a cache miss on the next request
+    key = (
+        "admin-bootstrap", panel.name, (project_id, operator_id),
+        sheet_versions(*panel.sheets), get_today_date_ist().isoformat(),
+    )
+    hit = encoded_cache.get(key)
+    if hit is not None:
+        return hit[0]
+    data = await panel.compute(db, project_id, operator_id, current_user)
+    # A panel may hand back already-encoded JSON
+    body = data if isinstance(data, bytes) else dumps(jsonable_encoder(data))
+    encoded_cache.put(key, body, {})
+    return body
+
+async def iter_admin_panels(
+    db: Any,
+    project_id: Optional[str] = None,
+    operator_id: Optional[str] = None,
+    current_user: Any = None,
+) -> AsyncIterator[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    Yields (panel name, encoded JSON, error) for every admin panel, in render
+    order. A failing panel yields its error instead of aborting the rest.
+    """
+    project_id = project_id if project_id and project_id != "all" else None
+    operator_id = operator_id if operator_id and operator_id != "all" else None
+    for panel in ADMIN_PANELS:
+        try:
+            yield panel.name, await _encoded_panel(panel, db, project_id, operator_id, current_user), None
+        except Exception as e:
+            print(f"❌ [Bootstrap] Panel '{panel.name}' failed: {e}")
+            yield panel.name, None, str(getattr(e, "detail", e))
+
+async def admin_bootstrap_json(db: Any, project_id: Optional[str], operator_id: Optional[str], current_user: Any) -> bytes:
+    """All panels as one JSON object: {panel: data, ..., "errors": {panel: message}}."""
+    parts, errors = [], {}
+    async for name, body, error in iter_admin_panels(db, project_id, operator_id, current_user):
+        parts.append(dumps(name) + b":" + (body if body is not None else b"null"))
+        if error is not None:
+            errors[name] = error
+    parts.append(b'"errors":' + dumps(errors))
+    return b"{" + b",".join(parts) + b"}"
+
+async def admin_bootstrap_ndjson(db: Any, project_id: Optional[str], operator_id: Optional[str], current_user: Any) -> AsyncIterator[bytes]:
+    """One line per panel: {"panel": name, "data": ...} or {"panel": name, "error": ...}."""
+    async for name, body, error in iter_admin_panels(db, project_id, operator_id, current_user):
+        if body is not None:
+            yield b'{"panel":' + dumps(name) + b',"data":' + body + b"}\n"
+        else:
+            yield dumps({"panel": name, "error": error}) + b"\n"
@@ -201,6 +201,19 @@ class GoogleSheetsService:
             print(f"❌ [GS] Error reading all values from {name}: {e}")
             raise
 
+    def read_column(self, name: str, header: str) -> Dict[int, str]:
+        """Reads one column by (normalized) header as {row index: value}, data rows only."""
+        worksheet = self.get_worksheet(name)
+        try:
+            headers = [self._normalize_header(h) for h in worksheet.row_values(1)]
+            if header not in headers:
+                return {}
+            values = worksheet.col_values(headers.index(header) + 1)
+            return {i + 1: v for i, v in enumerate(values) if i > 0}
+        except Exception as e:
+            print(f"❌ [GS] Error reading column {header} from {name}: {e}")
+            raise
+
     def insert_row(self, name: str, data: Dict[str, Any], raw_headers: Optional[List[str]] = None):
         """Inserts a new row using the ACTUAL worksheet headers for placement."""
         worksheet = self.get_worksheet(name)
@@ -316,5 +329,20 @@ class GoogleSheetsService:
             print(f"❌ Error deleting row {row_idx} from {name}: {e}")
             return False
 
+    def delete_rows_by_idx(self, name: str, row_indices: List[int]):
+        """Physically removes several rows in one batch request (bottom-up so indices stay valid)."""
+        if not row_indices: return True
+        worksheet = self.get_worksheet(name)
+        try:
+            requests = [
+                {"deleteDimension": {"range": {"sheetId": worksheet.id, "dimension": "ROWS", "startIndex": idx - 1, "endIndex": idx}}}
+                for idx in sorted(set(row_indices), reverse=True)
+            ]
+            worksheet.spreadsheet.batch_update({"requests": requests})
+            return True
+        except Exception as e:
+            print(f"❌ Error batch deleting {len(row_indices)} rows from {name}: {e}")
+            return False
+
 # Global instance
 google_sheets = GoogleSheetsService()
@@ -0,0 +1,26 @@
+"""
+Single-pass grouping helpers.
+Endpoints that need "the rows belonging to each X" used to filter the full
+row list once per X, which is quadratic in the sheet sizes. group_by()
+partitions the rows by key in one pass instead; look-ups are then a dict get.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+def group_by(
+    rows: Iterable[Any],
+    key: Callable[[Any], Hashable],
+    value: Optional[Callable[[Any], Any]] = None
+) -> Dict[Hashable, List[Any]]:
+    """
+    {key(row): [row, ...]} in first-seen key order, rows kept in input order.
+    With `value`, the lists hold value(row) instead of the rows themselves.
+    """
+    groups: Dict[Hashable, List[Any]] = {}
+    for row in rows:
+        k = key(row)
+        bucket = groups.get(k)
+        if bucket is None:
+            bucket = groups[k] = []
+        bucket.append(value(row) if value is not None else row)
+    return groups
@@ -1,4 +1,5 @@
 from app.models.models_db import Project, Task
+from app.services.grouping import group_by
 
 def get_project_overview_stats(db: any):
     """
@@ -8,16 +9,21 @@ def get_project_overview_stats(db: any):
     all_tasks = [t for t in db.query(Task).all() if not getattr(t, 'is_deleted', False)]
     
     stats = {"total": len(projects), "completed": 0, "in_progress": 0, "yet_to_start": 0, "held": 0}
+
+    # Task statuses per project, in one pass over the tasks
+    statuses_by_project = group_by(
+        all_tasks,
+        key=lambda t: str(getattr(t, 'project_id', '')),
+        value=lambda t: str(getattr(t, 'status', '')).lower()
+    )
     
     for project in projects:
         pid = str(getattr(project, 'project_id', ''))
-        tasks = [t for t in all_tasks if str(getattr(t, 'project_id', '')) == pid]
+        st = statuses_by_project.get(pid)
         
-        if not tasks:
+        if not st:
             stats["yet_to_start"] += 1
             continue
-            
-        st = [str(getattr(t, 'status', '')).lower() for t in tasks]
         
         if any(s in ["in_progress", "in progress"] for s in st):
             stats["in_progress"] += 1
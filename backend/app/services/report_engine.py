@@ -0,0 +1,163 @@
+
+"""
+Date-range report engine for machine / operator reports.
+A report covers [start, end] and is grouped by any combination of the
+dimensions below. Facts come from the date-partitioned logs (machine runtime,
+operator work) and the completion-date partitions of the task sheets, so a
+week or a month is computed in one pass over the rows in range instead of one
+full recomputation per day.
+
+Each fact is attributed to every dimension it can be resolved for: runtime logs
+take the operator and project from their task, work logs take unit / category
+from their machine (or the operator's unit when no machine is recorded).
+"""
+
+from datetime import date
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from app.models.models_db import Machine, User, Unit, MachineCategory, Project
+from app.repositories.log_partitions import log_partitions
+from app.repositories.task_completions import task_completions, completion_day
+from app.repositories.task_directory import task_directory
+from app.core.sheets_config import SHEETS_SCHEMA, ARCHIVED_SHEETS, archive_sheet_name
+from app.repositories.sheets_repository import sheets_repo
+from app.services.archive_service import needs_archive
+from app.utils.sheet_rows import clean, day_key
+
+DIMENSIONS = ("date", "machine", "operator", "unit", "category", "project")
+
+def parse_group_by(value: Optional[str], default: Sequence[str] = ("machine",)) -> Tuple[str, ...]:
+    """'machine,date' -> ('machine', 'date'). Raises ValueError on unknown dimensions."""
+    if not value:
+        return tuple(default)
+    dims = []
+    for part in value.split(","):
+        dim = part.strip().lower()
+        if not dim:
+            continue
+        if dim not in DIMENSIONS:
+            raise ValueError(f"Unknown group_by dimension '{dim}' (expected one of: {', '.join(DIMENSIONS)})")
+        if dim not in dims:
+            dims.append(dim)
+    return tuple(dims) or tuple(default)
+
+def _new_cell() -> Dict[str, Any]:
+    return {
+        "runtime_seconds": 0, "runtime_sessions": 0, "running_now": False,
+        "work_seconds": 0, "work_sessions": 0, "working_now": False,
+        "completed_tasks": 0, "machine_ids": set(),
+    }
+
+class _Lookups:
+    """Names and task attribution for one report run (reference sheets are read once)."""
+
+    def __init__(self, db: any, start: date):
+        self.machines = {str(getattr(m, 'machine_id', '') or m.id): m for m in db.query(Machine).all()}
+        self.users = {str(u.user_id): u for u in db.query(User).all()}
+        self.units = {str(getattr(u, 'unit_id', '') or u.id): str(u.name) for u in db.query(Unit).all()}
+        self.categories = {str(c.id): str(c.name) for c in db.query(MachineCategory).all()}
+        self.projects = {str(getattr(p, 'project_id', '') or p.id): str(p.project_name) for p in db.query(Project).all()}
+        self._tasks = {}
+        self._archive = None
+        self._use_archive = needs_archive(start)
+
+    def task(self, task_id: str) -> Dict[str, Any]:
+        """Task row for a log's task id: hot sheets through the directory, archives only for old periods."""
+        if task_id not in self._tasks:
+            _, _, row = task_directory.lookup(task_id)
+            if row is None and self._use_archive:
+                if self._archive is None:
+                    self._archive = {}
+                    for sheet_name in ARCHIVED_SHEETS:
+                        archive = archive_sheet_name(sheet_name)
+                        id_col = next((h for h in SHEETS_SCHEMA.get(archive, []) if h.endswith("_id")), "id")
+                        for r in sheets_repo.get_all(archive, include_deleted=True):
+                            self._archive.setdefault(clean(r.get(id_col)).lower(), r)
+                row = self._archive.get(task_id.lower())
+            self._tasks[task_id] = row or {}
+        return self._tasks[task_id]
+
+    def machine_attrs(self, machine_id: str) -> Tuple[str, str]:
+        """(unit, category) of a machine; the columns hold either an id or a name."""
+        m = self.machines.get(machine_id)
+        if m is None:
+            return "", ""
+        return clean(getattr(m, 'unit', '')), clean(getattr(m, 'category', ''))
+
+    def label(self, dim: str, value: str) -> str:
+        if dim == "machine":
+            m = self.machines.get(value)
+            return str(m.machine_name) if m else ""
+        if dim == "operator":
+            u = self.users.get(value)
+            return str(u.full_name or u.username) if u else ""
+        if dim == "unit":
+            return self.units.get(value, value)
+        if dim == "category":
+            return self.categories.get(value, value)
+        if dim == "project":
+            return self.projects.get(value, "")
+        return value
+
+def run_report(db: any, start: date, end: Optional[date] = None, group_by: Sequence[str] = ("machine",)) -> List[Dict[str, Any]]:
+    """
+    Aggregates machine runtime, operator work time and completed tasks over
+    [start, end], grouped by `group_by`. Returns one row per non-empty group with
+    `<dim>_id` / `<dim>_name` columns (just `date` for the date dimension) and
+    the metrics, sorted by group.
+    """
+    end = end or start
+    for dim in group_by:
+        if dim not in DIMENSIONS:
+            raise ValueError(f"Unknown group_by dimension '{dim}'")
+
+    lookups = _Lookups(db, start)
+    cells: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+    def cell(day: str, machine_id: str, operator_id: str, project_id: str) -> Dict[str, Any]:
+        unit, category = lookups.machine_attrs(machine_id) if machine_id else ("", "")
+        if not unit and operator_id in lookups.users:
+            unit = clean(getattr(lookups.users[operator_id], 'unit_id', ''))
+        values = {"date": day, "machine": machine_id, "operator": operator_id, "unit": unit, "category": category, "project": project_id}
+        key = tuple(values[d] for d in group_by)
+        if key not in cells:
+            cells[key] = _new_cell()
+        return cells[key]
+
+    # Same row sets as query_range(): deleted log rows are not excluded
+    for log in log_partitions.rows_between("machineruntimelog", start, end, include_deleted=True):
+        task = lookups.task(clean(log.get("task_id")))
+        c = cell(day_key(log.get("date")), clean(log.get("machine_id")), clean(task.get("assigned_to")), clean(task.get("project_id")))
+        c["runtime_seconds"] += int(log.get("duration_seconds") or 0)
+        c["runtime_sessions"] += 1
+        if not clean(log.get("end_time")):
+            c["running_now"] = True
+
+    for log in log_partitions.rows_between("userworklog", start, end, include_deleted=True):
+        machine_id = clean(log.get("machine_id"))
+        task = lookups.task(clean(log.get("task_id")))
+        c = cell(day_key(log.get("date")), machine_id, clean(log.get("user_id")), clean(task.get("project_id")))
+        c["work_seconds"] += int(log.get("duration_seconds") or 0)
+        c["work_sessions"] += 1
+        if not clean(log.get("end_time")):
+            c["working_now"] = True
+        if machine_id:
+            c["machine_ids"].add(machine_id)
+
+    for _, task in task_completions.completed_between(start, end, include_archive=needs_archive(start)):
+        c = cell(completion_day(task), clean(task.get("machine_id")), clean(task.get("assigned_to")), clean(task.get("project_id")))
+        c["completed_tasks"] += 1
+
+    rows = []
+    for key in sorted(cells):
+        c = cells[key]
+        row = {}
+        for dim, value in zip(group_by, key):
+            if dim == "date":
+                row["date"] = value
+            else:
+                row[f"{dim}_id"] = value
+                row[f"{dim}_name"] = lookups.label(dim, value)
+        row.update(c)
+        row["machine_ids"] = sorted(c["machine_ids"])
+        rows.append(row)
+    return rows
@@ -0,0 +1,181 @@
+
+"""
+Live task transitions for shop-floor screens.
+The bus follows the three task sheets like any other SheetIndex: writes made
+through SheetsDB / SheetsRepository arrive via apply(), and reloads (which
+pick up edits made directly in the sheet) are diffed against the last known
+state in rebuild(). Status and assignment changes become events (start, hold,
+resume, complete, assign, ...) that are fanned out to SSE subscribers and kept
+in a short history so reconnecting clients can catch up by Last-Event-ID.
+"""
+
+import asyncio
+import itertools
+import threading
+from collections import deque
+from typing import List, Dict, Any, Optional, Tuple
+from app.core.sheets_db import SheetRow
+from app.core.normalizer import normalize_status
+from app.core.time_utils import get_current_time_ist
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+
+TASK_SHEETS = {"tasks": "general", "filingtasks": "filing", "fabricationtasks": "fabrication"}
+
+HISTORY_SIZE = 500 # Events kept for Last-Event-ID catch-up
+QUEUE_SIZE = 1000 # Per subscriber; a subscriber that falls this far behind is resynced
+
+# Put on a subscriber queue when it overflowed; the stream answers with a fresh snapshot
+RESYNC = object()
+
+def _task_state(sheet_name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    t = SheetRow(row, sheet_name)
+    return {
+        "task_id": str(getattr(t, 'id', '') or ""),
+        "task_type": TASK_SHEETS[sheet_name],
+        "title": str(getattr(t, 'title', '') or ""),
+        "status": normalize_status(getattr(t, 'status', 'pending')),
+        "assigned_to": str(getattr(t, 'assigned_to', '') or ""),
+        "machine_id": str(getattr(t, 'machine_id', '') or ""),
+        "project_id": str(getattr(t, 'project_id', '') or ""),
+        "project": str(getattr(t, 'project', '') or ""),
+        "is_deleted": bool(getattr(t, 'is_deleted', False)),
+    }
+
+def _transition(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Name of the transition between two task states, or None if nothing screens care about changed."""
+    old_live = old is not None and not old["is_deleted"]
+    new_live = new is not None and not new["is_deleted"]
+    if not old_live and not new_live:
+        return None
+    if not old_live:
+        return "create"
+    if not new_live:
+        return "delete"
+    if old["status"] != new["status"]:
+        if new["status"] == "in_progress":
+            return "resume" if old["status"] == "on_hold" else "start"
+        if new["status"] == "on_hold":
+            return "hold"
+        if new["status"] in ("completed", "ended"):
+            return "complete"
+        if new["status"] == "denied":
+            return "deny"
+        return "status"
+    if old["assigned_to"] != new["assigned_to"]:
+        return "assign"
+    return None
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def offer(self, event: Any):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+class TaskEventBus(SheetIndex):
+    sheets = tuple(TASK_SHEETS)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {} # sheet -> {task_id: state}
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._history = deque(maxlen=HISTORY_SIZE)
+        self._subscribers = set()
+
+    # --- Maintenance (called by the repository) ---
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        if not rows:
+            # Cache cleared: keep the last known states so the reload is diffed against them
+            return
+        new_states = {}
+        for row in rows:
+            state = _task_state(sheet_name, row)
+            if state["task_id"]:
+                new_states[state["task_id"]] = state
+        with self._lock:
+            old_states = self._states.get(sheet_name)
+            self._states[sheet_name] = new_states
+        if old_states is None:
+            return # First load: nothing to compare against
+        for task_id in list(old_states) + [k for k in new_states if k not in old_states]:
+            self._emit(old_states.get(task_id), new_states.get(task_id))
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        old = _task_state(sheet_name, old_row) if old_row is not None else None
+        new = _task_state(sheet_name, new_row) if new_row is not None else None
+        with self._lock:
+            states = self._states.setdefault(sheet_name, {})
+            if old is not None and old["task_id"]:
+                states.pop(old["task_id"], None)
+            if new is not None and new["task_id"]:
+                states[new["task_id"]] = new
+        self._emit(old, new)
+
+    # --- Events ---
+
+    def _emit(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        kind = _transition(old, new)
+        if kind is None:
+            return
+        current = new if new is not None else old
+        event = {k: v for k, v in current.items() if k != "is_deleted"}
+        event.update({
+            "event": kind,
+            "previous_status": old["status"] if old else None,
+            "previous_assigned_to": old["assigned_to"] if old else None,
+            "at": get_current_time_ist().isoformat(),
+        })
+        with self._lock:
+            event["seq"] = self._last_seq = next(self._seq)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, event)
+            except RuntimeError:
+                # Loop already closed; the stream's finally-block will unsubscribe it
+                pass
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def events_since(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """Events after `seq`, or None when some of them already fell out of the history."""
+        with self._lock:
+            if seq > self._last_seq:
+                return None
+            if self._history and self._history[0]["seq"] > seq + 1:
+                return None
+            if not self._history and seq < self._last_seq:
+                return None
+            return [e for e in self._history if e["seq"] > seq]
+
+    def subscribe(self) -> _Subscriber:
+        # Make sure the task sheets are loaded, so later writes have a baseline
+        for sheet_name in TASK_SHEETS:
+            sheets_repo.get_cached_records(sheet_name)
+        sub = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+# Singleton instance
+task_events = sheets_repo.register_index(TaskEventBus())
@@ -0,0 +1,235 @@
+
+"""
+Cached, versioned projection of normalized and name-enriched tasks for GET /tasks.
+Every row of the three task sheets is normalized once per row `_version` and
+joined with project / user / machine names once per name change. Writes to a
+task only recompute that task; renaming a user, machine or project only
+recomputes the tasks that reference it. Rows are walked in the pre-sorted
+order kept by task_order, so the endpoint filters a ready-made sequence.
+The TaskOut-validated, JSON-ready form of each task is cached alongside it for
+the fast JSON path (see app/utils/fast_json.py).
+"""
+
+import uuid
+import threading
+from datetime import date
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable
+from app.core.sheets_db import SheetRow
+from app.core.normalizer import safe_normalize_list, normalize_task_row
+from app.core.typed_columns import day_ordinal
+from app.schemas.task_schema import TaskOut
+from app.repositories.sheets_repository import sheets_repo, SheetIndex
+from app.repositories.task_order import task_order, TaskKey, TASK_SHEETS
+
+# Name sheet -> (id attribute, name column, whether soft-deleted rows are kept)
+NAME_SHEETS = {
+    "users": ("user_id", "username", True),
+    "machines": ("machine_id", "machine_name", True),
+    "projects": ("id", "project_name", False),
+}
+
+def _created_month(row: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """(year, month) of created_at, or None when the task passes any month filter."""
+    day = day_ordinal(row, "created_at")
+    if day is None:
+        return None
+    created = date.fromordinal(day)
+    return (created.year, created.month)
+
+def _build_base(sheet_name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalization and filter fields; depends on the task row only."""
+    t = SheetRow(row, sheet_name)
+    normalized = safe_normalize_list([t.dict()], normalize_task_row, "task")
+    return {
+        "is_deleted": bool(getattr(t, 'is_deleted', False)),
+        "created_month": _created_month(row),
+        "assigned_to": str(getattr(t, 'assigned_to', '')),
+        "normalized": normalized[0] if normalized else None,
+        "row_idx": row.get("_row_idx"),
+    }
+
+def _enrich(t: Dict[str, Any], row_idx: Any, names: Dict[str, Dict[str, str]]) -> Tuple[Dict[str, Any], List[Tuple[str, str]]]:
+    """Joins names into a normalized task. Returns the TaskOut dict and the name keys it used."""
+    project_map, user_map, machine_map = names["projects"], names["users"], names["machines"]
+
+    # Resolve Project Name
+    project_name = t.get('project', '')
+    project_id = t.get('project_id', '')
+
+    if (not project_name or project_name == '-') and project_id:
+        project_name = project_map.get(project_id, "-")
+    elif project_name == '-' and project_id in project_map:
+        project_name = project_map[project_id]
+
+    # Resolve Assigned To / Assigned By
+    assignee_id = str(t.get('assigned_to', '')).strip()
+    assignee_name = user_map.get(assignee_id, assignee_id)
+
+    assigner_id = str(t.get('assigned_by', '')).strip()
+    assigner_name = user_map.get(assigner_id, assigner_id)
+
+    # Resolve Machine
+    m_id = str(t.get('machine_id', '')).strip()
+    machine_name = machine_map.get(m_id, m_id) if m_id else None
+
+    # Resolve Due Date (Fallback to due_datetime)
+    due = t.get('due_date') or t.get('due_datetime') or ""
+
+    # CRITICAL: Sanitize IDs
+    # Check all possible ID fields from different task models
+    t_id = (
+        str(t.get('task_id', '')).strip() or
+        str(t.get('fabrication_task_id', '')).strip() or
+        str(t.get('filing_task_id', '')).strip() or
+        str(t.get('id', '')).strip()
+    )
+
+    if not t_id or t_id.lower() == "undefined":
+        # Create a traceable temporary ID if missing in DB
+        t_id = f"T-REFIX-{row_idx}-{uuid.uuid4().hex[:4]}"
+
+    # Build final dict matching TaskOut schema
+    task_data = {
+        "id": t_id,
+        "task_id": t_id,
+        "title": t.get('title', 'Unknown Task'),
+        "description": t.get('description', ''),
+        "project": project_name,
+        "project_id": t.get('project_id', ''),
+        "part_item": t.get('part_item', '-'),
+        "nos_unit": t.get('nos_unit', ''),
+        "status": t.get('status', 'pending'),
+        "priority": t.get('priority', 'MEDIUM'),
+        "assigned_by": assigner_name,
+        "assigned_to": assignee_name,
+        "machine_id": machine_name,
+        "due_date": due,
+        "created_at": t.get('created_at'),
+        "started_at": t.get('started_at'),
+        "completed_at": t.get('completed_at'),
+        "total_duration_seconds": t.get('total_duration_seconds', 0),
+        "hold_reason": t.get('hold_reason', ""),
+        "denial_reason": t.get('denial_reason', ""),
+        "actual_start_time": t.get('actual_start_time'),
+        "actual_end_time": t.get('actual_end_time'),
+        "total_held_seconds": t.get('total_held_seconds', 0),
+        "work_order_number": t.get('work_order_number', "N/A"),
+        "ended_by": t.get('ended_by', ""),
+        "end_reason": t.get('end_reason', ""),
+        "expected_completion_time": t.get('expected_completion_time', 0)
+    }
+    refs = [("projects", project_id), ("users", assignee_id), ("users", assigner_id), ("machines", m_id)]
+    return task_data, refs
+
+class TaskProjection(SheetIndex):
+    sheets = TASK_SHEETS + tuple(NAME_SHEETS)
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {} # (sheet, _row_idx) -> [_version, base, TaskOut dict or None, serialized TaskOut or None]
+        self._refs = {} # (name sheet, id) -> {(sheet, _row_idx), ...} using that name
+        self._names = {name: {} for name in NAME_SHEETS}
+        self._stale_names = set(NAME_SHEETS)
+
+    # --- Maintenance (called by the repository) ---
+
+    def _set_names(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        id_attr, column, keep_deleted = NAME_SHEETS[sheet_name]
+        names = {}
+        for row in rows:
+            r = SheetRow(row, sheet_name)
+            if not keep_deleted and getattr(r, 'is_deleted', False):
+                continue
+            names[str(getattr(r, id_attr, ''))] = r.dict().get(column)
+        old = self._names[sheet_name]
+        self._names[sheet_name] = names
+        self._stale_names.discard(sheet_name)
+
+        # Only tasks that reference a renamed / added / removed id are re-enriched
+        for name_id in set(old) | set(names):
+            if old.get(name_id) != names.get(name_id):
+                for key in self._refs.pop((sheet_name, name_id), ()):
+                    if key in self._entries:
+                        self._entries[key][2] = None
+                        self._entries[key][3] = None
+
+    def rebuild(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        with self._lock:
+            if sheet_name in NAME_SHEETS:
+                self._set_names(sheet_name, rows)
+                return
+            # Entries are keyed by row version, so only vanished rows need dropping
+            live = {row.get("_row_idx") for row in rows}
+            for key in [k for k in self._entries if k[0] == sheet_name and k[1] not in live]:
+                del self._entries[key]
+
+    def apply(self, sheet_name: str, old_row: Optional[Dict[str, Any]], new_row: Optional[Dict[str, Any]]):
+        with self._lock:
+            if sheet_name in NAME_SHEETS:
+                # Recomputed from the (small) sheet on the next read
+                self._stale_names.add(sheet_name)
+            elif old_row is not None and new_row is None:
+                self._entries.pop((sheet_name, old_row.get("_row_idx")), None)
+
+    # --- Reads ---
+
+    def _entry(self, sheet_name: str, row: Dict[str, Any]) -> list:
+        key = (sheet_name, row.get("_row_idx"))
+        version = row.get("_version")
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            entry = [version, _build_base(sheet_name, row), None, None]
+            self._entries[key] = entry
+        if entry[2] is None and entry[1]["normalized"] is not None and not entry[1]["is_deleted"]:
+            base = entry[1]
+            try:
+                task_data, refs = _enrich(base["normalized"], base["row_idx"], self._names)
+            except Exception as e:
+                print(f"Error processing task {base['normalized'].get('task_id')}: {e}")
+                return entry
+            entry[2] = task_data
+            entry[3] = None
+            for ref in refs:
+                self._refs.setdefault(ref, set()).add(key)
+        return entry
+
+    def _refresh_names(self):
+        # Keep the name sheets loaded and fresh (triggers rebuild() on reload)
+        name_rows = {s: sheets_repo.get_cached_records(s) for s in NAME_SHEETS}
+        with self._lock:
+            for sheet_name in list(self._stale_names):
+                self._set_names(sheet_name, name_rows[sheet_name])
+
+    def iter_tasks(self, after: Optional[TaskKey] = None, serialized: bool = False) -> Iterator[Tuple[TaskKey, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Non-deleted tasks in display order (due date, created_at, id) as
+        (sort key, base, task_data), starting after the `after` key. `base`
+        carries the filter fields (created_month, assigned_to); `task_data` is
+        shared and must not be mutated. With `serialized`, task_data is the
+        TaskOut-validated JSON form (what response_model=TaskOut would emit).
+        Work is proportional to what is consumed.
+        """
+        self._refresh_names()
+        for key, sheet_name, row in task_order.iter_after(TASK_SHEETS, after):
+            with self._lock:
+                entry = self._entry(sheet_name, row)
+                if serialized and entry[2] is not None and entry[3] is None:
+                    entry[3] = TaskOut.model_validate(entry[2]).model_dump(mode="json")
+                _, base, task_data, task_json = entry
+            if task_data is not None:
+                yield key, base, task_json if serialized else task_data
+
+    def iter_rows(self, rows: Iterable[Tuple[Any, str, Dict[str, Any]]]) -> Iterator[Tuple[Any, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Same as iter_tasks(), over (key, sheet name, cached row) triples chosen by
+        the caller (e.g. search hits) instead of the display order.
+        """
+        self._refresh_names()
+        for key, sheet_name, row in rows:
+            with self._lock:
+                _, base, task_data, _ = self._entry(sheet_name, row)
+            if task_data is not None:
+                yield key, base, task_data
+
+# Singleton instance
+task_projection = sheets_repo.register_index(TaskProjection())
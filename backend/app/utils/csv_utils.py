@@ -1,7 +1,7 @@
 import csv
-import io
 from datetime import datetime, date, timedelta
-from typing import List, Any
+from typing import List, Any, Iterable, Iterator
+from fastapi.responses import StreamingResponse
 from app.core.time_utils import IST
 
 def format_duration_hms(seconds: int) -> str:
@@ -20,13 +20,43 @@ def clean_csv_value(value: Any) -> str:
         return ";".join(str(v) for v in value)
     return str(value)
 
-def generate_csv_stream(headers: List[str], rows: List[List[Any]]) -> io.StringIO:
-    """Generates a CSV string stream."""
-    output = io.StringIO()
-    writer = csv.writer(output)
+CSV_CHUNK_SIZE = 64 * 1024 # Bytes of encoded CSV per chunk handed to the response
+
+class _ChunkSink:
+    """File-like target for csv.writer that just collects the written lines."""
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, s: str):
+        self.parts.append(s)
+        self.size += len(s)
+
+    def drain(self) -> bytes:
+        data = "".join(self.parts).encode("utf-8")
+        self.parts = []
+        self.size = 0
+        return data
+
+def iter_csv(headers: List[str], rows: Iterable[List[Any]], chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encodes rows into UTF-8 CSV chunks of about `chunk_size` bytes as they are consumed.
+    `rows` may be a generator; nothing is pulled from it before the first chunk is requested.
+    """
+    sink = _ChunkSink()
+    writer = csv.writer(sink)
     writer.writerow(headers)
     for row in rows:
-        cleaned_row = [clean_csv_value(v) for v in row]
-        writer.writerow(cleaned_row)
-    output.seek(0)
-    return output
+        writer.writerow([clean_csv_value(v) for v in row])
+        if sink.size >= chunk_size:
+            yield sink.drain()
+    if sink.parts:
+        yield sink.drain()
+
+def csv_response(filename: str, headers: List[str], rows: Iterable[List[Any]]) -> StreamingResponse:
+    """Streams rows as a CSV attachment. A sync iterator is consumed in the threadpool, so lazy rows don't block the loop."""
+    return StreamingResponse(
+        iter_csv(headers, rows),
+        media_type="text/csv",
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 import pytz
+from app.core.typed_columns import parse_timestamp
 
 IST = pytz.timezone("Asia/Kolkata")
 
@@ -12,10 +13,8 @@ def make_aware(dt):
     if dt is None:
         return None
     if isinstance(dt, str):
-        try:
-            dt = datetime.fromisoformat(dt)
-        except:
-            return None
+        # Parsed once per distinct string (shared with the typed shadow columns)
+        return parse_timestamp(dt)
     if dt.tzinfo is None:
         return dt.replace(tzinfo=IST)
     return dt.astimezone(IST)
@@ -0,0 +1,127 @@
+"""
+Fast JSON path for large list endpoints.
+Rows that are already normalized (and validated once per row version) are
+encoded straight to bytes, skipping FastAPI's jsonable_encoder and the
+per-request response_model validation. Encoded bodies are kept per
+(endpoint, params, sheet versions), so a repeated request with unchanged data
+costs a dictionary lookup (compressed variants included). orjson is used when
+installed, the stdlib otherwise.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from fastapi.responses import Response
+from app.repositories.sheets_repository import sheets_repo
+from app.core.compression import accepted_encoding, compress
+
+try:
+    import orjson
+except ImportError: # pragma: no cover - optional speed-up
+    orjson = None
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """JSON response rendered with `dumps`; also accepts already-encoded bytes."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
+
+class EncodedResponseCache:
+    """Bounded LRU of encoded bodies keyed by (endpoint, params, sheet versions)."""
+
+    def __init__(self, max_entries: int = 256):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # key -> (body bytes, headers)
+        self._max_entries = max_entries
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+            return hit
+
+    def put(self, key: Hashable, body: bytes, headers: Dict[str, str]):
+        with self._lock:
+            self._entries[key] = (body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+encoded_cache = EncodedResponseCache()
+
+def sheet_versions(*sheet_names: str) -> Tuple[int, ...]:
+    """Current versions of the given sheets (loading / revalidating their cache first)."""
+    versions = []
+    for sheet_name in sheet_names:
+        sheets_repo.get_cached_records(sheet_name)
+        versions.append(sheets_repo.get_version(sheet_name))
+    return tuple(versions)
+
+def _cached_entry(key: Hashable, build: Callable[[Dict[str, str]], Any]) -> Tuple[bytes, Dict[str, str]]:
+    hit = encoded_cache.get(key)
+    if hit is None:
+        headers = {}
+        content = build(headers)
+        body = bytes(content) if isinstance(content, (bytes, bytearray)) else dumps(content)
+        encoded_cache.put(key, body, headers)
+        hit = (body, headers)
+    return hit
+
+def cached_json_body(
+    endpoint: str,
+    params: Tuple[Hashable, ...],
+    sheet_names: Tuple[str, ...],
+    build: Callable[[Dict[str, str]], Any],
+) -> bytes:
+    """The cached plain encoding of `endpoint` (see cached_json_response), e.g. to splice into a larger body."""
+    return _cached_entry((endpoint, params, sheet_versions(*sheet_names)), build)[0]
+
+def cached_json_response(
+    endpoint: str,
+    params: Tuple[Hashable, ...],
+    sheet_names: Tuple[str, ...],
+    build: Callable[[Dict[str, str]], Any],
+) -> FastJSONResponse:
+    """
+    Serves `endpoint` from the encoded cache, or calls `build(headers)` to
+    produce the JSON-ready content (or already-encoded bytes; it may add
+    response headers) and caches its encoding. Versions are read before
+    building, so a write that lands mid-build only results in a cache miss on
+    the next request. Compressed variants are cached next to the plain body.
+    """
+    key = (endpoint, params, sheet_versions(*sheet_names))
+    body, headers = _cached_entry(key, build)
+    headers = dict(headers)
+
+    encoding = accepted_encoding(len(body))
+    if encoding is not None:
+        variant = encoded_cache.get((key, encoding))
+        if variant is None:
+            variant = (compress(body, encoding), {})
+            encoded_cache.put((key, encoding), *variant)
+        body = variant[0]
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+    return FastJSONResponse(content=body, headers=headers)
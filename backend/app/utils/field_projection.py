@@ -0,0 +1,41 @@
+from typing import Any, Dict, Iterable, List, Optional
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+def parse_fields(fields: Optional[str], allowed: Optional[Iterable[str]] = None) -> Optional[List[str]]:
+    """
+    Parses a `?fields=a,b,c` projection. Returns None when no projection was asked for.
+    Unknown names are rejected (400) when `allowed` is given.
+    """
+    if fields is None:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    if not requested:
+        return None
+    if allowed is not None:
+        allowed = set(allowed)
+        unknown = [f for f in requested if f not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def model_defaults(model: type[BaseModel]) -> Dict[str, Any]:
+    """Default values of a response model's optional fields (used to fill projected rows)."""
+    return {name: f.default for name, f in model.model_fields.items() if not f.is_required()}
+
+def project_row(row: Dict[str, Any], fields: List[str], defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    defaults = defaults or {}
+    return {f: row.get(f, defaults.get(f)) for f in fields}
+
+def fields_response(rows: List[Dict[str, Any]], response: Optional[Response] = None) -> JSONResponse:
+    """
+    JSON response for projected rows. Partial rows bypass the route's response_model,
+    so the pagination header set on the injected `response` is carried over here.
+    """
+    headers = {}
+    if response is not None and NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return JSONResponse(content=jsonable_encoder(rows), headers=headers)
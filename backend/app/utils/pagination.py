@@ -0,0 +1,34 @@
+import json
+import base64
+from typing import Any, Optional, Tuple
+from fastapi import HTTPException, Response
+
+# Upper bound for ?limit= on paginated list endpoints
+PAGE_LIMIT_MAX = 500
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(key: Tuple[Any, ...]) -> str:
+    """Opaque, URL-safe cursor for the last sort key of a page."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str], shape: Tuple[type, ...]) -> Optional[Tuple[Any, ...]]:
+    """Decodes a cursor and checks it matches the key `shape` (one type per element)."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(key, list) or len(key) != len(shape):
+            raise ValueError("cursor has the wrong length")
+        if not all(isinstance(v, t) for v, t in zip(key, shape)):
+            raise ValueError("cursor has the wrong types")
+        return tuple(key)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def set_next_cursor(response: Response, key: Optional[Tuple[Any, ...]]):
+    if key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key)
@@ -0,0 +1,48 @@
+"""
+Helpers for reading raw cached sheet rows, shared by the repository indexes,
+rollups, reports and archival. Keeping them in one place means every derived
+structure agrees on which column is a sheet's id, what counts as deleted, and
+which day a timestamp belongs to.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List
+from app.core.sheets_config import SHEETS_SCHEMA
+
+def clean(value: Any) -> str:
+    """Trimmed string form of a cell ('' for None)."""
+    return str(value).strip() if value is not None else ""
+
+def lookup_key(value: Any) -> str:
+    """Trimmed, lower-cased cell; the comparison QueryWrapper.filter(id=...) uses for strings."""
+    return str(value).strip().lower() if value is not None else ""
+
+def id_column(sheet_name: str) -> str:
+    """The sheet's id column: the first schema column ending in '_id' ('id' otherwise)."""
+    for h in SHEETS_SCHEMA.get(sheet_name, []):
+        if h.endswith("_id"):
+            return h
+    return "id"
+
+def is_deleted(row: Dict[str, Any]) -> bool:
+    return str(row.get("is_deleted", "")).strip().upper() in ["TRUE", "1", "YES"]
+
+def day_key(value: Any) -> str:
+    """'YYYY-MM-DD' prefix of a date/datetime/ISO string ('' if unusable)."""
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()[:10]
+    return str(value).strip()[:10]
+
+def month_keys(start: str, end: str) -> List[str]:
+    """All 'YYYY-MM' keys between two 'YYYY-MM-DD' strings (inclusive)."""
+    y, m = int(start[:4]), int(start[5:7])
+    end_y, end_m = int(end[:4]), int(end[5:7])
+    keys = []
+    while (y, m) <= (end_y, end_m):
+        keys.append(f"{y:04d}-{m:02d}")
+        m += 1
+        if m > 12:
+            y, m = y + 1, 1
+    return keys
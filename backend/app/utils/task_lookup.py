@@ -1,28 +1,18 @@
 from typing import Optional, Any
-from app.models.models_db import Task, FilingTask, FabricationTask
-from fastapi import HTTPException
+from app.core.sheets_db import SheetRow
+from app.repositories.task_directory import task_directory
 
 def find_any_task(db: Any, task_id: str):
     """
     Look for a task in all three sheets: tasks, filingtasks, fabricationtasks.
     Returns the task object and its type.
+    Resolved through the repository's task directory (one dict lookup per sheet).
     """
     if not task_id:
         return None, None
 
-    # 1. Search General Tasks
-    task = db.query(Task).filter(id=task_id).first()
-    if task:
-        return task, "general"
-
-    # 2. Search Filing Tasks
-    task = db.query(FilingTask).filter(id=task_id).first()
-    if task:
-        return task, "filing"
-
-    # 3. Search Fabrication Tasks
-    task = db.query(FabricationTask).filter(id=task_id).first()
-    if task:
-        return task, "fabrication"
+    sheet_name, task_type, row = task_directory.lookup(task_id)
+    if row is None:
+        return None, None
 
-    return None, None
+    return SheetRow(row, sheet_name, db), task_type
@@ -0,0 +1,221 @@
+"""
+Shared fixtures: an in-memory stand-in for GoogleSheetsService, so repository
+caches, indexes and services run against a worksheet grid held in a dict.
+Values are stored the way Sheets stores RAW input (str(value), isoformat for
+dates), and read back through the real _process_values_to_records.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import pytest
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import google_sheets as gs_module
+from app.core.sheets_config import SHEETS_SCHEMA
+import app.core.sheets_db as sheets_db_module
+import app.repositories.sheets_repository as repo_module
+from app.repositories.sheets_repository import sheets_repo
+
+def _cell(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return str(value)
+
+class FakeSheets:
+    def __init__(self):
+        self.grids = {}
+        self.reads = 0
+
+    # --- Test helpers ---
+
+    def seed(self, name, *rows):
+        headers = list(SHEETS_SCHEMA[name])
+        self.grids[name] = [headers] + [[_cell(row.get(h, "")) for h in headers] for row in rows]
+
+    def column(self, name, header):
+        grid = self._grid(name)
+        i = [self._normalize_header(h) for h in grid[0]].index(header)
+        return [row[i] if i < len(row) else "" for row in grid[1:]]
+
+    # --- GoogleSheetsService surface ---
+
+    def _grid(self, name):
+        return self.grids.setdefault(name, [list(SHEETS_SCHEMA.get(name, ["id"]))])
+
+    def _normalize_header(self, h):
+        return gs_module.GoogleSheetsService._normalize_header(self, h)
+
+    def _process_values_to_records(self, values):
+        return gs_module.GoogleSheetsService._process_values_to_records(self, values)
+
+    def read_all_bulk(self, name):
+        self.reads += 1
+        return self._process_values_to_records([list(r) for r in self._grid(name)])
+
+    def batch_get_all(self, names):
+        return {n: self.read_all_bulk(n) for n in names}
+
+    def read_column(self, name, header):
+        return {i + 2: v for i, v in enumerate(self.column(name, header))}
+
+    def insert_row(self, name, data, raw_headers=None):
+        grid = self._grid(name)
+        grid.append([_cell(data.get(self._normalize_header(h), "")) for h in grid[0]])
+        return True
+
+    def batch_append(self, name, rows, raw_headers=None):
+        for row in rows:
+            self.insert_row(name, row, raw_headers)
+        return True
+
+    def update_row_by_idx(self, name, row_idx, data, raw_headers=None):
+        grid = self._grid(name)
+        headers = [self._normalize_header(h) for h in grid[0]]
+        row = grid[row_idx - 1]
+        row += [""] * (len(headers) - len(row))
+        for k, v in data.items():
+            if k in headers:
+                row[headers.index(k)] = _cell(v)
+        return True
+
+    def batch_update(self, name, updates, raw_headers=None):
+        for u in updates:
+            self.update_row_by_idx(name, u["_row_idx"], {k: v for k, v in u.items() if not k.startswith("_")})
+        return True
+
+    def delete_row_by_idx(self, name, row_idx):
+        del self._grid(name)[row_idx - 1]
+        return True
+
+    def delete_rows_by_idx(self, name, row_indices):
+        for i in sorted(set(row_indices), reverse=True):
+            del self._grid(name)[i - 1]
+        return True
+
+    def ensure_worksheet(self, name, headers, force_headers=False):
+        self.grids.setdefault(name, [list(headers)])
+
+def _reset_repository():
+    for name in set(SHEETS_SCHEMA) | set(repo_module._GLOBAL_CACHE):
+        sheets_repo.clear_cache(name)
+    repo_module._RAW_HEADERS.clear()
+    from app.utils.fast_json import encoded_cache
+    encoded_cache.clear()
+
+@pytest.fixture
+def sheets(monkeypatch):
+    """A fresh, empty in-memory spreadsheet wired into the repository and SheetsDB."""
+    fake = FakeSheets()
+    for module in (gs_module, repo_module, sheets_db_module):
+        monkeypatch.setattr(module, "google_sheets", fake)
+    _reset_repository()
+    yield fake
+    _reset_repository()
+
+@pytest.fixture
+def check_index(sheets):
+    """
+    check_index(index, query): query(index) after repository writes, after a
+    reload of the index's sheets, and on a new instance rebuilt from the
+    current rows must agree. Returns the result.
+    """
+    def check(index, query):
+        applied = query(index)
+        scratch = type(index)()
+        for sheet_name in index.sheets:
+            scratch.rebuild(sheet_name, sheets_repo.get_cached_records(sheet_name))
+        assert query(scratch) == applied
+        for sheet_name in index.sheets:
+            sheets_repo.refresh(sheet_name)
+        assert query(index) == applied
+        return applied
+    return check
+
+class Response:
+    def __init__(self, status_code, headers, chunks):
+        self.status_code = status_code
+        self.headers = {k.decode().lower(): v.decode() for k, v in headers}
+        self.chunks = chunks
+        self.content = b"".join(chunks)
+
+class ASGIClient:
+    """
+    Runs requests in-process through the app's full middleware stack (no
+    lifespan, no network). `timeout` ends an endless stream (SSE) and returns
+    what it sent so far.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, url, headers=None, body=b"", timeout=None):
+        parts = urlsplit(url)
+        scope = {
+            "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+            "path": parts.path, "raw_path": parts.path.encode(), "query_string": parts.query.encode(),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+            "server": ("testserver", 80), "client": ("testclient", 50000), "root_path": "",
+        }
+        out = {"status": None, "headers": [], "chunks": []}
+        disconnected = asyncio.Event()
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                out["status"], out["headers"] = message["status"], message.get("headers", [])
+            elif message["type"] == "http.response.body" and message.get("body"):
+                out["chunks"].append(message["body"])
+
+        async def run():
+            task = asyncio.ensure_future(self.app(scope, receive, send))
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.TimeoutError:
+                disconnected.set()
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+        asyncio.run(run())
+        return Response(out["status"], out["headers"], out["chunks"])
+
+    def get(self, url, headers=None, timeout=None):
+        return self.request("GET", url, headers=headers, timeout=timeout)
+
+    def post(self, url, json_body=None, headers=None):
+        return self.request("POST", url, headers={"content-type": "application/json", **(headers or {})}, body=json.dumps(json_body).encode())
+
+@pytest.fixture
+def client(sheets):
+    """An ASGIClient for the app, against the `sheets` fake."""
+    from app.main import app
+    return ASGIClient(app)
+
+def auth_headers(username):
+    """Bearer token for a user seeded in the fake users sheet."""
+    from app.core.auth_utils import create_access_token
+    return {"Authorization": "Bearer " + create_access_token({"sub": username})}
+
+@pytest.fixture
+def admin(sheets):
+    """Seeds an active admin (and an operator) into the users sheet; returns the admin's auth headers."""
+    sheets.seed("users",
+        {"user_id": "U1", "username": "op1", "role": "operator", "active": "True", "approval_status": "approved", "is_deleted": "False"},
+        {"user_id": "U2", "username": "admin", "role": "admin", "active": "True", "approval_status": "approved", "is_deleted": "False"},
+    )
+    return auth_headers("admin")
@@ -0,0 +1,50 @@
+import pytest
+from app.repositories.sheets_repository import sheets_repo
+from app.services.archive_service import run_archival
+
+def _task(task_id, status, completed_at=""):
+    return {"task_id": task_id, "title": task_id, "status": status, "completed_at": completed_at, "is_deleted": "False"}
+
+def test_archival_uses_fresh_rows_after_out_of_band_edits(sheets):
+    sheets.seed("tasks",
+        _task("t1", "pending"),
+        _task("t2", "completed", "2026-01-02T10:00:00"),
+        _task("t3", "pending"),
+        _task("t4", "completed", "2026-01-03T10:00:00"),
+    )
+    sheets_repo.get_cached_records("tasks") # warm cache
+
+    # Another worker / a manual edit removes t1 and appends t9; our cache still has the old positions
+    del sheets.grids["tasks"][1]
+    sheets.grids["tasks"].append([("t9" if h == "task_id" else "pending" if h == "status" else "") for h in sheets.grids["tasks"][0]])
+
+    result = run_archival(days=0)
+
+    assert result["sheets"]["tasks"] == 2
+    assert sheets.column("tasks", "task_id") == ["t3", "t9"]
+    assert sorted(sheets.column("tasks_archive", "task_id")) == ["t2", "t4"]
+
+def test_delete_rows_refuses_when_positions_moved(sheets):
+    sheets.seed("tasks", _task("t1", "pending"), _task("t2", "completed"))
+    sheets_repo.get_cached_records("tasks")
+    del sheets.grids["tasks"][1] # t2 now sits where t1 was
+
+    with pytest.raises(RuntimeError):
+        sheets_repo.delete_rows("tasks", ["t2"])
+    assert sheets.column("tasks", "task_id") == ["t2"]
+
+def test_rerun_after_a_failed_delete_does_not_archive_twice(sheets, monkeypatch):
+    sheets.seed("tasks", _task("t1", "pending"), _task("t2", "completed", "2026-01-02T10:00:00"))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("quota exceeded")
+    with monkeypatch.context() as m:
+        m.setattr(sheets_repo, "delete_rows", fail)
+        assert "error" in run_archival(days=0)["sheets"]["tasks"]
+    assert sheets.column("tasks_archive", "task_id") == ["t2"]
+
+    result = run_archival(days=0)
+
+    assert result["sheets"]["tasks"] == 1
+    assert sheets.column("tasks", "task_id") == ["t1"]
+    assert sheets.column("tasks_archive", "task_id") == ["t2"]
@@ -0,0 +1,61 @@
+import json
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.change_log import change_log
+from conftest import auth_headers
+
+def _task(task_id, status="pending", **fields):
+    return {"task_id": task_id, "title": task_id, "status": status, "is_deleted": "False", **fields}
+
+def test_change_log_reload_after_writes_logs_nothing(sheets):
+    sheets.seed("tasks", _task("t1", assigned_to="u1"), _task("t2", assigned_to="u2"))
+    for sheet_name in change_log.sheets:
+        change_log.current_rows(sheet_name)
+    since = change_log.current_seq()
+
+    sheets_repo.update("tasks", "t1", {"status": "in_progress"})
+    sheets_repo.insert("tasks", _task("t3", assigned_to="u1"))
+    owners = lambda changes: {key: owners for key, (owners, _) in changes["tasks"].items()}
+    changed = owners(change_log.changes_since(since))
+    assert changed == {"t1": {"u1"}, "t3": {"u1"}}
+
+    after_writes = change_log.current_seq()
+    for sheet_name in change_log.sheets:
+        sheets_repo.refresh(sheet_name)
+    assert change_log.changes_since(after_writes) == {}
+    assert owners(change_log.changes_since(since)) == changed
+
+def _sync(client, headers, since=0):
+    r = client.get(f"/sync?since={since}", headers=headers)
+    assert r.status_code == 200
+    return json.loads(r.content)
+
+def _tasks_changed(body):
+    tasks = body["changes"].get("tasks", {"upserts": [], "deletes": []})
+    return sorted(t["task_id"] for t in tasks["upserts"]), sorted(tasks["deletes"])
+
+def test_sync_cursor_returns_only_later_changes(client, sheets, admin):
+    sheets.seed("tasks", _task("t1", assigned_to="U1"), _task("t2", assigned_to="U2"))
+
+    first = _sync(client, admin)
+    assert first["reset"] is True
+    assert _tasks_changed(first) == (["t1", "t2"], [])
+
+    sheets_repo.update("tasks", "t1", {"status": "in_progress"})
+    sheets_repo.soft_delete("tasks", "t2")
+    second = _sync(client, admin, first["cursor"])
+
+    assert second["reset"] is False and second["cursor"] > first["cursor"]
+    assert _tasks_changed(second) == (["t1"], ["t2"])
+    assert _tasks_changed(_sync(client, admin, second["cursor"])) == ([], [])
+
+def test_operator_sync_is_scoped_to_their_tasks(client, sheets, admin):
+    sheets.seed("tasks", _task("t1", assigned_to="U1"), _task("t2", assigned_to="U2"))
+    operator = auth_headers("op1")
+
+    first = _sync(client, operator)
+    assert _tasks_changed(first) == (["t1"], [])
+
+    # Reassigned away from the operator: reported as a delete
+    sheets_repo.update("tasks", "t1", {"assigned_to": "U2"})
+    sheets_repo.update("tasks", "t2", {"status": "in_progress"})
+    assert _tasks_changed(_sync(client, operator, first["cursor"])) == ([], ["t1"])
@@ -0,0 +1,37 @@
+import gzip
+import json
+import pytest
+from app.core import compression
+
+def _tasks(n):
+    return [{"task_id": f"T{i}", "title": f"task number {i}", "status": "pending", "is_deleted": "False"} for i in range(n)]
+
+def test_large_body_is_gzipped_when_accepted(client, sheets, admin):
+    sheets.seed("tasks", *_tasks(50))
+    plain = client.get("/tasks", headers=admin)
+
+    r = client.get("/tasks", headers={**admin, "Accept-Encoding": "br;q=0, gzip"})
+
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert gzip.decompress(r.content) == plain.content
+    assert len(json.loads(plain.content)) == 50
+
+@pytest.mark.parametrize("accept", [None, "identity", "gzip"])
+def test_uncompressed_responses_still_vary(client, sheets, admin, accept):
+    sheets.seed("tasks", *_tasks(1 if accept == "gzip" else 50)) # gzip: a body under the threshold
+    headers = dict(admin, **({"Accept-Encoding": accept} if accept else {}))
+
+    r = client.get("/tasks", headers=headers)
+
+    assert "content-encoding" not in r.headers
+    assert "Accept-Encoding" in r.headers["vary"]
+
+def test_negotiation_order_and_q_values():
+    assert compression.negotiate("gzip;q=0, *") == ("br" if compression.brotli else None)
+    assert compression.negotiate("deflate") is None
+    assert compression.negotiate("GZIP;q=0.5") == "gzip"
+
+def test_brotli_is_preferred_when_installed():
+    pytest.importorskip("brotli")
+    assert compression.negotiate("gzip, br") == "br"
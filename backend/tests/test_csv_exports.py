@@ -0,0 +1,27 @@
+import csv
+import io
+from app.utils.csv_utils import CSV_CHUNK_SIZE
+
+def test_machine_export_streams_in_chunks(client, sheets):
+    sheets.seed("machines", *[
+        {"machine_id": f"M{i}", "machine_name": f"Machine number {i:05d}", "is_deleted": "False"} for i in range(3000)
+    ])
+
+    r = client.get("/reports/machines/export-csv?date_str=2026-01-05")
+
+    assert r.status_code == 200
+    assert r.headers["content-disposition"] == 'attachment; filename="machine_report_2026-01-05.csv"'
+    assert len(r.chunks) > 1 and all(len(c) >= CSV_CHUNK_SIZE for c in r.chunks[:-1])
+    rows = list(csv.reader(io.StringIO(r.content.decode())))
+    assert rows[0] == ["Date", "Machine Name", "Runtime (Mins)", "Tasks Run", "Status"]
+    assert len(rows) == 3001
+    assert rows[1] == ["2026-01-05", "Machine number 00000", "0.0", "0", "Idle"]
+
+def test_user_export_checks_the_period_before_streaming(client, sheets, admin):
+    r = client.get("/reports/users/export-csv?date_str=2026-01-05&end_date_str=2026-01-04")
+    assert r.status_code == 400
+
+    r = client.get("/reports/users/export-csv?date_str=2026-01-05")
+    rows = list(csv.reader(io.StringIO(r.content.decode())))
+    # Only operators and masters are reported
+    assert rows == [["Date", "User Name", "Work Time (Mins)", "Tasks Worked", "Status"], ["2026-01-05", "op1", "0.0", "0", "Absent"]]
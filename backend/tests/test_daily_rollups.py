@@ -0,0 +1,36 @@
+from datetime import date
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.daily_rollups import daily_rollups
+
+JAN_5, JAN_6 = date(2026, 1, 5), date(2026, 1, 6)
+
+def _task(task_id, status="pending", **fields):
+    return {"task_id": task_id, "title": task_id, "status": status, "is_deleted": "False", **fields}
+
+def test_rollups_after_writes_match_a_rebuild(sheets, check_index):
+    sheets.seed("machineruntimelog",
+        {"log_id": "L1", "machine_id": "M1", "task_id": "T1", "duration_seconds": "600", "date": "2026-01-05", "end_time": "2026-01-05T10:10:00"},
+        {"log_id": "L2", "machine_id": "M2", "task_id": "T2", "duration_seconds": "0", "date": "2026-01-05", "end_time": ""},
+    )
+    sheets.seed("userworklog", {"log_id": "W1", "user_id": "u1", "machine_id": "M1", "duration_seconds": "600", "date": "2026-01-05", "end_time": "2026-01-05T10:10:00"})
+    sheets.seed("tasks", _task("t1", "completed", completed_at="2026-01-05T10:10:00", machine_id="M1", assigned_to="u1"))
+    sheets.seed("tasks_archive", _task("t9", "completed", completed_at="2026-01-06T09:00:00", machine_id="M2", assigned_to="u2"))
+    daily_rollups.machine_totals(JAN_5, JAN_6, include_archive=True)
+
+    sheets_repo.update("machineruntimelog", "L2", {"end_time": "2026-01-05T11:00:00", "duration_seconds": 900})
+    sheets_repo.insert("machineruntimelog", {"log_id": "L3", "machine_id": "M1", "task_id": "T1", "duration_seconds": 120, "date": "2026-01-06", "end_time": ""})
+    sheets_repo.insert("userworklog", {"log_id": "W2", "user_id": "u1", "machine_id": "M2", "duration_seconds": 300, "date": "2026-01-06", "end_time": ""})
+    sheets_repo.soft_delete("tasks", "t1")
+    # Hot copy of an archived task: counted once, from the hot row
+    sheets_repo.insert("tasks", _task("t9", "completed", completed_at="2026-01-06T09:00:00", machine_id="M1", assigned_to="u1"))
+
+    machines, users, runtime = check_index(daily_rollups, lambda index: (
+        index.machine_totals(JAN_5, JAN_6, include_archive=True),
+        index.user_totals(JAN_5, JAN_6, include_archive=True),
+        index.task_runtime(["T1", "T2"]),
+    ))
+    assert machines["M1"] == {"runtime_seconds": 720, "sessions": 2, "running_now": True, "completed_tasks": 1}
+    assert machines["M2"] == {"runtime_seconds": 900, "sessions": 1, "running_now": False, "completed_tasks": 0}
+    assert users["u1"]["machine_ids"] == {"M1", "M2"} and users["u1"]["completed_tasks"] == 1
+    assert "u2" not in users
+    assert runtime["T1"] == {"runtime_seconds": 720, "sessions": 2, "running_now": True}
@@ -0,0 +1,42 @@
+import asyncio
+import json
+from app.core.sheets_db import get_sheets_db
+from app.repositories.sheets_repository import sheets_repo
+from app.services.dashboard_bootstrap_service import admin_bootstrap_json
+
+def test_dropdowns_panel_carries_the_lists(sheets):
+    sheets.seed("projects", {"project_id": "P1", "project_name": "Alpha", "is_deleted": "False"})
+    sheets.seed("machines", {"machine_id": "M1", "machine_name": "Lathe", "is_deleted": "False"})
+    sheets.seed("units", {"unit_id": "9", "name": "U9", "status": "active", "is_deleted": "False"})
+    sheets.seed("users", {"user_id": "U2", "username": "ad", "role": "admin", "active": "True", "is_deleted": "False"})
+
+    data = json.loads(asyncio.run(admin_bootstrap_json(get_sheets_db(), None, None, None)))
+
+    assert "dropdowns" not in data["errors"]
+    dropdowns = data["dropdowns"]
+    assert [p["project_id"] for p in dropdowns["projects"]] == ["P1"]
+    assert [m["machine_id"] for m in dropdowns["machines"]] == ["M1"]
+    assert [u["unit_id"] for u in dropdowns["units"]] == ["9"]
+    assert dropdowns["users"] == [{"id": "U2", "user_id": "U2", "username": "ad", "full_name": "ad", "role": "admin"}]
+
+def test_a_write_recomputes_only_the_panels_reading_that_sheet(sheets, monkeypatch):
+    from app.services import dashboard_bootstrap_service as service
+    sheets.seed("attendance", {"attendance_id": "A1", "user_id": "U1", "date": "2026-01-05"})
+    computed = []
+
+    def counting(panel):
+        async def compute(*args):
+            computed.append(panel.name)
+            return {"panel": panel.name}
+        return panel._replace(compute=compute)
+    monkeypatch.setattr(service, "ADMIN_PANELS", [counting(p) for p in service.ADMIN_PANELS])
+    db = get_sheets_db()
+
+    asyncio.run(admin_bootstrap_json(db, None, None, None))
+    assert len(computed) == len(service.ADMIN_PANELS)
+    computed.clear()
+    sheets_repo.insert("attendance", {"attendance_id": "A2", "user_id": "U1", "date": "2026-01-06"})
+    data = json.loads(asyncio.run(admin_bootstrap_json(db, None, None, None)))
+
+    assert sorted(computed) == sorted(p.name for p in service.ADMIN_PANELS if "attendance" in p.sheets)
+    assert data["errors"] == {} and data["overall_stats"] == {"panel": "overall_stats"}
@@ -0,0 +1,45 @@
+import json
+from app.repositories.sheets_repository import sheets_repo
+from app.routers import dropdowns_router
+
+def _seed(sheets):
+    sheets.seed("projects", {"project_id": "P1", "project_name": "Alpha", "is_deleted": "False"})
+    sheets.seed("machines", {"machine_id": "M1", "machine_name": "Lathe", "is_deleted": "False"})
+    sheets.seed("units", {"unit_id": "9", "name": "U9", "status": "active", "is_deleted": "False"})
+    sheets.seed("machinecategories", {"category_id": "C1", "name": "Turning", "is_deleted": "False"})
+
+def test_all_rebuilds_only_the_list_whose_sheet_changed(client, sheets, admin, monkeypatch):
+    _seed(sheets)
+    built = []
+    for name, (sheet_name, build) in list(dropdowns_router.DROPDOWNS.items()):
+        def counting(db, name=name, build=build):
+            built.append(name)
+            return build(db)
+        monkeypatch.setitem(dropdowns_router.DROPDOWNS, name, (sheet_name, counting))
+
+    data = json.loads(client.get("/dropdowns/all", headers=admin).content)
+    assert list(data) == ["projects", "machines", "units", "categories", "users"]
+    assert [m["machine_name"] for m in data["machines"]] == ["Lathe"]
+    assert [c["category_id"] for c in data["categories"]] == ["C1"]
+    assert sorted(built) == sorted(dropdowns_router.DROPDOWNS)
+
+    built.clear()
+    sheets_repo.insert("machines", {"machine_id": "M2", "machine_name": "Mill"})
+    data = json.loads(client.get("/dropdowns/all", headers=admin).content)
+
+    assert built == ["machines"]
+    assert [m["machine_name"] for m in data["machines"]] == ["Lathe", "Mill"]
+    assert [p["project_name"] for p in data["projects"]] == ["Alpha"]
+
+def test_assignable_users_follow_writes(client, sheets, admin):
+    sheets_repo.insert("users", {"user_id": "U3", "username": "newbie", "role": "operator", "active": "True", "approval_status": "pending"})
+    sheets_repo.insert("users", {"user_id": "U4", "username": "sup", "role": "supervisor", "active": "True"})
+
+    r = client.get("/dropdowns/users/assignable", headers=admin)
+    assert r.status_code == 200
+    assert [u["user_id"] for u in json.loads(r.content)] == ["U1", "U2", "U4"]
+
+    sheets_repo.update("users", "U3", {"approval_status": "approved"})
+    sheets_repo.update("users", "U4", {"active": "False"})
+    r = client.get("/dropdowns/users/assignable", headers=admin)
+    assert [u["user_id"] for u in json.loads(r.content)] == ["U1", "U2", "U3"]
@@ -0,0 +1,42 @@
+import json
+from app.repositories.sheets_repository import sheets_repo
+from conftest import auth_headers
+
+def _task(task_id, **fields):
+    return {"task_id": task_id, "title": task_id, "status": "pending", "is_deleted": "False", **fields}
+
+def test_unchanged_poll_is_a_304(client, sheets, admin):
+    sheets.seed("tasks", _task("T1"))
+    first = client.get("/tasks", headers=admin)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "private, no-cache"
+
+    again = client.get("/tasks", headers={**admin, "If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+def test_write_changes_the_tag(client, sheets, admin):
+    sheets.seed("tasks", _task("T1"))
+    etag = client.get("/tasks", headers=admin).headers["etag"]
+
+    sheets_repo.update("tasks", "T1", {"status": "in_progress"})
+    r = client.get("/tasks", headers={**admin, "If-None-Match": etag})
+
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert json.loads(r.content)[0]["status"] == "in_progress"
+
+def test_tags_are_per_caller_and_need_a_valid_token(client, sheets, admin):
+    sheets.seed("tasks", _task("T1"))
+    etag = client.get("/tasks", headers=admin).headers["etag"]
+
+    assert client.get("/tasks", headers={**auth_headers("op1"), "If-None-Match": etag}).status_code == 200
+    forged = {"Authorization": "Bearer not-a-token", "If-None-Match": "*"}
+    assert client.get("/tasks", headers=forged).status_code == 401
+
+def test_paths_without_a_rule_pass_through(client, sheets, admin):
+    r = client.get("/admin/overall-stats", headers={**admin, "If-None-Match": "*"})
+    assert r.status_code == 200
+    assert "etag" not in r.headers
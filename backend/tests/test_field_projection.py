@@ -0,0 +1,27 @@
+import json
+
+def _task(task_id, **fields):
+    return {"task_id": task_id, "title": task_id, "status": "pending", "is_deleted": "False", **fields}
+
+def test_tasks_fields_projects_the_rows(client, sheets, admin):
+    sheets.seed("tasks", _task("T1", priority="high"), _task("T2"))
+
+    r = client.get("/tasks?fields=task_id,status,task_id", headers=admin)
+
+    assert r.status_code == 200
+    assert json.loads(r.content) == [{"task_id": "T1", "status": "pending"}, {"task_id": "T2", "status": "pending"}]
+
+def test_unknown_field_is_a_400(client, sheets, admin):
+    sheets.seed("tasks", _task("T1"))
+    r = client.get("/tasks?fields=task_id,password_hash", headers=admin)
+    assert r.status_code == 400
+    assert "password_hash" in json.loads(r.content)["detail"]
+
+def test_admin_users_never_sends_password_hash(client, sheets, admin):
+    for row in sheets.grids["users"][1:]:
+        row[sheets.grids["users"][0].index("password_hash")] = "$2b$12$secret"
+    users = json.loads(client.get("/admin/users", headers=admin).content)
+    assert users and all("password_hash" not in u for u in users)
+
+    assert client.get("/admin/users?fields=username,password_hash", headers=admin).status_code == 400
+    assert json.loads(client.get("/admin/users?fields=username", headers=admin).content) == [{"username": "op1"}, {"username": "admin"}]
@@ -0,0 +1,40 @@
+import asyncio
+import json
+from app.core.sheets_db import get_sheets_db
+
+def _task(task_id, status="pending", **fields):
+    return {"task_id": task_id, "title": task_id, "status": status, "is_deleted": "False", **fields}
+
+def test_projects_summary_classifies_each_project_once(client, sheets, admin):
+    sheets.seed("tasks",
+        _task("t1", "completed", project="Alpha"), _task("t2", "completed", project="Alpha"),
+        _task("t3", "in_progress", project="Beta"), _task("t4", "on_hold", project="Beta"),
+        _task("t5", "on_hold", project="Gamma"), _task("t6", "pending", project="Gamma"),
+        _task("t7", "pending", project="Delta"),
+        _task("t8", "in_progress", project="Epsilon", is_deleted="True"), _task("t9", "pending", project="Epsilon"),
+        _task("t10", "in_progress"),
+    )
+
+    r = client.get("/supervisor/projects-summary", headers=admin)
+
+    assert r.status_code == 200
+    assert json.loads(r.content) == {"yet_to_start": 2, "in_progress": 1, "completed": 1, "on_hold": 1}
+
+def test_detailed_performance_attaches_each_tasks_holds(sheets):
+    # performance_router is not mounted in main.py, so the handler is called directly
+    from app.routers.performance_router import get_detailed_performance
+    sheets.seed("tasks",
+        _task("t1", "completed", assigned_to="U1", created_at="2026-01-05T09:00:00", total_duration_seconds="600"),
+        _task("t2", "on_hold", assigned_to="U1", created_at="2026-01-06T09:00:00"),
+        _task("t3", "pending", assigned_to="U2", created_at="2026-01-06T09:00:00"),
+    )
+    sheets.seed("taskhold",
+        {"hold_id": "H1", "task_id": "t2", "hold_reason": "Material", "hold_started_at": "2026-01-06T10:00:00", "hold_ended_at": "2026-01-06T11:00:00"},
+        {"hold_id": "H2", "task_id": "t1", "hold_reason": "Break", "hold_started_at": "2026-01-05T10:00:00", "hold_ended_at": ""},
+        {"hold_id": "H3", "task_id": "t2", "hold_reason": "Tooling", "hold_started_at": "2026-01-06T12:00:00", "hold_ended_at": ""},
+    )
+
+    details = asyncio.run(get_detailed_performance(user_id="U1", year=2026, month=1, db=get_sheets_db()))
+
+    holds = {t["id"]: [h["reason"] for h in t["holds"]] for t in details}
+    assert holds == {"t1": ["Break"], "t2": ["Material", "Tooling"]}
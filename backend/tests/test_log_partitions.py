@@ -0,0 +1,23 @@
+import pytest
+from datetime import date
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.log_partitions import log_partitions
+
+def test_partitions_after_writes_match_a_rebuild(sheets, check_index):
+    sheets.seed("tasktimelog", {"log_id": "e1", "task_id": "t1", "action": "start", "timestamp": "2026-01-31T23:00:00", "is_deleted": "False"})
+    log_partitions.rows_between("tasktimelog", date(2026, 1, 1), date(2026, 2, 28))
+
+    # e1 moves to the next month's bucket
+    sheets_repo.update("tasktimelog", "e1", {"timestamp": "2026-02-01T08:00:00"})
+    sheets_repo.insert("tasktimelog", {"log_id": "e2", "task_id": "t1", "action": "hold", "timestamp": "2026-01-05T08:00:00"})
+    sheets_repo.insert("tasktimelog", {"log_id": "e3", "task_id": "t1", "action": "end", "timestamp": "2026-03-01T08:00:00"})
+
+    months = check_index(log_partitions, lambda index: [
+        sorted(r["log_id"] for r in index.rows_between("tasktimelog", start, end))
+        for start, end in ((date(2026, 1, 5), date(2026, 1, 31)), (date(2026, 2, 1), date(2026, 2, 28)), (date(2026, 1, 5), date(2026, 3, 31)))
+    ])
+    assert months == [["e2"], ["e1"], ["e1", "e2", "e3"]]
+
+def test_rows_between_rejects_unpartitioned_sheets(sheets):
+    with pytest.raises(ValueError):
+        log_partitions.rows_between("tasks", date(2026, 1, 1))
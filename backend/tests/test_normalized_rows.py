@@ -0,0 +1,30 @@
+import json
+import app.core.normalizer as normalizer
+from app.repositories.sheets_repository import sheets_repo
+
+def _task(task_id, status="pending", **fields):
+    return {"task_id": task_id, "title": task_id, "status": status, "is_deleted": "False", **fields}
+
+def test_operator_tasks_normalize_each_row_once_per_change(client, sheets, monkeypatch):
+    sheets.seed("tasks", _task("t1", assigned_to="U1"), _task("t2", assigned_to="U1"), _task("t3", assigned_to="U2"))
+    normalized = []
+    normalize_task_row = normalizer.normalize_task_row
+
+    def counting(row, *args, **kwargs):
+        normalized.append(row.get("task_id"))
+        return normalize_task_row(row, *args, **kwargs)
+    monkeypatch.setattr(normalizer, "normalize_task_row", counting)
+
+    def tasks():
+        r = client.get("/operator/tasks?user_id=U1")
+        assert r.status_code == 200
+        return {t["task_id"]: t["status"] for t in json.loads(r.content)["tasks"]}
+
+    assert tasks() == {"t1": "pending", "t2": "pending"}
+    assert sorted(normalized) == ["t1", "t2"]
+    assert tasks() == {"t1": "pending", "t2": "pending"}
+    assert sorted(normalized) == ["t1", "t2"]
+
+    sheets_repo.update("tasks", "t2", {"status": "in_progress"})
+    assert tasks() == {"t1": "pending", "t2": "in_progress"}
+    assert sorted(normalized) == ["t1", "t2", "t2"]
@@ -0,0 +1,44 @@
+import json
+from app.repositories.sheets_repository import sheets_repo
+
+def _tasks(n):
+    return [{"task_id": f"T{i}", "title": f"t{i}", "status": "pending", "is_deleted": "False", "created_at": f"2026-01-{i + 1:02d}T10:00:00"} for i in range(n)]
+
+def _pages(client, headers, url):
+    ids, cursors = [], []
+    while True:
+        r = client.get(url + (f"&cursor={cursors[-1]}" if cursors else ""), headers=headers)
+        assert r.status_code == 200
+        ids.append([t["task_id"] for t in json.loads(r.content)])
+        if "x-next-cursor" not in r.headers:
+            return ids
+        cursors.append(r.headers["x-next-cursor"])
+
+def test_pages_concatenate_to_the_full_list(client, sheets, admin):
+    sheets.seed("tasks", *_tasks(5))
+    full = [t["task_id"] for t in json.loads(client.get("/tasks", headers=admin).content)]
+
+    pages = _pages(client, admin, "/tasks?limit=2")
+
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert sum(pages, []) == full
+    assert sorted(full) == [f"T{i}" for i in range(5)]
+
+def test_cursor_survives_writes_between_pages(client, sheets, admin):
+    sheets.seed("tasks", *_tasks(4))
+    first = client.get("/tasks?limit=2", headers=admin)
+    seen = [t["task_id"] for t in json.loads(first.content)]
+
+    # Rows already served are not repeated after an insert / delete shifts positions
+    sheets_repo.soft_delete("tasks", seen[0])
+    sheets_repo.insert("tasks", {"task_id": "T9", "title": "t9", "status": "pending", "created_at": "2026-02-01T10:00:00"})
+    rest = _pages(client, admin, "/tasks?limit=2&cursor=" + first.headers["x-next-cursor"])
+
+    rest = sum(rest, [])
+    assert not set(seen) & set(rest)
+    assert sorted(seen + rest) == sorted({"T0", "T1", "T2", "T3", "T9"})
+
+def test_invalid_cursor_is_a_400(client, sheets, admin):
+    sheets.seed("tasks", *_tasks(1))
+    assert client.get("/tasks?limit=2&cursor=bm90LWEta2V5", headers=admin).status_code == 400
+    assert client.get("/tasks?limit=0", headers=admin).status_code == 422
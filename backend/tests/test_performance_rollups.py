@@ -0,0 +1,36 @@
+import json
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.performance_rollups import performance_rollups
+
+def _task(task_id, status="pending", **fields):
+    return {"task_id": task_id, "title": task_id, "status": status, "is_deleted": "False", **fields}
+
+def test_hot_rows_shadow_archived_copies(sheets, check_index):
+    sheets.seed("tasks_archive",
+        _task("a1", "completed", completed_at="2026-03-10T10:00:00", total_duration_seconds="100"),
+        _task("t5", "completed", completed_at="2026-02-01T10:00:00", total_duration_seconds="50"),
+    )
+    sheets.seed("tasks", _task("t5", "completed", completed_at="2026-04-02T10:00:00", total_duration_seconds="70"))
+    before = performance_rollups.year(2026, include_archive=True)
+    assert (before[2], before[3], before[4]) == ((0, 0), (1, 100), (1, 70))
+
+    sheets_repo.hard_delete("tasks", "t5") # The archived copy counts again
+    assert performance_rollups.year(2026, include_archive=True)[2] == (1, 50) # (hard_delete drops the cache; reload it)
+    sheets_repo.insert("tasks", _task("a1")) # ... and a1's is shadowed by a pending hot row
+    sheets_repo.update("tasks", "a1", {"status": "completed", "completed_at": "2026-05-20T10:00:00", "total_duration_seconds": 30})
+
+    year = check_index(performance_rollups, lambda index: index.year(2026, include_archive=True))
+    assert {m: c for m, c in year.items() if c != (0, 0)} == {2: (1, 50), 5: (1, 30)}
+
+def test_monthly_performance_endpoint(client, sheets):
+    sheets.seed("tasks",
+        _task("t1", "completed", completed_at="2026-03-10T10:00:00", total_duration_seconds="600"),
+        _task("t2", "completed", completed_at="2026-03-11T10:00:00", total_duration_seconds="1200"),
+        _task("t3", "in_progress", completed_at="2026-03-12T10:00:00", total_duration_seconds="60"),
+    )
+
+    data = json.loads(client.get("/reports/monthly-performance?year=2026").content)
+
+    assert data["chart_data"][2] == {"month": "Mar", "tasks_completed": 2, "aht": 15.0}
+    assert data["csv_rows"][2]["total_runtime_hms"] == "00:30:00"
+    assert sum(m["tasks_completed"] for m in data["chart_data"]) == 2
@@ -0,0 +1,24 @@
+from app.repositories.sheets_repository import sheets_repo
+
+def _versions(sheet_name):
+    return {r["user_id"]: r["_version"] for r in sheets_repo.refresh(sheet_name)}
+
+def test_reload_keeps_versions_of_rows_written_through_the_repository(sheets):
+    sheets.seed("users", {"user_id": "u1", "username": "a", "active": "True", "is_deleted": "False"})
+    sheets_repo.get_cached_records("users")
+    sheets_repo.insert("users", {"user_id": "u3", "username": "c", "active": True})
+    sheets_repo.update("users", "u1", {"username": "b", "is_deleted": False})
+    written = {r["user_id"]: r["_version"] for r in sheets_repo.get_cached_records("users")}
+    sheet_version = sheets_repo.get_version("users")
+
+    assert _versions("users") == written
+    assert sheets_repo.get_version("users") == sheet_version
+
+def test_reload_restamps_rows_changed_on_the_sheet(sheets):
+    sheets.seed("users", {"user_id": "u1", "username": "a"}, {"user_id": "u2", "username": "b"})
+    before = _versions("users")
+    sheets.grids["users"][2][1] = "renamed"
+
+    after = _versions("users")
+    assert after["u1"] == before["u1"]
+    assert after["u2"] != before["u2"]
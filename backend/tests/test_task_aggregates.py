@@ -0,0 +1,69 @@
+import json
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.task_aggregates import task_aggregates
+
+def _task(task_id, status="pending", **fields):
+    return {"task_id": task_id, "title": task_id, "status": status, "is_deleted": "False", **fields}
+
+def _seed(sheets):
+    sheets.seed("tasks", _task("t1", "in_progress", assigned_to="U1", project_id="P1"), _task("t2", "pending", project_id="P1"))
+    sheets.seed("filingtasks", {"filing_task_id": "f1", "status": "pending", "is_deleted": "False"})
+    sheets.seed("fabricationtasks", {"fabrication_task_id": "x0", "status": "completed", "is_deleted": "False"})
+    sheets.seed("machines", {"machine_id": "M1", "status": "active", "is_deleted": "False"})
+    sheets.seed("projects", {"project_id": "P1", "is_deleted": "False"})
+
+def test_aggregates_after_writes_match_a_rebuild(sheets, admin, check_index):
+    _seed(sheets)
+    task_aggregates.task_total()
+
+    sheets_repo.update("tasks", "t1", {"status": "completed"})
+    sheets_repo.update("tasks", "t2", {"status": "in_progress", "assigned_to": "U1"})
+    sheets_repo.soft_delete("filingtasks", "f1")
+    sheets_repo.insert("machines", {"machine_id": "M2", "status": "maintenance"})
+    sheets_repo.insert("users", {"user_id": "U3", "role": "supervisor"})
+
+    totals = check_index(task_aggregates, lambda index: (
+        dict(index.status_counts()), index.task_total(), index.running_task_title("U1"),
+        index.machine_totals(), index.user_totals(), index.project_total("P1"),
+    ))
+    assert totals == (
+        {"completed": 2, "in_progress": 1}, 3, "t2",
+        {"total": 2, "active": 1}, {"total": 3, "operators": 1}, 1,
+    )
+
+def test_dashboard_counts_follow_writes(client, sheets, admin):
+    _seed(sheets)
+    assert json.loads(client.get("/admin/overall-stats", headers=admin).content) == {"users": 2, "tasks": 4, "projects": 1, "machines": 1}
+
+    sheets_repo.soft_delete("tasks", "t2")
+    sheets_repo.update("filingtasks", "f1", {"status": "in_progress"})
+
+    assert json.loads(client.get("/admin/overall-stats", headers=admin).content)["tasks"] == 3
+    stats = json.loads(client.get("/supervisor/task-stats?project=P1", headers=admin).content)
+    assert (stats["total_tasks"], stats["in_progress"], stats["pending"]) == (1, 1, 0)
+
+def test_count_by_after_groups_come_and_go(sheets):
+    sheets.seed("tasks", _task("t1", assigned_to="U1", project_id="P1"), _task("t2", "on_hold", assigned_to="U2", project_id="P2"))
+    assert task_aggregates.count_by(("assigned_to", "status")) == {("U1", "pending"): 1, ("U2", "on_hold"): 1}
+
+    # Emptied groups drop out, and groups seen later are counted under their own values
+    for status in ("in_progress", "on_hold", "in_progress", "completed"):
+        sheets_repo.update("tasks", "t1", {"status": status})
+    sheets_repo.update("tasks", "t2", {"assigned_to": "U3", "project_id": "P3"})
+    sheets_repo.insert("tasks", _task("t3", "completed", assigned_to="U1", project_id="P1"))
+
+    assert task_aggregates.count_by(("assigned_to", "status")) == {("U1", "completed"): 2, ("U3", "on_hold"): 1}
+    assert task_aggregates.count_by(("status",), project="P3") == {("on_hold",): 1}
+    assert task_aggregates.count_by(("status",), project="P2") == {}
+    assert task_aggregates.count_by(("project_id",), operator_id="U1") == {("P1",): 2}
+
+def test_planning_summary_counts_follow_writes(client, sheets, admin):
+    _seed(sheets)
+    sheets_repo.update("tasks", "t2", {"status": "on_hold", "machine_id": "M1"})
+    sheets_repo.update("tasks", "t1", {"machine_id": "M1"})
+
+    summary = json.loads(client.get("/planning/dashboard-summary", headers=admin).content)
+
+    assert (summary["total_tasks"], summary["total_tasks_running"], summary["pending_tasks"]) == (4, 1, 1)
+    assert (summary["completed_tasks"], summary["on_hold_tasks"], summary["machines_active"]) == (1, 1, 1)
+    assert summary["operator_status"] == [{"id": "U1", "name": "op1", "current_task": "t1", "status": "Active"}]
@@ -0,0 +1,64 @@
+import json
+from datetime import date
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.task_completions import task_completions
+from app.routers.reports_router import MAX_REPORT_DAYS
+from app.utils.sheet_rows import id_column
+
+JAN_5, JAN_6 = date(2026, 1, 5), date(2026, 1, 6)
+
+def _task(task_id, status="pending", **fields):
+    return {"task_id": task_id, "title": task_id, "status": status, "is_deleted": "False", **fields}
+
+def test_completions_after_writes_match_a_rebuild(sheets, check_index):
+    sheets.seed("tasks", _task("t1", "completed", completed_at="2026-01-05T10:00:00"))
+    sheets.seed("tasks_archive", _task("a1", "completed", completed_at="2026-01-05T08:00:00"))
+    sheets.seed("filingtasks", {"filing_task_id": "f1", "status": "pending", "is_deleted": "False"})
+    task_completions.completed_between(JAN_5, JAN_6, include_archive=True)
+
+    sheets_repo.update("filingtasks", "f1", {"status": "completed", "completed_at": "2026-01-06T12:00:00"})
+    sheets_repo.insert("tasks", _task("a1", "completed", completed_at="2026-01-06T09:00:00"))
+    sheets_repo.soft_delete("tasks", "t1")
+
+    completed = check_index(task_completions, lambda index: sorted(
+        (sheet_name, row[id_column(sheet_name)], row["completed_at"][:10])
+        for sheet_name, row in index.completed_between(JAN_5, JAN_6, include_archive=True)
+    ))
+    # The live copy of a1 wins over the archived one
+    assert completed == [("filingtasks", "f1", "2026-01-06"), ("tasks", "a1", "2026-01-06")]
+
+def _seed_range(sheets):
+    sheets.seed("machines", {"machine_id": "M1", "machine_name": "Lathe", "is_deleted": "False"})
+    sheets.seed("machineruntimelog",
+        {"log_id": "L1", "machine_id": "M1", "task_id": "t1", "duration_seconds": "600", "date": "2026-01-05", "end_time": "2026-01-05T10:10:00"},
+        {"log_id": "L2", "machine_id": "M1", "task_id": "t1", "duration_seconds": "300", "date": "2026-01-06", "end_time": "2026-01-06T10:05:00"},
+    )
+    sheets.seed("tasks", _task("t1", "completed", completed_at="2026-01-06T10:05:00", machine_id="M1", assigned_to="U1"))
+
+def test_range_report_groups_runtime_and_completions(client, sheets, admin):
+    _seed_range(sheets)
+
+    r = client.get("/reports/range?start=2026-01-05&end=2026-01-06&group_by=date,machine", headers=admin)
+
+    assert r.status_code == 200
+    rows = json.loads(r.content)["report"]
+    assert [(x["date"], x["machine_name"], x["runtime_seconds"], x["completed_tasks"]) for x in rows] == [
+        ("2026-01-05", "Lathe", 600, 0), ("2026-01-06", "Lathe", 300, 1),
+    ]
+
+    r = client.get("/reports/range?start=2026-01-05&end=2026-01-06&group_by=machine&format=csv", headers=admin)
+    assert r.content.decode().splitlines() == [
+        "Machine,Runtime (Mins),Runtime Sessions,Work Time (Mins),Work Sessions,Tasks Completed",
+        "Lathe,15.0,2,0.0,0,1",
+    ]
+
+def test_range_report_rejects_bad_periods_and_dimensions(client, sheets, admin):
+    _seed_range(sheets)
+    last_day = date.fromordinal(JAN_5.toordinal() + MAX_REPORT_DAYS - 1)
+    too_far = date.fromordinal(JAN_5.toordinal() + MAX_REPORT_DAYS)
+
+    assert client.get(f"/reports/range?start=2026-01-05&end={last_day}", headers=admin).status_code == 200
+    assert client.get(f"/reports/range?start=2026-01-05&end={too_far}", headers=admin).status_code == 400
+    assert client.get("/reports/range?start=2026-01-06&end=2026-01-05", headers=admin).status_code == 400
+    assert client.get("/reports/range?start=2026-01-05&group_by=planet", headers=admin).status_code == 400
+    assert client.get(f"/reports/machines/export-csv?date_str=2026-01-05&end_date_str={too_far}").status_code == 400
@@ -0,0 +1,22 @@
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.task_directory import task_directory
+
+def test_directory_after_writes_matches_a_rebuild(sheets, check_index):
+    sheets.seed("tasks", {"task_id": "t1", "title": "a", "is_deleted": "False"})
+    sheets.seed("filingtasks", {"filing_task_id": "f1", "status": "pending", "is_deleted": "False"})
+    sheets.seed("fabricationtasks", {"fabrication_task_id": "x0", "is_deleted": "False"})
+    task_directory.lookup("t1")
+
+    sheets_repo.insert("tasks", {"task_id": "t2", "title": "b"})
+    sheets_repo.insert("fabricationtasks", {"fabrication_task_id": "x1"})
+    sheets_repo.soft_delete("tasks", "t1")
+
+    found = check_index(task_directory, lambda index: [
+        (sheet_name, task_type, row and row["_row_idx"])
+        for sheet_name, task_type, row in map(index.lookup, ("T1", " t2 ", "f1", "X1", "missing"))
+    ])
+    # Lookups are trimmed and case-insensitive, and include soft-deleted rows
+    assert found == [
+        ("tasks", "general", 2), ("tasks", "general", 3), ("filingtasks", "filing", 2),
+        ("fabricationtasks", "fabrication", 3), (None, None, None),
+    ]
@@ -0,0 +1,60 @@
+import json
+from app.repositories.sheets_repository import sheets_repo
+from app.services import task_events_service
+from app.services.task_events_service import task_events
+
+def _messages(response):
+    """(event, id, data) for each SSE message in what the stream sent."""
+    out = []
+    for block in response.content.decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            out.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return out
+
+def _seed_task(sheets):
+    sheets.seed("tasks", {"task_id": "t1", "title": "Weld", "status": "pending", "assigned_to": "U1", "is_deleted": "False"})
+    sheets_repo.get_cached_records("tasks")
+    return task_events.last_seq
+
+def test_reconnect_with_last_event_id_replays_only_the_missed_events(client, sheets, admin):
+    base = _seed_task(sheets)
+    sheets_repo.update("tasks", "t1", {"status": "in_progress"})
+    sheets_repo.update("tasks", "t1", {"status": "on_hold"})
+
+    response = client.get("/events/tasks", headers={**admin, "Last-Event-ID": str(base + 1)}, timeout=0.3)
+
+    assert response.status_code == 200
+    assert [(e, i, d["event"], d["task_id"]) for e, i, d in _messages(response)] == [("task", str(base + 2), "hold", "t1")]
+
+def test_unknown_last_event_id_gets_a_snapshot(client, sheets, admin):
+    base = _seed_task(sheets)
+    sheets_repo.update("tasks", "t1", {"status": "in_progress"})
+
+    response = client.get("/events/tasks", headers={**admin, "Last-Event-ID": str(base + 99)}, timeout=0.3)
+
+    [(event, event_id, data)] = _messages(response)
+    assert (event, event_id, data["seq"]) == ("snapshot", str(base + 1), base + 1)
+    assert [t["task_id"] for t in data["tasks"]] == ["t1"]
+
+def test_subscriber_that_overflows_is_resynced_with_a_snapshot(client, sheets, admin, monkeypatch):
+    from app.routers import supervisor_router
+    _seed_task(sheets)
+    monkeypatch.setattr(task_events_service, "QUEUE_SIZE", 1)
+    running = supervisor_router.get_running_tasks
+    calls = []
+
+    async def get_running_tasks(**kwargs):
+        if not calls:
+            # Both events reach the queue before the stream reads from it
+            sheets_repo.update("tasks", "t1", {"status": "in_progress"})
+            sheets_repo.update("tasks", "t1", {"assigned_to": "U2"})
+        calls.append(1)
+        return await running(**kwargs)
+    monkeypatch.setattr(supervisor_router, "get_running_tasks", get_running_tasks)
+
+    response = client.get("/events/tasks", headers=admin, timeout=0.3)
+
+    messages = _messages(response)
+    assert [e for e, _, _ in messages] == ["snapshot", "snapshot"]
+    assert [(t["task_id"], t["assigned_to"]) for t in messages[1][2]["tasks"]] == [("t1", "U2")]
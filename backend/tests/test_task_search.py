@@ -0,0 +1,49 @@
+import json
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.task_search import task_search
+from app.utils.sheet_rows import id_column
+from conftest import auth_headers
+
+def _task(task_id, status="pending", **fields):
+    return {"task_id": task_id, "title": task_id, "status": status, "is_deleted": "False", **fields}
+
+def test_search_follows_writes(sheets, check_index):
+    sheets.seed("tasks", _task("t1", title="Bracket weld", work_order_number="WO-2024-017"))
+    sheets.seed("filingtasks", {"filing_task_id": "f1", "part_item": "Bracket plate", "is_deleted": "False"})
+    sheets.seed("fabricationtasks", {"fabrication_task_id": "x0", "part_item": "Frame", "is_deleted": "False"})
+    list(task_search.search("bracket"))
+
+    sheets_repo.update("tasks", "t1", {"title": "Flange weld"})
+    sheets_repo.insert("fabricationtasks", {"fabrication_task_id": "x1", "part_item": "Brace"})
+    sheets_repo.soft_delete("filingtasks", "f1")
+
+    hits = check_index(task_search, lambda index: {
+        q: [(sheet_name, row[id_column(sheet_name)]) for _, sheet_name, row in index.search(q)]
+        for q in ("br", "bracket", "pla", "wo2024017", "weld")
+    })
+    # Words of renamed and deleted rows no longer match, not even as prefixes
+    assert hits == {"br": [("fabricationtasks", "x1")], "bracket": [], "pla": [], "wo2024017": [("tasks", "t1")], "weld": [("tasks", "t1")]}
+
+def _search(client, headers, url):
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200
+    return [t["id"] for t in json.loads(r.content)], r.headers.get("x-next-cursor")
+
+def test_search_endpoint_pages_and_scopes_operators(client, sheets, admin):
+    sheets.seed("tasks",
+        _task("t1", title="Weld bracket", assigned_to="U1"),
+        _task("t2", title="Weld frame", assigned_to="U2"),
+        _task("t3", title="Paint frame", assigned_to="U1"),
+    )
+    sheets.seed("fabricationtasks", {"fabrication_task_id": "x1", "part_item": "Weld plate", "assigned_to": "U1", "is_deleted": "False"})
+
+    everything, _ = _search(client, admin, "/tasks/search?q=weld")
+    assert sorted(everything) == ["t1", "t2", "x1"]
+
+    first, cursor = _search(client, admin, "/tasks/search?q=weld&limit=2")
+    rest, last = _search(client, admin, f"/tasks/search?q=weld&limit=2&cursor={cursor}")
+    assert first + rest == everything and last is None
+
+    assert _search(client, admin, "/tasks/search?q=weld+fra")[0] == ["t2"]
+    assert sorted(_search(client, auth_headers("op1"), "/tasks/search?q=weld")[0]) == ["t1", "x1"]
+    assert client.get("/tasks/search?q=weld&cursor=bm90LWEta2V5", headers=admin).status_code == 400
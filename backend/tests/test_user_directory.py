@@ -0,0 +1,44 @@
+import json
+from app.core.auth_utils import hash_password
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.user_directory import user_directory
+
+def test_directory_after_writes_matches_a_rebuild(sheets, check_index):
+    sheets.seed("users",
+        {"user_id": "u1", "username": "alice", "email": "alice@example.com", "is_deleted": "False"},
+        {"user_id": "u2", "username": "bob", "email": "bob@example.com", "is_deleted": "False"},
+    )
+    user_directory.find(username="alice")
+
+    sheets_repo.update("users", "u1", {"username": "Alicia"})
+    sheets_repo.hard_delete("users", "u2")
+    assert user_directory.find(username="bob") == [] # (hard_delete drops the cache; reload it)
+    sheets_repo.insert("users", {"user_id": "u3", "username": "carol", "email": "carol@example.com"})
+
+    ids = lambda rows: [r["user_id"] for r in rows]
+    found, old_name, deleted, searched, similar = check_index(user_directory, lambda index: (
+        ids(index.find(username="alicia")), ids(index.find(username="alice")), ids(index.find(email="bob@example.com")),
+        ids(index.search("example")), [(round(s, 3), r["user_id"]) for s, r in index.similar("alcia")],
+    ))
+    assert (found, old_name, deleted, searched) == (["u1"], [], [], ["u1", "u3"])
+    assert similar and similar[0][1] == "u1"
+
+def _login(client, username, password):
+    return client.post("/auth/login", {"username": username, "password": password})
+
+def test_login_finds_users_through_the_directory(client, sheets):
+    secret = hash_password("s3cret!")
+    sheets.seed("users",
+        {"user_id": "u0", "username": "alice", "role": "operator", "active": "False", "password_hash": secret, "is_deleted": "False"},
+        {"user_id": "u1", "username": "Alice", "role": "operator", "active": "True", "approval_status": "approved", "password_hash": secret, "is_deleted": "False"},
+    )
+
+    r = _login(client, "  ALICE ", "s3cret!")
+    assert r.status_code == 200
+    assert json.loads(r.content)["access_token"]
+    assert _login(client, "alice", "wrong").status_code == 401
+
+    # Renames are picked up without a reload
+    sheets_repo.update("users", "u1", {"username": "alicia"})
+    assert _login(client, "alice", "s3cret!").status_code == 401
+    assert _login(client, "alicia", "s3cret!").status_code == 200
@@ -0,0 +1,49 @@
+import json
+from app.repositories.sheets_repository import sheets_repo
+from app.repositories.work_orders import work_orders
+from app.utils.sheet_rows import id_column
+from conftest import auth_headers
+
+def _task(task_id, status="pending", **fields):
+    return {"task_id": task_id, "title": task_id, "status": status, "is_deleted": "False", **fields}
+
+def _ids(pairs):
+    return [(sheet_name, row[id_column(sheet_name)]) for sheet_name, row in pairs]
+
+def test_work_order_index_after_writes_matches_a_rebuild(sheets, check_index):
+    sheets.seed("projects", {"project_id": "P1", "project_code": "PC-1", "work_order_number": "WO-1", "is_deleted": "False"})
+    sheets.seed("tasks", _task("t1", work_order_number="WO-1"))
+    sheets.seed("filingtasks", {"filing_task_id": "f1", "work_order_number": " wo-1 ", "is_deleted": "False"})
+    sheets.seed("fabricationtasks", {"fabrication_task_id": "x0", "is_deleted": "False"})
+    work_orders.lookup("WO-1")
+
+    sheets_repo.update("tasks", "t1", {"work_order_number": "WO-2"})
+    sheets_repo.insert("fabricationtasks", {"fabrication_task_id": "x1", "work_order_number": "WO-1"})
+    sheets_repo.insert("projects", {"project_id": "P2", "project_code": "PC-2", "work_order_number": "WO-2"})
+
+    wo1, pc2 = check_index(work_orders, lambda index: (_ids(index.lookup("WO-1")), _ids(index.lookup("pc-2"))))
+    assert wo1 == [("projects", "P1"), ("filingtasks", "f1"), ("fabricationtasks", "x1")]
+    assert pc2 == [("projects", "P2"), ("tasks", "t1")]
+
+def test_work_order_endpoint(client, sheets, admin):
+    sheets.seed("projects", {"project_id": "P1", "project_name": "Alpha", "project_code": "PC-1", "work_order_number": "WO-1", "is_deleted": "False"})
+    sheets.seed("tasks",
+        _task("t1", "completed", work_order_number="WO-1", assigned_to="U1"),
+        _task("t2", "in_progress", work_order_number="WO-1", assigned_to="U2"),
+        _task("t3", work_order_number="WO-1", is_deleted="True"),
+    )
+    sheets.seed("machineruntimelog", {"log_id": "L1", "machine_id": "M1", "task_id": "t2", "duration_seconds": "600", "date": "2026-01-05", "end_time": "2026-01-05T10:10:00"})
+
+    r = client.get("/work-orders/wo-1", headers=admin)
+
+    assert r.status_code == 200
+    data = json.loads(r.content)
+    assert data["work_order_number"] == "WO-1" and data["project"]["project_name"] == "Alpha"
+    assert sorted(t["task_id"] for t in data["tasks"]) == ["t1", "t2"]
+    assert (data["progress"]["total_tasks"], data["progress"]["percent_complete"]) == (2, 50.0)
+    assert data["runtime"]["by_task"] == {"t1": 0, "t2": 600}
+
+    # Project codes resolve too; operators only see their own tasks
+    operator = json.loads(client.get("/work-orders/PC-1", headers=auth_headers("op1")).content)
+    assert [t["task_id"] for t in operator["tasks"]] == ["t1"]
+    assert client.get("/work-orders/WO-404", headers=admin).status_code == 404